@@ -6,7 +6,7 @@ from sqlalchemy import pool
 from alembic import context
 
 from schemas.base_entity import Base
-import schemas.company, schemas.user, schemas.task # noqa
+import schemas.company, schemas.user, schemas.task, schemas.task_count, schemas.cache_counter # noqa
 from database import connection_str
 
 # this is the Alembic Config object, which provides
@@ -0,0 +1,78 @@
+"""add task counts
+
+Revision ID: a7e3c9d5f8b2
+Revises: f4c1a8e6b2d0
+Create Date: 2026-10-18 23:42:19.730561
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7e3c9d5f8b2'
+down_revision: Union[str, Sequence[str], None] = 'f4c1a8e6b2d0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+APPLY_COUNT_CHANGES = """
+    INSERT INTO task_counts AS counts (user_id, status, count)
+    SELECT user_id, status, sum(delta) FROM ({changes}) AS changes
+    WHERE user_id IS NOT NULL
+    GROUP BY user_id, status
+    HAVING sum(delta) != 0
+    ORDER BY user_id, status
+    ON CONFLICT (user_id, status) DO UPDATE SET count = counts.count + excluded.count;
+"""
+NEW_ROWS = "SELECT user_id, status, 1 AS delta FROM new_tasks"
+OLD_ROWS = "SELECT user_id, status, -1 AS delta FROM old_tasks"
+
+
+# Creating the triggers locks task against writes until this transaction
+# commits, so the backfill below counts exactly what the triggers take over from.
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'task_counts',
+        sa.Column('user_id', sa.UUID(), nullable=False),
+        sa.Column('status', postgresql.ENUM('TODO', 'IN_PROGRESS', 'COMPLETED', 'REMOVED', name='status', create_type=False), nullable=False),
+        sa.Column('count', sa.Integer(), server_default='0', nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'status'),
+    )
+    op.execute(f"""
+        CREATE FUNCTION task_counts_update() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN {APPLY_COUNT_CHANGES.format(changes=NEW_ROWS)}
+            ELSIF TG_OP = 'DELETE' THEN {APPLY_COUNT_CHANGES.format(changes=OLD_ROWS)}
+            ELSE {APPLY_COUNT_CHANGES.format(changes=f"{NEW_ROWS} UNION ALL {OLD_ROWS}")}
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    for event, tables in (
+        ('INSERT', 'NEW TABLE AS new_tasks'),
+        ('UPDATE', 'OLD TABLE AS old_tasks NEW TABLE AS new_tasks'),
+        ('DELETE', 'OLD TABLE AS old_tasks'),
+    ):
+        op.execute(f"""
+            CREATE TRIGGER task_counts_{event.lower()} AFTER {event} ON task
+            REFERENCING {tables} FOR EACH STATEMENT EXECUTE FUNCTION task_counts_update()
+        """)
+    op.execute("""
+        INSERT INTO task_counts (user_id, status, count)
+        SELECT user_id, status, count(*) FROM task WHERE user_id IS NOT NULL GROUP BY user_id, status
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for event in ('insert', 'update', 'delete'):
+        op.execute(f"DROP TRIGGER IF EXISTS task_counts_{event} ON task")
+    op.execute("DROP FUNCTION IF EXISTS task_counts_update()")
+    op.drop_table('task_counts')
@@ -0,0 +1,39 @@
+"""add keyset pagination indexes
+
+Revision ID: a81f3c2d9b47
+Revises: 4e23352c146c
+Create Date: 2026-10-18 10:12:41.208315
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a81f3c2d9b47'
+down_revision: Union[str, Sequence[str], None] = '4e23352c146c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# CONCURRENTLY, so task, companies and users keep taking writes while the
+# indexes build; it cannot run inside a transaction, hence the autocommit block.
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns in (
+            ('ix_task_user_id_priority_id', 'task', ['user_id', 'priority', 'id']),
+            ('ix_companies_name_id', 'companies', ['name', 'id']),
+            ('ix_users_company_id_username', 'users', ['company_id', 'username']),
+        ):
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_users_company_id_username', table_name='users', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_companies_name_id', table_name='companies', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_task_user_id_priority_id', table_name='task', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,50 @@
+"""add task status indexes
+
+Revision ID: b5e2d7c913f0
+Revises: a81f3c2d9b47
+Create Date: 2026-10-18 11:40:07.553120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e2d7c913f0'
+down_revision: Union[str, Sequence[str], None] = 'a81f3c2d9b47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# task.user_id and users.company_id are already the leading columns of the
+# keyset indexes from a81f3c2d9b47, so they get no single-column index here.
+# CONCURRENTLY cannot run inside a transaction, hence the autocommit blocks.
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_task_user_id_status_priority',
+            'task',
+            ['user_id', 'status', 'priority'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_task_active_user_id_priority_id',
+            'task',
+            ['user_id', 'priority', 'id'],
+            unique=False,
+            postgresql_where=sa.text("status != 'REMOVED'"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_task_active_user_id_priority_id', table_name='task', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_task_user_id_status_priority', table_name='task', postgresql_concurrently=True, if_exists=True)
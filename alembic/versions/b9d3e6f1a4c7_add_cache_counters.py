@@ -0,0 +1,33 @@
+"""add cache counters
+
+Revision ID: b9d3e6f1a4c7
+Revises: a7e3c9d5f8b2
+Create Date: 2026-10-19 10:12:47.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b9d3e6f1a4c7'
+down_revision: Union[str, Sequence[str], None] = 'a7e3c9d5f8b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'cache_counters',
+        sa.Column('key', sa.String(), nullable=False),
+        sa.Column('value', sa.Integer(), server_default='0', nullable=False),
+        sa.PrimaryKeyConstraint('key'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('cache_counters')
@@ -0,0 +1,29 @@
+"""add users task revision
+
+Revision ID: c3d9e1f7a2b8
+Revises: b5e2d7c913f0
+Create Date: 2026-10-18 15:02:41.318604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d9e1f7a2b8'
+down_revision: Union[str, Sequence[str], None] = 'b5e2d7c913f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# A constant server default is a catalog-only change on PostgreSQL 11+; no table rewrite.
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('task_revision', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'task_revision')
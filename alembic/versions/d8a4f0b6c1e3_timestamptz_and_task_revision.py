@@ -0,0 +1,76 @@
+"""timestamptz timestamps and task revision
+
+Revision ID: d8a4f0b6c1e3
+Revises: c3d9e1f7a2b8
+Create Date: 2026-10-18 16:27:09.845127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8a4f0b6c1e3'
+down_revision: Union[str, Sequence[str], None] = 'c3d9e1f7a2b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TABLES = ('companies', 'users', 'task')
+COLUMNS = ('created_at', 'updated_at')
+
+# The old columns were now()::time in the session time zone and never had a date.
+# Each value becomes its most recent past occurrence, which keeps the time of
+# day and never puts a row in the future.
+TO_TIMESTAMPTZ = (
+    "(current_date + {column} - CASE WHEN current_date + {column} > localtimestamp "
+    "THEN interval '1 day' ELSE interval '0' END) AT TIME ZONE current_setting('TimeZone')"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in TABLES:
+        for column in COLUMNS:
+            op.alter_column(
+                table,
+                column,
+                type_=sa.DateTime(timezone=True),
+                existing_type=sa.Time(),
+                existing_nullable=False,
+                server_default=sa.text('now()'),
+                postgresql_using=TO_TIMESTAMPTZ.format(column=column),
+            )
+
+    op.add_column('task', sa.Column('revision', sa.Integer(), server_default='0', nullable=False))
+    # Same as b5e2d7c913f0: CONCURRENTLY cannot run inside a transaction.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_task_user_id_revision_id',
+            'task',
+            ['user_id', 'revision', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_task_user_id_revision_id', table_name='task', postgresql_concurrently=True, if_exists=True)
+    op.drop_column('task', 'revision')
+
+    for table in TABLES:
+        for column in COLUMNS:
+            op.alter_column(
+                table,
+                column,
+                type_=sa.Time(),
+                existing_type=sa.DateTime(timezone=True),
+                existing_nullable=False,
+                server_default=None,
+                postgresql_using=f'{column}::time',
+            )
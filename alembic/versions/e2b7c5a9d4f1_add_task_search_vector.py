@@ -0,0 +1,67 @@
+"""add task search vector
+
+Revision ID: e2b7c5a9d4f1
+Revises: d8a4f0b6c1e3
+Create Date: 2026-10-18 21:14:52.604318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b7c5a9d4f1'
+down_revision: Union[str, Sequence[str], None] = 'd8a4f0b6c1e3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce({row}summary, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce({row}description, '')), 'B')"
+)
+
+
+# A trigger rather than a generated column: the same model also has to create
+# its tables on SQLite, where the column stays a plain, unused TEXT.
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('task', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+    op.execute(f"""
+        CREATE FUNCTION task_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := {SEARCH_VECTOR.format(row="NEW.")};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER task_search_vector_update
+        BEFORE INSERT OR UPDATE OF summary, description ON task
+        FOR EACH ROW EXECUTE FUNCTION task_search_vector_update()
+    """)
+    op.execute(f"UPDATE task SET search_vector = {SEARCH_VECTOR.format(row='')}")
+
+    # Same as b5e2d7c913f0: CONCURRENTLY cannot run inside a transaction.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_task_search_vector',
+            'task',
+            ['search_vector'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_task_search_vector', table_name='task', postgresql_using='gin', postgresql_concurrently=True, if_exists=True)
+    op.execute("DROP TRIGGER IF EXISTS task_search_vector_update ON task")
+    op.execute("DROP FUNCTION IF EXISTS task_search_vector_update()")
+    op.drop_column('task', 'search_vector')
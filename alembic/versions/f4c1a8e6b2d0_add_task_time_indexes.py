@@ -0,0 +1,42 @@
+"""add task time indexes
+
+Revision ID: f4c1a8e6b2d0
+Revises: e2b7c5a9d4f1
+Create Date: 2026-10-18 22:31:05.118402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4c1a8e6b2d0'
+down_revision: Union[str, Sequence[str], None] = 'e2b7c5a9d4f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Keyset indexes for GET /tasks?sort=created_at|updated_at. Partial, like
+# ix_task_active_user_id_priority_id, since REMOVED tasks are hidden by default.
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for column in ('created_at', 'updated_at'):
+            op.create_index(
+                f'ix_task_active_user_id_{column}_id',
+                'task',
+                ['user_id', column, 'id'],
+                unique=False,
+                postgresql_where=sa.text("status != 'REMOVED'"),
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_task_active_user_id_updated_at_id', table_name='task', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_task_active_user_id_created_at_id', table_name='task', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,62 @@
+"""Requests per second of a running API at several concurrency levels.
+
+Start the app (`uvicorn main:app`) against a seeded database, then:
+
+    python -m benchmarks.concurrency --url http://localhost:8000 --token <jwt> --path /tasks
+
+Run it once against the old build and once against the new one to compare.
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+
+async def run_level(url: str, path: str, token: str, concurrency: int, duration: float) -> dict:
+    headers = {"Authorization": f"Bearer {token}"}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    completed = 0
+    errors = 0
+
+    async with httpx.AsyncClient(base_url=url, headers=headers, limits=limits, timeout=30) as client:
+        deadline = time.perf_counter() + duration
+
+        async def worker():
+            nonlocal completed, errors
+            while time.perf_counter() < deadline:
+                try:
+                    response = await client.get(path)
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                completed += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "requests": completed,
+        "errors": errors,
+        "rps": completed / elapsed,
+    }
+
+
+async def main(args):
+    print(f"{'clients':>8} {'requests':>10} {'errors':>8} {'req/s':>10}")
+    for concurrency in args.concurrency:
+        result = await run_level(args.url, args.path, args.token, concurrency, args.duration)
+        print(f"{result['concurrency']:>8} {result['requests']:>10} {result['errors']:>8} {result['rps']:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--path", default="/tasks")
+    parser.add_argument("--token", required=True, help="bearer token from /auth/login")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 128])
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,344 @@
+"""Load test: seed a database, drive a weighted request mix, compare runs.
+
+Seed a local Postgres database and write a manifest of the seeded users
+(all share one password):
+
+    python -m benchmarks.load seed --database-url postgresql://postgres@localhost/todos \\
+        --companies 10 --users 20 --tasks 100 --manifest load_manifest.json
+
+Drive a running server at several concurrency levels and write the results:
+
+    python -m benchmarks.load run --url http://localhost:8000 --manifest load_manifest.json \\
+        --concurrency 1 16 64 --duration 20 --output after.json
+
+Without --url the app is served in-process against the manifest's
+database (the usual .env is still needed to import the app). SQLite URLs
+are rejected: most routes bind JWT claim strings to UUID columns, search
+a tsvector or lock rows, which only Postgres supports.
+
+Every load client logs in from the same address, so raise LOGIN_IP_BURST
+and LOGIN_USERNAME_BURST on the server under test, or logins turn into 429s.
+
+Flag p95 or throughput regressions between two runs; the exit status is 1
+when any are found. Repeat runs on one machine vary, so keep the
+threshold above that noise:
+
+    python -m benchmarks.load compare before.json after.json --threshold 0.1
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import random
+import subprocess
+import sys
+import time
+import uuid
+
+import httpx
+from sqlalchemy import create_engine, insert
+from sqlalchemy.engine import make_url
+
+from benchmarks.login_storm import percentile
+from schemas.base_entity import Base
+from schemas.company import Company
+from schemas.task import Task, Status
+from schemas.user import User
+from services.auth import hash_password
+
+DEFAULT_MIX = "login=2,list_tasks=50,create_task=15,list_users=8,list_companies=25"
+SEED_BATCH_SIZE = 10_000
+
+
+# --- seed -----------------------------------------------------------------
+
+def postgres_url(value: str) -> str:
+    if make_url(value).get_backend_name() != "postgresql":
+        raise argparse.ArgumentTypeError(f"{value!r} is not a Postgres URL; the request mix needs Postgres")
+    return value
+
+
+def insert_batched(connection, table, rows):
+    for start in range(0, len(rows), SEED_BATCH_SIZE):
+        connection.execute(insert(table), rows[start:start + SEED_BATCH_SIZE])
+
+
+def seed(args):
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(engine)
+    password = hash_password(args.password)
+    run_id = uuid.uuid4().hex[:8]
+
+    companies, users, tasks, manifest_users = [], [], [], []
+    for c in range(args.companies):
+        company_id = uuid.uuid4()
+        companies.append({"id": company_id, "name": f"load-{run_id}-{c}", "description": "load test", "rating": 1 + c % 5})
+        for u in range(args.users):
+            user_id = uuid.uuid4()
+            username = f"load-{run_id}-{c}-{u}"
+            # The first user of every company administers it.
+            users.append({
+                "id": user_id, "username": username, "first_name": "Load", "last_name": str(u), "password": password,
+                "is_active": True, "is_admin": u == 0, "is_superuser": False, "company_id": company_id,
+            })
+            manifest_users.append({"username": username, "is_admin": u == 0})
+            tasks.extend(
+                {"id": uuid.uuid4(), "summary": f"{username} task {t}", "description": "load test",
+                 "status": Status.TODO, "priority": t % 10, "user_id": user_id}
+                for t in range(args.tasks)
+            )
+
+    started = time.perf_counter()
+    with engine.begin() as connection:
+        insert_batched(connection, Company, companies)
+        insert_batched(connection, User, users)
+        insert_batched(connection, Task, tasks)
+    engine.dispose()
+
+    with open(args.manifest, "w") as f:
+        json.dump({"database_url": args.database_url, "password": args.password, "users": manifest_users}, f)
+    print(f"seeded {len(companies)} companies, {len(users)} users, {len(tasks)} tasks "
+          f"in {time.perf_counter() - started:.1f}s -> {args.manifest}")
+
+
+# --- run ------------------------------------------------------------------
+
+async def login(client: httpx.AsyncClient, username: str, password: str) -> httpx.Response:
+    return await client.post("/auth/login", data={"username": username, "password": password})
+
+
+async def access_token(client: httpx.AsyncClient, username: str, password: str) -> str:
+    response = await login(client, username, password)
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+class VirtualUser:
+    """One client logged in as a seeded user, issuing requests back to back."""
+
+    def __init__(self, client: httpx.AsyncClient, username: str, password: str, token: str, admin_token: str):
+        self.client = client
+        self.username = username
+        self.password = password
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.admin_headers = {"Authorization": f"Bearer {admin_token}"}
+
+    async def login(self):
+        return await login(self.client, self.username, self.password)
+
+    async def list_tasks(self):
+        return await self.client.get("/tasks", params={"limit": 50}, headers=self.headers)
+
+    async def create_task(self):
+        payload = {"summary": f"load {uuid.uuid4().hex}", "description": "load test", "priority": random.randint(0, 9)}
+        return await self.client.post("/tasks/create", json=payload, headers=self.headers)
+
+    async def list_users(self):
+        return await self.client.get("/users", params={"limit": 50}, headers=self.admin_headers)
+
+    async def list_companies(self):
+        return await self.client.get("/companies", params={"limit": 50}, headers=self.headers)
+
+
+def parse_mix(value: str) -> dict[str, float]:
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        if not hasattr(VirtualUser, name.strip()):
+            raise argparse.ArgumentTypeError(f"unknown operation {name!r}")
+        mix[name.strip()] = float(weight)
+    return mix
+
+
+def summarize(latencies: list[float], errors: int) -> dict:
+    if not latencies:
+        return {"requests": 0, "errors": errors}
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+async def run_level(client: httpx.AsyncClient, manifest: dict, mix: dict, concurrency: int, args) -> dict:
+    password = manifest["password"]
+    admin = next(user for user in manifest["users"] if user["is_admin"])
+    admin_token = await access_token(client, admin["username"], password)
+
+    users = []
+    for user in random.sample(manifest["users"], min(concurrency, len(manifest["users"]))):
+        users.append(VirtualUser(client, user["username"], password, await access_token(client, user["username"], password), admin_token))
+    # More clients than seeded users: reuse logins.
+    users = [users[i % len(users)] for i in range(concurrency)]
+
+    operations, weights = list(mix), list(mix.values())
+    latencies = {operation: [] for operation in operations}
+    errors = {operation: 0 for operation in operations}
+    warmup_until = time.perf_counter() + args.warmup
+    deadline = warmup_until + args.duration
+
+    async def drive(user: VirtualUser):
+        while (now := time.perf_counter()) < deadline:
+            operation = random.choices(operations, weights)[0]
+            try:
+                failed = (await getattr(user, operation)()).status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            if now < warmup_until:
+                continue
+            latencies[operation].append(time.perf_counter() - now)
+            errors[operation] += failed
+
+    await asyncio.gather(*(drive(user) for user in users))
+
+    total = sum(len(samples) for samples in latencies.values())
+    return {
+        "concurrency": concurrency,
+        "duration_s": args.duration,
+        "throughput_rps": total / args.duration,
+        "overall": summarize([sample for samples in latencies.values() for sample in samples], sum(errors.values())),
+        "operations": {operation: summarize(latencies[operation], errors[operation]) for operation in operations},
+    }
+
+
+def in_process_app(database_url: str):
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+    from database import get_session, get_read_session, get_read_session_factory
+    from main import app
+
+    url = make_url(database_url)
+    engine = create_async_engine(url.set(drivername="postgresql+asyncpg"))
+    sessions = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+    async def get_benchmark_session():
+        async with sessions() as db:
+            yield db
+
+    # Every way a route gets a session, or reads would still go to the configured database.
+    app.dependency_overrides[get_session] = get_benchmark_session
+    app.dependency_overrides[get_read_session] = get_benchmark_session
+    app.dependency_overrides[get_read_session_factory] = lambda: sessions
+    return app, engine
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args):
+    with open(args.manifest) as f:
+        manifest = json.load(f)
+
+    engine = None
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=60, limits=httpx.Limits(max_connections=max(args.concurrency)))
+    else:
+        app, engine = in_process_app(manifest["database_url"])
+        # Unhandled errors become 500s and are counted, as they would be from a real server.
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        client = httpx.AsyncClient(transport=transport, base_url="http://load", timeout=60)
+
+    results = {
+        "meta": {
+            "started_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "target": args.url or manifest["database_url"],
+            "mix": args.mix,
+            "users": len(manifest["users"]),
+        },
+        "levels": [],
+    }
+    print(f"{'clients':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    try:
+        async with client:
+            for concurrency in args.concurrency:
+                level = await run_level(client, manifest, args.mix, concurrency, args)
+                results["levels"].append(level)
+                overall = level["overall"]
+                print(f"{concurrency:>7} {level['throughput_rps']:>8.1f} {overall.get('p50_ms', 0):>8.1f} "
+                      f"{overall.get('p95_ms', 0):>8.1f} {overall.get('p99_ms', 0):>8.1f} {overall['errors']:>7}")
+    finally:
+        if engine is not None:
+            await engine.dispose()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+# --- compare --------------------------------------------------------------
+
+def compare(args) -> int:
+    with open(args.baseline) as f:
+        baseline = {level["concurrency"]: level for level in json.load(f)["levels"]}
+    with open(args.candidate) as f:
+        candidate = {level["concurrency"]: level for level in json.load(f)["levels"]}
+
+    regressions = 0
+    print(f"{'clients':>7} {'operation':>15} {'req/s':>18} {'p95 ms':>18}")
+    for concurrency in sorted(baseline.keys() & candidate.keys()):
+        old, new = baseline[concurrency], candidate[concurrency]
+        rows = [("all", old["throughput_rps"], new["throughput_rps"], old["overall"], new["overall"])]
+        rows += [
+            (operation, None, None, old["operations"][operation], new["operations"][operation])
+            for operation in sorted(old["operations"].keys() & new["operations"].keys())
+        ]
+        for operation, old_rps, new_rps, old_stats, new_stats in rows:
+            flags = []
+            if old_rps and new_rps < old_rps * (1 - args.threshold):
+                flags.append("throughput")
+            if "p95_ms" in old_stats and "p95_ms" in new_stats and new_stats["p95_ms"] > old_stats["p95_ms"] * (1 + args.threshold):
+                flags.append("p95")
+            regressions += bool(flags)
+
+            rps = f"{old_rps:.1f} -> {new_rps:.1f}" if old_rps else ""
+            p95 = f"{old_stats.get('p95_ms', 0):.1f} -> {new_stats.get('p95_ms', 0):.1f}"
+            print(f"{concurrency:>7} {operation:>15} {rps:>18} {p95:>18}  {'REGRESSION: ' + ', '.join(flags) if flags else ''}")
+
+    print(f"{regressions} regression(s) beyond {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = commands.add_parser("seed", help="seed a database and write a user manifest")
+    seed_parser.add_argument("--database-url", type=postgres_url, required=True, help="sync URL, e.g. postgresql://postgres@localhost/todos")
+    seed_parser.add_argument("--companies", type=int, default=10)
+    seed_parser.add_argument("--users", type=int, default=20, help="users per company")
+    seed_parser.add_argument("--tasks", type=int, default=100, help="tasks per user")
+    seed_parser.add_argument("--password", default="load-test")
+    seed_parser.add_argument("--manifest", default="load_manifest.json")
+
+    run_parser = commands.add_parser("run", help="drive the request mix and report latency percentiles")
+    run_parser.add_argument("--manifest", default="load_manifest.json")
+    run_parser.add_argument("--url", help="running server; serve the app in-process when omitted")
+    run_parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    run_parser.add_argument("--duration", type=float, default=20.0, help="measured seconds per level")
+    run_parser.add_argument("--warmup", type=float, default=2.0, help="unmeasured seconds before each level")
+    run_parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX), help=f"weights, default {DEFAULT_MIX}")
+    run_parser.add_argument("--output", help="write results as JSON")
+
+    compare_parser = commands.add_parser("compare", help="flag regressions between two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("candidate")
+    compare_parser.add_argument("--threshold", type=float, default=0.1, help="allowed relative change, default 0.1")
+
+    args = parser.parse_args()
+    if args.command == "seed":
+        seed(args)
+    elif args.command == "run":
+        asyncio.run(run(args))
+    else:
+        sys.exit(compare(args))
+
+
+if __name__ == "__main__":
+    main()
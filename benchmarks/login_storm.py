@@ -0,0 +1,69 @@
+"""Latency of GET /tasks while /auth/login is being hammered.
+
+Measures /tasks once on a quiet server and once while `--logins` clients
+log in back to back, then prints p50/p99 for both phases:
+
+    python -m benchmarks.login_storm --token <jwt> --username <user> --password <password>
+
+With the default login rate limits most storm attempts get a 429 without
+reaching bcrypt; raise LOGIN_*_BURST on the server to measure the pool itself.
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def poll_tasks(client: httpx.AsyncClient, token: str, deadline: float, latencies: list[float]):
+    headers = {"Authorization": f"Bearer {token}"}
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        await client.get("/tasks", headers=headers)
+        latencies.append(time.perf_counter() - started)
+
+
+async def login(client: httpx.AsyncClient, username: str, password: str, deadline: float, statuses: dict):
+    while time.perf_counter() < deadline:
+        response = await client.post("/auth/login", data={"username": username, "password": password})
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+
+async def run_phase(args, logins: int) -> tuple[list[float], dict]:
+    latencies = []
+    statuses = {}
+    async with httpx.AsyncClient(base_url=args.url, timeout=60) as client:
+        deadline = time.perf_counter() + args.duration
+        await asyncio.gather(
+            *(poll_tasks(client, args.token, deadline, latencies) for _ in range(args.pollers)),
+            *(login(client, args.username, args.password, deadline, statuses) for _ in range(logins)),
+        )
+    return latencies, statuses
+
+
+async def main(args):
+    print(f"{'phase':>8} {'requests':>9} {'p50 ms':>9} {'p99 ms':>9}  logins")
+    for phase, logins in (("quiet", 0), ("storm", args.logins)):
+        latencies, statuses = await run_phase(args, logins)
+        print(
+            f"{phase:>8} {len(latencies):>9} {percentile(latencies, 50) * 1000:>9.1f} "
+            f"{percentile(latencies, 99) * 1000:>9.1f}  {statuses or '-'}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--token", required=True, help="bearer token used for GET /tasks")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--logins", type=int, default=16, help="concurrent login clients during the storm")
+    parser.add_argument("--pollers", type=int, default=4, help="concurrent GET /tasks clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per phase")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,59 @@
+"""Per-request cost of MetricsMiddleware.
+
+Drives the same trivial app in-process with and without the middleware, so
+the difference is the middleware alone rather than network or database time:
+
+    python -m benchmarks.middleware_overhead --requests 20000
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from services.request_metrics import MetricsMiddleware
+
+
+def create_app(instrumented: bool) -> FastAPI:
+    app = FastAPI()
+    if instrumented:
+        app.add_middleware(MetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"id": item_id}
+
+    return app
+
+
+async def measure(app: FastAPI, requests: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for i in range(min(requests, 500)):
+            await client.get(f"/items/{i}")
+
+        started = time.perf_counter()
+        for i in range(requests):
+            await client.get(f"/items/{i}")
+        elapsed = time.perf_counter() - started
+
+    return elapsed / requests * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    plain = asyncio.run(measure(create_app(instrumented=False), args.requests))
+    instrumented = asyncio.run(measure(create_app(instrumented=True), args.requests))
+
+    print(f"{'app':>14} {'us/request':>12}")
+    print(f"{'plain':>14} {plain:>12.1f}")
+    print(f"{'instrumented':>14} {instrumented:>12.1f}")
+    print(f"overhead: {instrumented - plain:.1f} us/request ({(instrumented / plain - 1) * 100:.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Cost of turning task rows into a JSON response body: ORM + Pydantic vs Core + orjson.
+
+"orm" loads Task entities and goes through response_model validation and the
+stdlib encoder, as the list endpoints used to; "core" selects the ViewTask
+columns and renders RowMappings with FastJSONResponse. Uses in-memory SQLite:
+
+    python -m benchmarks.serialization --rows 100 10000 100000
+"""
+import argparse
+import json
+import time
+import uuid
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from models.task import ViewTask
+from schemas.base_entity import Base
+from schemas.task import Task, Status
+import schemas.company, schemas.user  # noqa
+from services.fast_json import FastJSONResponse, view_columns
+
+
+view_tasks = TypeAdapter(list[ViewTask])
+
+
+def seed(rows: int):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    user_id = uuid.uuid4()
+    with engine.begin() as connection:
+        connection.execute(insert(Task), [
+            {"id": uuid.uuid4(), "summary": f"task {i}", "description": "description", "status": Status.TODO,
+             "priority": i % 10, "user_id": user_id}
+            for i in range(rows)
+        ])
+    return engine
+
+
+def orm_serialize(tasks) -> bytes:
+    validated = view_tasks.validate_python(tasks, from_attributes=True)
+    return json.dumps(view_tasks.dump_python(validated, mode="json")).encode()
+
+
+def core_serialize(rows) -> bytes:
+    return FastJSONResponse({"items": [dict(row) for row in rows], "next_cursor": None}).body
+
+
+def orm_path(engine) -> bytes:
+    with Session(engine) as db:
+        return orm_serialize(db.execute(select(Task)).scalars().all())
+
+
+def core_path(engine) -> bytes:
+    with engine.connect() as connection:
+        return core_serialize(connection.execute(select(*view_columns(ViewTask, Task))).mappings().all())
+
+
+def best_of(repeat: int, fn, *args) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main(args):
+    print(f"{'rows':>8} {'orm serialize':>14} {'core serialize':>15} {'orm fetch+ser':>14} {'core fetch+ser':>15}")
+    for rows in args.rows:
+        engine = seed(rows)
+        with Session(engine) as db:
+            tasks = db.execute(select(Task)).scalars().all()
+        with engine.connect() as connection:
+            mappings = connection.execute(select(*view_columns(ViewTask, Task))).mappings().all()
+
+        timings = [
+            best_of(args.repeat, orm_serialize, tasks),
+            best_of(args.repeat, core_serialize, mappings),
+            best_of(args.repeat, orm_path, engine),
+            best_of(args.repeat, core_path, engine),
+        ]
+        print(f"{rows:>8} " + " ".join(f"{t * 1000:>11.2f} ms" for t in timings))
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    main(parser.parse_args())
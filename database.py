@@ -1,18 +1,217 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from settings import db_engine, db_username, db_password, db_host, db_port, db_table
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import Annotated
 
+from fastapi import Depends
+from sqlalchemy import event, text
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
+from services.auth import get_current_user
+from services.logger import user_id_var
+from services.metrics import (
+    db_pool_checkout_seconds, db_pool_checked_out, db_pool_overflow, db_pool_timeouts,
+    db_read_sessions, db_replica_up,
+)
+from services.request_metrics import instrument_engine
+from services.sql_profiler import sql_profiler
+from settings import (
+    db_engine, db_async_engine, db_username, db_password, db_host, db_port, db_table,
+    db_pool_size, db_max_overflow, db_pool_timeout, db_pool_recycle, db_pool_pre_ping,
+    db_replica_urls, db_replica_check_interval, db_read_your_writes_seconds,
+)
+
+
+# Sync URL (psycopg2), still used by alembic migrations.
 connection_str = f"{db_engine}://{db_username}:{db_password}@{db_host}:{db_port}/{db_table}"
+async_connection_str = f"{db_async_engine}://{db_username}:{db_password}@{db_host}:{db_port}/{db_table}"
+
+logger = logging.getLogger("todos.db")
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records checkout wait time, overflow and timeouts."""
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except TimeoutError:
+            db_pool_timeouts.inc()
+            raise
+        finally:
+            db_pool_checkout_seconds.observe(time.perf_counter() - started)
+
+        if self.checkedout() > self.size():
+            db_pool_overflow.inc()
+        return connection
+
+
+def create_instrumented_engine(url: str, **kwargs) -> AsyncEngine:
+    engine = create_async_engine(
+        url,
+        pool_size=db_pool_size,
+        max_overflow=db_max_overflow,
+        pool_timeout=db_pool_timeout,
+        pool_recycle=db_pool_recycle,
+        pool_pre_ping=db_pool_pre_ping,
+        **kwargs,
+    )
+    instrument_engine(engine.sync_engine)
+    if sql_profiler is not None:
+        sql_profiler.install(engine.sync_engine)
+    return engine
+
+
+class PrimarySession(Session):
+    """Sessions on the primary; their commits open the read-your-writes window."""
+
+
+class RecentWriters:
+    """Users who committed on the primary within the last `window` seconds.
+
+    Their reads stay on the primary so they never see a replica that has not
+    caught up with their own write. Entries are kept in write order, so
+    expired ones are dropped from the front.
+    """
+
+    def __init__(self, window: float):
+        self.window = window
+        self.written_at: OrderedDict[str, float] = OrderedDict()
+
+    def record(self, user_id: str):
+        self.written_at[user_id] = time.monotonic()
+        self.written_at.move_to_end(user_id)
+
+    def wrote_recently(self, user_id: str) -> bool:
+        expired = time.monotonic() - self.window
+        while self.written_at and next(iter(self.written_at.values())) < expired:
+            self.written_at.popitem(last=False)
+        return user_id in self.written_at
+
+
+class Replica:
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        self.name = engine.url.render_as_string(hide_password=True)
+        self.sessions = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+        self.down_until = 0.0
+        db_replica_up.labels(self.name).set_function(lambda: float(self.is_up()))
+
+    def is_up(self) -> bool:
+        return time.monotonic() >= self.down_until
+
+
+class ReplicaSet:
+    """Round-robin over read replicas, skipping the ones that failed recently.
 
+    A replica that fails a connection is left out for `retry_after` seconds,
+    then tried again; `monitor` probes all of them in the background so one
+    that recovers is back before a request has to find out.
+    """
 
-engine = create_engine(connection_str, echo=True)
-SessionLocal = sessionmaker(bind=engine, autoflush=False)
+    def __init__(self, engines: list[AsyncEngine], retry_after: float):
+        self.replicas = [Replica(engine) for engine in engines]
+        self.retry_after = retry_after
+        self.next = 0
 
+    def candidates(self) -> list[Replica]:
+        start = self.next
+        self.next = (self.next + 1) % len(self.replicas)
+        ordered = self.replicas[start:] + self.replicas[:start]
+        return [replica for replica in ordered if replica.is_up()]
 
-def get_session():
-    db = SessionLocal()
-    try:
+    def mark_down(self, replica: Replica, error: Exception):
+        if replica.down_until == 0.0:
+            logger.warning("Read replica is down", extra={"replica": replica.name, "error": repr(error)})
+        replica.down_until = time.monotonic() + self.retry_after
+
+    def mark_up(self, replica: Replica):
+        replica.down_until = 0.0
+
+    async def check(self):
+        for replica in self.replicas:
+            try:
+                async with replica.engine.connect() as connection:
+                    await asyncio.wait_for(connection.execute(text("SELECT 1")), timeout=self.retry_after)
+            # Drivers raise their own errors for refused connections, missing databases, etc.
+            except Exception as e:
+                self.mark_down(replica, e)
+            else:
+                self.mark_up(replica)
+
+    async def monitor(self):
+        while True:
+            await self.check()
+            await asyncio.sleep(self.retry_after)
+
+
+engine = create_instrumented_engine(async_connection_str, poolclass=InstrumentedPool)
+SessionLocal = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False, sync_session_class=PrimarySession)
+
+db_pool_checked_out.set_function(lambda: engine.pool.checkedout())
+
+replicas = ReplicaSet(
+    [create_instrumented_engine(url) for url in db_replica_urls], db_replica_check_interval,
+) if db_replica_urls else None
+recent_writers = RecentWriters(db_read_your_writes_seconds)
+
+
+@event.listens_for(PrimarySession, "after_commit")
+def record_write(session):
+    user_id = user_id_var.get()
+    if user_id is not None:
+        recent_writers.record(user_id)
+
+
+async def get_session():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+
+async def open_replica_session():
+    """Session already connected to a healthy replica, or None if none answers"""
+    for replica in replicas.candidates():
+        db = replica.sessions()
+        try:
+            await db.connection()
+        except Exception as e:
+            await db.close()
+            replicas.mark_down(replica, e)
+            continue
+        db_read_sessions.labels(replica.name).inc()
+        return db
+    return None
+
+
+# For handlers that only read: served by a replica when one is configured and
+# up, unless the user wrote recently and must see their own write.
+@asynccontextmanager
+async def read_session(user_id: str):
+    db = None
+    if replicas is not None and not recent_writers.wrote_recently(user_id):
+        db = await open_replica_session()
+    if db is None:
+        db_read_sessions.labels("primary").inc()
+        db = SessionLocal()
+
+    async with db:
+        yield db
+
+
+async def get_read_session(current_user: Annotated[dict, Depends(get_current_user)]):
+    async with read_session(current_user["id"]) as db:
+        yield db
+
+
+# For read handlers that may not need the database at all, e.g. when they can
+# answer from a cache: a session is only opened if they call the factory.
+def get_read_session_factory(current_user: Annotated[dict, Depends(get_current_user)]):
+    return partial(read_session, current_user["id"])
@@ -1,16 +1,43 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
+from database import replicas
 from routes.users import router as user_router
 from routes.companies import router as companies_router
 from routes.auth import router as auth_router
 from routes.tasks import router as tasks_router
+from routes.metrics import router as metrics_router
+from routes.debug import router as debug_router
+from services.fast_json import FastJSONResponse
+from services.logger import RequestContextMiddleware, configure_logging
+from services.request_metrics import MetricsMiddleware
+from services.task_feed import task_feed
+
+configure_logging()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    monitor = asyncio.create_task(replicas.monitor()) if replicas is not None else None
+    await task_feed.start()
+    yield
+    await task_feed.stop()
+    if monitor is not None:
+        monitor.cancel()
+
 
-app = FastAPI()
+app = FastAPI(default_response_class=FastJSONResponse, lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(RequestContextMiddleware)
 
 app.include_router(user_router)
 app.include_router(companies_router)
 app.include_router(auth_router)
 app.include_router(tasks_router)
+app.include_router(metrics_router)
+app.include_router(debug_router)
 
 
 @app.get("/")
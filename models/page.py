@@ -0,0 +1,18 @@
+from typing import Generic, Optional, TypeVar
+from pydantic import BaseModel, Field
+
+from services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    items: list[T]
+    next_cursor: Optional[str] = None
+
+
+class PageQuery(BaseModel):
+    """`cursor` and `limit`, for endpoints that take their query parameters as one model"""
+    cursor: Optional[str] = None
+    limit: int = Field(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+from typing import Optional
+
+
+class ViewStatementStats(BaseModel):
+    fingerprint: str
+    route: Optional[str]
+    calls: int
+    total_ms: float
+    mean_ms: float
+    max_ms: float
@@ -1,10 +1,56 @@
-from typing import Optional
-from pydantic import BaseModel, UUID4, Field
+from datetime import datetime
+from typing import Annotated, Literal, Optional
+from pydantic import AwareDatetime, BaseModel, BeforeValidator, UUID4, Field, model_validator
 
+from models.page import PageQuery
 from schemas.task import Status
 
 
+MAX_BULK_TASKS = 1000
+MAX_CLAIM_TASKS = 100
+
+
+def _status_from_query(value):
+    # Query strings carry "2" or "IN_PROGRESS"; JSON bodies already carry the integer.
+    if isinstance(value, str):
+        return int(value) if value.isdigit() else Status.__members__.get(value.upper(), value)
+    return value
+
+
+StatusQuery = Annotated[Status, BeforeValidator(_status_from_query)]
+
+# A leading "-" sorts descending; ties are always broken by id in the same direction.
+TaskSort = Literal["-priority", "priority", "-created_at", "created_at", "-updated_at", "updated_at"]
+
+
+class TaskFilter(BaseModel):
+    """GET /tasks query parameters. Ranges include their lower bound and exclude the upper one."""
+    # None means every status but REMOVED; ask for REMOVED explicitly to see soft-deleted tasks.
+    status: Optional[list[StatusQuery]] = None
+    min_priority: Optional[int] = Field(None, ge=0)
+    max_priority: Optional[int] = Field(None, ge=0)
+    created_since: Optional[AwareDatetime] = None
+    created_before: Optional[AwareDatetime] = None
+    updated_since: Optional[AwareDatetime] = None
+    updated_before: Optional[AwareDatetime] = None
+    sort: TaskSort = "-priority"
+
+    @model_validator(mode="after")
+    def check_ranges(self):
+        if self.min_priority is not None and self.max_priority is not None and self.min_priority > self.max_priority:
+            raise ValueError("min_priority is greater than max_priority")
+        for since, before in (("created_since", "created_before"), ("updated_since", "updated_before")):
+            if getattr(self, since) and getattr(self, before) and getattr(self, since) >= getattr(self, before):
+                raise ValueError(f"{since} is not before {before}")
+        return self
+
+
+class TaskListQuery(TaskFilter, PageQuery):
+    pass
+
+
 class ViewTask(BaseModel):
+    id: UUID4
     summary: str
     description: str
     priority: int
@@ -12,7 +58,59 @@ class ViewTask(BaseModel):
     user_id: UUID4
 
 
+class ViewTaskChange(ViewTask):
+    updated_at: datetime
+
+
+class TaskChanges(BaseModel):
+    items: list[ViewTaskChange]
+    # Pass back as `since`; None until the first change has been seen.
+    cursor: Optional[str] = None
+    has_more: bool
+
+
+class TaskSearchResult(ViewTask):
+    # Only meaningful for ordering results of the same search.
+    rank: float
+
+
+class TaskStats(BaseModel):
+    """Task counts by status"""
+    todo: int
+    in_progress: int
+    completed: int
+    removed: int
+
+
+class TaskCountDrift(BaseModel):
+    user_id: UUID4
+    status: Status
+    # What task_counts says, and what the task table says.
+    counted: int
+    actual: int
+
+
 class CreateTaskPayload(BaseModel):
     summary: str = Field(min_length=1, max_length=100)
     description: Optional[str] = Field(max_length=256)
     priority: int = Field(ge=0)
+
+
+BulkCreateTasksPayload = Annotated[list[CreateTaskPayload], Field(min_length=1, max_length=MAX_BULK_TASKS)]
+
+
+class UpdateTasksStatusPayload(BaseModel):
+    ids: list[UUID4] = Field(min_length=1, max_length=MAX_BULK_TASKS)
+    status: Status
+
+
+class ClaimTasksPayload(BaseModel):
+    limit: int = Field(1, ge=1, le=MAX_CLAIM_TASKS)
+    # "company" claims from every user of the caller's company; admins only.
+    scope: Literal["user", "company"] = "user"
+
+
+class BulkTaskResult(BaseModel):
+    index: int
+    result: Literal["created", "conflict", "updated", "not_found"]
+    task: Optional[ViewTask] = None
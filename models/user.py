@@ -1,5 +1,9 @@
+from typing import Annotated, Literal, Optional
 
-from pydantic import UUID4, BaseModel
+from pydantic import UUID4, BaseModel, Field
+
+
+MAX_BULK_USERS = 1000
 
 
 class ViewUser(BaseModel):
@@ -17,3 +21,12 @@ class UserCreate(BaseModel):
     last_name: str
     password: str
     is_admin: bool = False
+
+
+BulkCreateUsersPayload = Annotated[list[UserCreate], Field(min_length=1, max_length=MAX_BULK_USERS)]
+
+
+class BulkUserResult(BaseModel):
+    index: int
+    result: Literal["created", "conflict"]
+    user: Optional[ViewUser] = None
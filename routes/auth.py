@@ -1,16 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.security import OAuth2PasswordRequestForm
 
 from database import get_session
 from services.auth import sign_in, create_access_token
+from services.rate_limit import login_limiter
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
 
+# The session is opened lazily, so a throttled attempt never touches the database.
+# Behind a proxy, run uvicorn with --proxy-headers so request.client is the real client.
 @router.post("/login")
-async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_session)):
-    user = sign_in(form_data.username, form_data.password, db)
+async def login(request: Request, form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_session)):
+    await login_limiter.check(form_data.username, request.client.host if request.client else "unknown")
+
+    user = await sign_in(form_data.username, form_data.password, db)
     if not user:
         raise HTTPException(status_code=404, detail="Incorrect username or password")
 
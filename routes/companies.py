@@ -1,28 +1,56 @@
-from fastapi import APIRouter, Depends, status, HTTPException
-from sqlalchemy.orm import Session
-from typing import Annotated
+from fastapi import APIRouter, Depends, Request, status, HTTPException
+from sqlalchemy import select, tuple_, cast, Float
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Annotated, Optional
+from uuid import UUID
 
-from database import get_session
+from database import get_session, get_read_session_factory
 from schemas.company import Company
 from models.company import ViewCompany, CreateCompanyPayload
+from models.page import Page
 from schemas.user import User
 from services.auth import get_current_user
+from services.pagination import PageSize, decode_cursor, paginate
+from services.fast_json import view_columns, page_response
+from services.response_cache import response_cache, conditional_response
 
 router = APIRouter(prefix="/companies", tags=["Companies"])
 
 
-@router.get("", response_model=list[ViewCompany], status_code=status.HTTP_200_OK)
-async def get_companies(current_user: Annotated[User, Depends(get_current_user)], db: Session = Depends(get_session)):
-    return db.query(Company).all()
+# The company list is the same for every user and only changes through add_company,
+# so rendered pages are cached until it commits. Right after it commits, misses are
+# read from the primary: a replica that has not replayed it yet would otherwise
+# have its stale page cached under the new version. `db` only connects if used.
+@router.get("", response_model=Page[ViewCompany], status_code=status.HTTP_200_OK)
+async def get_companies(request: Request, current_user: Annotated[User, Depends(get_current_user)], cursor: Optional[str] = None, limit: int = PageSize, read_session=Depends(get_read_session_factory), db: AsyncSession = Depends(get_session)):
+    cache_key, body = await response_cache.lookup("companies", f"{cursor or ''}:{limit}")
+    if body is None:
+        columns = view_columns(ViewCompany, Company, rating=cast(Company.rating, Float).label("rating"))
+        query = select(*columns).order_by(Company.name, Company.id)
+        if cursor:
+            name, company_id = decode_cursor(cursor, str, UUID)
+            query = query.filter(tuple_(Company.name, Company.id) > (name, company_id))
+
+        if response_cache.recently_invalidated("companies"):
+            result = await db.execute(query.limit(limit + 1))
+        else:
+            async with read_session() as read_db:
+                result = await read_db.execute(query.limit(limit + 1))
+        page = paginate(result.mappings().all(), limit, lambda company: (company["name"], company["id"]))
+        body = page_response(page).body
+        await response_cache.store(cache_key, body)
+
+    return conditional_response(request, body)
 
 
 @router.post("", response_model=ViewCompany, status_code=status.HTTP_201_CREATED)
-async def add_company(payload: CreateCompanyPayload, current_user: Annotated[User, Depends(get_current_user)], db: Session = Depends(get_session)):
+async def add_company(payload: CreateCompanyPayload, current_user: Annotated[User, Depends(get_current_user)], db: AsyncSession = Depends(get_session)):
     if not current_user['is_superuser']:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
 
     company = Company(**payload.model_dump())
     db.add(company)
-    db.commit()
-    db.refresh(company)
+    await db.commit()
+    await response_cache.invalidate("companies")
+    await db.refresh(company)
     return company
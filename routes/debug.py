@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Annotated
+
+from database import get_session
+from models.sql_profile import ViewStatementStats
+from models.task import TaskCountDrift
+from schemas.user import User
+from services.auth import get_current_user
+from services.fast_json import FastJSONResponse
+from services.sql_profiler import sql_profiler
+from services.task_stats import find_count_drift, reconcile_task_counts
+
+router = APIRouter(prefix="/debug", tags=["Debug"])
+
+
+def require_superuser(current_user: Annotated[User, Depends(get_current_user)]):
+    if not current_user['is_superuser']:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+    return current_user
+
+
+def require_profiler(current_user: Annotated[User, Depends(require_superuser)]):
+    if sql_profiler is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="SQL profiler is disabled")
+    return sql_profiler
+
+
+@router.get("/sql", response_model=list[ViewStatementStats])
+def get_sql_profile(profiler=Depends(require_profiler), limit: int = Query(20, ge=1, le=500)):
+    return profiler.top(limit)
+
+
+@router.delete("/sql", status_code=status.HTTP_204_NO_CONTENT)
+def reset_sql_profile(profiler=Depends(require_profiler)):
+    profiler.reset()
+
+
+# Consistency check of the task_counts behind GET /tasks/stats. Both scan the task
+# table, so run them off-peak; drift means something wrote tasks around the triggers.
+@router.get("/task-counts", response_model=list[TaskCountDrift], dependencies=[Depends(require_superuser)])
+async def check_task_counts(db: AsyncSession = Depends(get_session)):
+    return FastJSONResponse(await find_count_drift(db))
+
+
+@router.post("/task-counts/reconcile", response_model=list[TaskCountDrift], dependencies=[Depends(require_superuser)])
+async def fix_task_counts(db: AsyncSession = Depends(get_session)):
+    return FastJSONResponse(await reconcile_task_counts(db))
@@ -0,0 +1,9 @@
+from fastapi import APIRouter, Response
+from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+
+@router.get("", include_in_schema=False)
+def get_metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -1,29 +1,219 @@
-from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
-from typing import Annotated
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Annotated, Literal, Optional
+from uuid import UUID
 
 
-from database import get_session
+from database import get_session, get_read_session
 from schemas.task import Task, Status
-from models.task import CreateTaskPayload, ViewTask
+from models.page import Page
+from models.task import CreateTaskPayload, ViewTask, ViewTaskChange, TaskChanges, TaskListQuery, TaskSearchResult, TaskStats, StatusQuery, BulkCreateTasksPayload, UpdateTasksStatusPayload, ClaimTasksPayload, BulkTaskResult
 from schemas.user import User
 from services.auth import get_current_user
+from services.export import MEDIA_TYPES, stream_export
+from services.fast_json import FastJSONResponse, view_columns, page_response
+from services.pagination import PageSize, decode_cursor, encode_cursor, paginate
+from services.response_cache import conditional_response, not_modified, version_etag
+from services.task_claim import claim_tasks
+from services.task_filter import filter_tasks, sort_key
+from services.task_feed import stream_feed, task_event, task_feed
+from services.task_revision import bump_task_revision, get_task_revision, lock_tasks
+from services.task_search import search_user_tasks
+from services.task_stats import get_task_stats
 
 router = APIRouter(prefix="/tasks", tags=["Tasks"])
 
 
-@router.get("", response_model=list[ViewTask], status_code=status.HTTP_200_OK)
-async def get_tasks(current_user: Annotated[User, Depends(get_current_user)], db: Session = Depends(get_session)):
-    return db.query(Task).filter_by(user_id=current_user['id']).all()
+# Highest priority first unless `sort` says otherwise; `id` breaks ties so the keyset
+# is unique. REMOVED tasks are left out unless asked for by status.
+# Polls with a current If-None-Match cost one primary-key lookup and get an empty 304.
+@router.get("", response_model=Page[ViewTask], status_code=status.HTTP_200_OK)
+async def get_tasks(request: Request, current_user: Annotated[User, Depends(get_current_user)], params: Annotated[TaskListQuery, Query()], db: AsyncSession = Depends(get_read_session)):
+    revision = await get_task_revision(db, current_user['id'])
+    etag = version_etag("tasks", current_user['id'], revision, params.model_dump_json())
+    if response := not_modified(request, etag):
+        return response
+
+    key = sort_key(params)
+    # The cursor needs the sort column, which the view may not show.
+    shown = key.column.key in ViewTask.model_fields
+    query = select(*view_columns(ViewTask, Task), *([] if shown else [key.column])).filter_by(user_id=current_user['id'])
+    query = filter_tasks(query, params, params.cursor)
+
+    result = await db.execute(query.limit(params.limit + 1))
+    page = paginate(result.mappings().all(), params.limit, lambda task: (task[key.column.key], task["id"]))
+    return conditional_response(request, page_response(page, None if shown else ViewTask.model_fields).body, etag)
+
+
+# Delta sync: every task written since the cursor, removals included (as status REMOVED).
+# The cursor is the (revision, id) of the last change returned, so a sync reads
+# ix_task_user_id_revision_id from that point on and costs what has changed.
+@router.get("/changes", response_model=TaskChanges, status_code=status.HTTP_200_OK)
+async def get_task_changes(current_user: Annotated[User, Depends(get_current_user)], since: Optional[str] = None, limit: int = PageSize, db: AsyncSession = Depends(get_read_session)):
+    query = (
+        select(*view_columns(ViewTaskChange, Task), Task.revision)
+        .filter(Task.user_id == current_user['id'])
+        .order_by(Task.revision, Task.id)
+    )
+    if since:
+        revision, task_id = decode_cursor(since, int, UUID)
+        query = query.filter(tuple_(Task.revision, Task.id) > (revision, task_id))
+
+    result = await db.execute(query.limit(limit + 1))
+    rows = result.mappings().all()
+    items = rows[:limit]
+    return FastJSONResponse({
+        "items": [{name: row[name] for name in ViewTaskChange.model_fields} for row in items],
+        "cursor": encode_cursor(items[-1]["revision"], items[-1]["id"]) if items else since,
+        "has_more": len(rows) > limit,
+    })
+
+
+# Counts by status for dashboards, from counters the database keeps up to date in
+# the same transaction as every task write: a few rows per user, however many tasks.
+@router.get("/stats", response_model=TaskStats, status_code=status.HTTP_200_OK)
+async def task_stats(request: Request, current_user: Annotated[User, Depends(get_current_user)], scope: Literal["user", "company"] = "user", db: AsyncSession = Depends(get_read_session)):
+    if scope == "company" and not current_user['is_admin']:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Permission denied")
+
+    if scope == "company":
+        stats = await get_task_stats(db, company_id=current_user['company_id'])
+    else:
+        stats = await get_task_stats(db, user_id=current_user['id'])
+    return conditional_response(request, FastJSONResponse(stats).body)
+
+
+# Every word of `q` (3 characters or more) must start a word of the summary or
+# description; the best `limit` matches are returned, summary matches first.
+@router.get("/search", response_model=list[TaskSearchResult], status_code=status.HTTP_200_OK)
+async def search_tasks(
+    current_user: Annotated[User, Depends(get_current_user)],
+    q: str = Query(min_length=1, max_length=200),
+    statuses: Optional[list[StatusQuery]] = Query(None, alias="status"),
+    min_priority: Optional[int] = Query(None, ge=0),
+    max_priority: Optional[int] = Query(None, ge=0),
+    limit: int = PageSize,
+    db: AsyncSession = Depends(get_read_session),
+):
+    tasks = await search_user_tasks(db, current_user['id'], q, statuses, min_priority, max_priority, limit)
+    return FastJSONResponse(tasks)
 
 
 @router.post("/create", response_model=ViewTask, status_code=status.HTTP_201_CREATED)
-async def create_task(payload: CreateTaskPayload, current_user: Annotated[User, Depends(get_current_user)], db: Session = Depends(get_session)):
+async def create_task(payload: CreateTaskPayload, current_user: Annotated[User, Depends(get_current_user)], db: AsyncSession = Depends(get_session)):
     task = Task(**payload.model_dump())
     task.status = Status.TODO
     task.user_id = current_user['id']
+    task.revision = await bump_task_revision(db, current_user['id'])
 
     db.add(task)
-    db.commit()
-    db.refresh(task)
+    await db.commit()
+    await db.refresh(task)
+    await task_feed.publish("created", [task_event(task)], current_user['id'], current_user['company_id'])
     return task
+
+
+# One multi-row INSERT; rows whose summary is already taken are skipped and reported as conflicts.
+@router.post("/bulk", response_model=list[BulkTaskResult], status_code=status.HTTP_200_OK)
+async def create_tasks_bulk(payload: BulkCreateTasksPayload, current_user: Annotated[User, Depends(get_current_user)], db: AsyncSession = Depends(get_session)):
+    revision = await bump_task_revision(db, current_user['id'])
+    rows = [
+        {**item.model_dump(), "status": Status.TODO, "user_id": current_user['id'], "revision": revision}
+        for item in payload
+    ]
+    result = await db.execute(
+        insert(Task)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=[Task.summary])
+        .returning(Task.id, Task.summary, Task.description, Task.priority, Task.status, Task.user_id)
+    )
+    created = {row.summary: row for row in result}
+    await db.commit()
+    if created:
+        await task_feed.publish("created", [task_event(row) for row in created.values()], current_user['id'], current_user['company_id'])
+
+    # A summary repeated within the batch is created once, by its first occurrence.
+    results = []
+    for index, item in enumerate(payload):
+        task = created.pop(item.summary, None)
+        results.append({"index": index, "result": "created" if task else "conflict", "task": task})
+    return results
+
+
+@router.patch("/status", response_model=list[BulkTaskResult], status_code=status.HTTP_200_OK)
+async def update_tasks_status(payload: UpdateTasksStatusPayload, current_user: Annotated[User, Depends(get_current_user)], db: AsyncSession = Depends(get_session)):
+    await lock_tasks(db, current_user['id'], payload.ids)
+    revision = await bump_task_revision(db, current_user['id'])
+    result = await db.execute(
+        update(Task)
+        .where(Task.id.in_(payload.ids), Task.user_id == current_user['id'])
+        .values(status=payload.status, revision=revision)
+        .returning(Task.id, Task.summary, Task.description, Task.priority, Task.status, Task.user_id)
+    )
+    updated = {row.id: row for row in result}
+    await db.commit()
+    if updated:
+        await task_feed.publish("updated", [task_event(row) for row in updated.values()], current_user['id'], current_user['company_id'])
+
+    return [
+        {"index": index, "result": "updated", "task": updated[task_id]} if task_id in updated
+        else {"index": index, "result": "not_found"}
+        for index, task_id in enumerate(payload.ids)
+    ]
+
+
+# Work-queue style: take the highest priority TODO tasks, marked IN_PROGRESS, in one
+# round trip. Concurrent workers never get the same task; an empty list means
+# nothing could be claimed just now, so poll again after a pause.
+@router.post("/claim", response_model=list[ViewTask], status_code=status.HTTP_200_OK)
+async def claim_next_tasks(payload: ClaimTasksPayload, current_user: Annotated[User, Depends(get_current_user)], db: AsyncSession = Depends(get_session)):
+    if payload.scope == "company" and not current_user['is_admin']:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Permission denied")
+
+    if payload.scope == "company":
+        claimed = await claim_tasks(db, payload.limit, company_id=current_user['company_id'])
+    else:
+        claimed = await claim_tasks(db, payload.limit, user_id=current_user['id'])
+    await db.commit()
+
+    owners = {}
+    for task in claimed:
+        owners.setdefault(task.user_id, []).append(task_event(task))
+    for user_id, tasks in owners.items():
+        await task_feed.publish("updated", tasks, user_id, current_user['company_id'])
+    return FastJSONResponse([task_event(task) for task in claimed])
+
+
+# Live task events as server-sent events, instead of polling GET /tasks: "created"
+# and "updated" carry the affected tasks, "resync" means events were missed and
+# the client should catch up from GET /tasks/changes, then reconnect.
+@router.get("/feed")
+async def task_feed_events(current_user: Annotated[User, Depends(get_current_user)], scope: Literal["user", "company"] = "user"):
+    if scope == "company" and not current_user['is_admin']:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Permission denied")
+
+    topic = f"company:{current_user['company_id']}" if scope == "company" else f"user:{current_user['id']}"
+    return StreamingResponse(
+        stream_feed(task_feed, topic),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# Admins export every task in their company; everyone else exports their own.
+@router.get("/export")
+async def export_tasks(current_user: Annotated[User, Depends(get_current_user)], format: Literal["ndjson", "csv"] = "ndjson"):
+    query = select(Task.id, Task.summary, Task.description, Task.status, Task.priority, Task.user_id)
+    if current_user['is_admin']:
+        query = query.join(User, Task.user_id == User.id).filter(User.company_id == current_user['company_id'])
+    else:
+        query = query.filter(Task.user_id == current_user['id'])
+
+    return StreamingResponse(
+        stream_export(query, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename=tasks.{format}"},
+    )
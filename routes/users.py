@@ -1,69 +1,159 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
-from typing import Annotated
+from typing import Annotated, Optional
 
-from database import get_session
+from database import get_session, get_read_session
 from schemas.user import User
 from schemas.company import Company
-from models.user import ViewUser, UserCreate
-from services.auth import hash_password, get_current_user
+from schemas.task import Task
+from models.user import ViewUser, UserCreate, BulkUserResult
+from models.task import ViewTask
+from models.page import Page
+from services.auth import hash_password_async, hash_passwords_async, get_current_user
 from services.logger import logger
+from services.pagination import PageSize, decode_cursor, paginate
+from services.fast_json import FastJSONResponse, view_columns, page_response
+from services.response_cache import conditional_response, not_modified, version_etag
+from services.task_filter import ACTIVE
+from services.user_import import IMPORT_BATCH_SIZE, OPENAPI_REQUEST_BODY, parse_users
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
 
-@router.get("", response_model=list[ViewUser])
-async def get_users(current_user: Annotated[User, Depends(get_current_user)], db: Session = Depends(get_session)):
-    if current_user['is_superuser']:
-        return db.query(User).all()
-    elif current_user['is_admin']:
-        return db.query(User).filter(User.company_id == current_user["company_id"])
-    else:
-        return HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+@router.get("", response_model=Page[ViewUser])
+async def get_users(current_user: Annotated[User, Depends(get_current_user)], cursor: Optional[str] = None, limit: int = PageSize, db: AsyncSession = Depends(get_read_session)):
+    if not current_user['is_superuser'] and not current_user['is_admin']:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+
+    # Usernames are unique, so they are a complete keyset on their own.
+    query = select(*view_columns(ViewUser, User)).order_by(User.username)
+    if not current_user['is_superuser']:
+        query = query.filter(User.company_id == current_user["company_id"])
+
+    if cursor:
+        username, = decode_cursor(cursor, str)
+        query = query.filter(User.username > username)
+
+    result = await db.execute(query.limit(limit + 1))
+    return page_response(paginate(result.mappings().all(), limit, lambda user: (user["username"],)))
 
 
 # Can't create superuser account
 @router.post("", response_model=ViewUser)
-async def create_user(payload: UserCreate, current_user: Annotated[User, Depends(get_current_user)], db: Session = Depends(get_session)):
+async def create_user(payload: UserCreate, current_user: Annotated[User, Depends(get_current_user)], db: AsyncSession = Depends(get_session)):
     if not current_user['is_admin']:
-        return HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Permission denied")
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Permission denied")
 
-    company = (
-        db.query(Company)
+    company = await db.scalar(
+        select(Company)
         .filter(Company.id == current_user['company_id'])
-        .first()
     )
 
     if not company:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Company not found")
 
+    # Hashed outside the try block so a busy password pool surfaces as 503, not 500.
+    hashed_password = await hash_password_async(payload.password)
+
     try:
         new_admin = User(
             username=payload.username,
             first_name=payload.first_name,
             last_name=payload.last_name,
-            password=hash_password(payload.password),
+            password=hashed_password,
             is_admin=payload.is_admin,
             is_active=True,
             is_superuser=False,
             company_id=company.id
         )
         db.add(new_admin)
-        db.commit()
-        db.refresh(new_admin)
+        await db.commit()
+        await db.refresh(new_admin)
         return new_admin
     except IntegrityError:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Username already exists")
-    except Exception as e:
-        logger(e)
+    except Exception:
+        logger.exception("Failed to create user", extra={"username": payload.username})
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Server Error")
 
 
-@router.get("/{username}/tasks")
-async def get_user_tasks_by_id(username: str, current_user: Annotated[User, Depends(get_current_user)], db: Session = Depends(get_session)):
-    user = db.query(User).filter(User.username == username).first()
-    if not current_user["is_admin"] or user.company_id is not current_user.company_id:
+# Onboarding a company: a JSON array or a CSV file of users. Usernames that are
+# already taken are skipped before hashing and reported per row as conflicts;
+# the rest are hashed across the password pool and inserted in multi-row batches.
+@router.post("/bulk", response_model=list[BulkUserResult], openapi_extra=OPENAPI_REQUEST_BODY)
+async def create_users_bulk(request: Request, current_user: Annotated[User, Depends(get_current_user)], db: AsyncSession = Depends(get_session)):
+    if not current_user['is_admin']:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Permission denied")
+
+    payload = await parse_users(request)
+
+    company_id = await db.scalar(select(Company.id).filter(Company.id == current_user['company_id']))
+    if not company_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Company not found")
+
+    taken = set(await db.scalars(select(User.username).filter(User.username.in_({item.username for item in payload}))))
+    # A username repeated within the import is created once, by its first occurrence.
+    new = {}
+    for item in payload:
+        if item.username not in taken:
+            new.setdefault(item.username, item)
+    new = list(new.values())
+    hashed_passwords = await hash_passwords_async([item.password for item in new])
+
+    rows = [
+        {
+            "username": item.username,
+            "first_name": item.first_name,
+            "last_name": item.last_name,
+            "password": hashed_password,
+            "is_admin": item.is_admin,
+            "is_active": True,
+            "is_superuser": False,
+            "company_id": company_id,
+        }
+        for item, hashed_password in zip(new, hashed_passwords)
+    ]
+    created = {}
+    for start in range(0, len(rows), IMPORT_BATCH_SIZE):
+        # ON CONFLICT covers usernames taken since the lookup above.
+        result = await db.execute(
+            insert(User)
+            .values(rows[start:start + IMPORT_BATCH_SIZE])
+            .on_conflict_do_nothing(index_elements=[User.username])
+            .returning(*view_columns(ViewUser, User))
+        )
+        created.update((row.username, row) for row in result)
+    await db.commit()
+
+    results = []
+    for index, item in enumerate(payload):
+        user = created.pop(item.username, None)
+        results.append({"index": index, "result": "created" if user else "conflict", "user": user})
+    return results
+
+
+# The user row is read first: it carries the task revision, so an unchanged
+# list is answered with a 304 before any task is loaded.
+@router.get("/{username}/tasks", response_model=list[ViewTask])
+async def get_user_tasks_by_id(request: Request, username: str, current_user: Annotated[User, Depends(get_current_user)], db: AsyncSession = Depends(get_read_session)):
+    result = await db.execute(select(User.id, User.company_id, User.task_revision).filter(User.username == username))
+    user = result.one_or_none()
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    if not current_user["is_admin"] or str(user.company_id) != current_user["company_id"]:
         raise HTTPException(401, "Permission denied")
 
-    return user.tasks if user.tasks else []
+    # "active": REMOVED tasks were once listed, so ETags from then must not match.
+    etag = version_etag("user-tasks", "active", user.id, user.task_revision)
+    if response := not_modified(request, etag):
+        return response
+
+    result = await db.execute(
+        select(*view_columns(ViewTask, Task))
+        .filter(Task.user_id == user.id, ACTIVE)
+        .order_by(Task.priority.desc(), Task.id.desc())
+    )
+    return conditional_response(request, FastJSONResponse(result.mappings().all()).body, etag)
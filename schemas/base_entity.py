@@ -1,4 +1,4 @@
-from sqlalchemy import Column, UUID, Time
+from sqlalchemy import Column, UUID, DateTime, func
 import uuid
 from sqlalchemy.orm import declarative_base
 
@@ -7,5 +7,5 @@ Base = declarative_base()
 
 class BaseEntity:
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    created_at = Column(Time, nullable=False, default="now()")
-    updated_at = Column(Time, nullable=False, default="now()", onupdate="now()")
+    created_at = Column(DateTime(timezone=True), nullable=False, default=func.now(), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=func.now(), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, Integer, String
+
+from .base_entity import Base
+
+
+class CacheCounter(Base):
+    """A ResponseCache counter (namespace versions), shared by every worker through the database."""
+    __tablename__ = "cache_counters"
+
+    key = Column(String, primary_key=True)
+    value = Column(Integer, nullable=False, default=0, server_default="0")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer
+from sqlalchemy import Column, String, Integer, Index
 from sqlalchemy.orm import relationship
 
 from .base_entity import Base, BaseEntity
@@ -6,9 +6,12 @@ from .base_entity import Base, BaseEntity
 
 class Company(Base, BaseEntity):
     __tablename__ = "companies"
+    __table_args__ = (
+        Index("ix_companies_name_id", "name", "id"),
+    )
 
     name = Column(String, nullable=False)
     description = Column(String)
     rating = Column(Integer, nullable=False)
 
-    users = relationship("User")
+    users = relationship("User", back_populates="company", lazy="raise")
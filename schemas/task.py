@@ -1,4 +1,6 @@
-from sqlalchemy import Column, String, ForeignKey, UUID, Integer, Enum
+from sqlalchemy import DDL, Column, String, ForeignKey, UUID, Integer, Enum, Index, Text, event, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 import enum
 
 from .base_entity import Base, BaseEntity
@@ -13,10 +15,61 @@ class Status(enum.Enum):
 
 class Task(Base, BaseEntity):
     __tablename__ = "task"
+    __table_args__ = (
+        Index("ix_task_user_id_priority_id", "user_id", "priority", "id"),
+        Index("ix_task_user_id_status_priority", "user_id", "status", "priority"),
+        Index(
+            "ix_task_active_user_id_priority_id", "user_id", "priority", "id",
+            postgresql_where=text("status != 'REMOVED'"),
+        ),
+        Index("ix_task_user_id_revision_id", "user_id", "revision", "id"),
+        # GET /tasks sorted by time; REMOVED tasks are only listed on request.
+        Index(
+            "ix_task_active_user_id_created_at_id", "user_id", "created_at", "id",
+            postgresql_where=text("status != 'REMOVED'"),
+        ),
+        Index(
+            "ix_task_active_user_id_updated_at_id", "user_id", "updated_at", "id",
+            postgresql_where=text("status != 'REMOVED'"),
+        ),
+        Index("ix_task_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     summary = Column(String, nullable=False, unique=True)
     description = Column(String, nullable=False)
     status = Column(Enum(Status), nullable=False)
     priority = Column(Integer, nullable=False)
+    # users.task_revision of the write that last touched this task; the delta-sync watermark.
+    revision = Column(Integer, default=0, server_default="0", nullable=False)
+
+    # Summary and description words, kept up to date by the task_search_vector_update
+    # trigger on PostgreSQL. Other databases leave it empty and search without it.
+    search_vector = deferred(Column(TSVECTOR().with_variant(Text(), "sqlite")))
 
     user_id = Column(UUID(), ForeignKey("users.id"))
+    user = relationship("User", back_populates="tasks", lazy="raise")
+
+
+# 'simple' configuration: no stemming or stop words, so prefixes typed by the
+# user match the words as written, in any language. Summary words rank higher.
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce({row}summary, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce({row}description, '')), 'B')"
+)
+
+# Also created by migration e2b7c5a9d4f1; this covers metadata.create_all.
+event.listen(Task.__table__, "after_create", DDL(f"""
+CREATE FUNCTION task_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := {SEARCH_VECTOR.format(row="NEW.")};
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER task_search_vector_update
+BEFORE INSERT OR UPDATE OF summary, description ON task
+FOR EACH ROW EXECUTE FUNCTION task_search_vector_update();
+""").execute_if(dialect="postgresql"))
+event.listen(Task.__table__, "before_drop", DDL(
+    "DROP FUNCTION IF EXISTS task_search_vector_update() CASCADE"
+).execute_if(dialect="postgresql"))
@@ -0,0 +1,57 @@
+from sqlalchemy import DDL, Column, ForeignKey, UUID, Integer, Enum, event
+
+from .base_entity import Base
+from .task import Task, Status
+
+
+class TaskCount(Base):
+    """How many of a user's tasks have a status, kept by the task_counts_update triggers.
+
+    Rows are per user, never per company: every task write already holds its
+    owner's users row lock (see bump_task_revision), so a user's counters add
+    no contention, where a company-wide row would serialize the whole company.
+    """
+    __tablename__ = "task_counts"
+
+    user_id = Column(UUID(), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    status = Column(Enum(Status), primary_key=True)
+    count = Column(Integer, nullable=False, default=0, server_default="0")
+
+
+# Adds up the +1/-1 per task row of one statement into a single upsert per
+# (user, status), in key order so concurrent statements lock rows alike.
+APPLY_COUNT_CHANGES = """
+    INSERT INTO task_counts AS counts (user_id, status, count)
+    SELECT user_id, status, sum(delta) FROM ({changes}) AS changes
+    WHERE user_id IS NOT NULL
+    GROUP BY user_id, status
+    HAVING sum(delta) != 0
+    ORDER BY user_id, status
+    ON CONFLICT (user_id, status) DO UPDATE SET count = counts.count + excluded.count;
+"""
+NEW_ROWS = "SELECT user_id, status, 1 AS delta FROM new_tasks"
+OLD_ROWS = "SELECT user_id, status, -1 AS delta FROM old_tasks"
+
+# Statement-level, with transition tables: a 1000-row bulk insert is one upsert, not 1000.
+# Also created by migration a7e3c9d5f8b2; this covers metadata.create_all.
+event.listen(Task.__table__, "after_create", DDL(f"""
+CREATE FUNCTION task_counts_update() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN {APPLY_COUNT_CHANGES.format(changes=NEW_ROWS)}
+    ELSIF TG_OP = 'DELETE' THEN {APPLY_COUNT_CHANGES.format(changes=OLD_ROWS)}
+    ELSE {APPLY_COUNT_CHANGES.format(changes=f"{NEW_ROWS} UNION ALL {OLD_ROWS}")}
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER task_counts_insert AFTER INSERT ON task
+REFERENCING NEW TABLE AS new_tasks FOR EACH STATEMENT EXECUTE FUNCTION task_counts_update();
+CREATE TRIGGER task_counts_update AFTER UPDATE ON task
+REFERENCING OLD TABLE AS old_tasks NEW TABLE AS new_tasks FOR EACH STATEMENT EXECUTE FUNCTION task_counts_update();
+CREATE TRIGGER task_counts_delete AFTER DELETE ON task
+REFERENCING OLD TABLE AS old_tasks FOR EACH STATEMENT EXECUTE FUNCTION task_counts_update();
+""").execute_if(dialect="postgresql"))
+event.listen(Task.__table__, "before_drop", DDL(
+    "DROP FUNCTION IF EXISTS task_counts_update() CASCADE"
+).execute_if(dialect="postgresql"))
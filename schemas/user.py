@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, ForeignKey, UUID
+from sqlalchemy import Column, String, Boolean, ForeignKey, UUID, Index, Integer
 from sqlalchemy.orm import relationship
 
 from .base_entity import Base, BaseEntity
@@ -6,6 +6,9 @@ from .base_entity import Base, BaseEntity
 
 class User(Base, BaseEntity):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_company_id_username", "company_id", "username"),
+    )
 
     username = Column(String, nullable=False, unique=True)
     first_name = Column(String, nullable=False)
@@ -14,6 +17,11 @@ class User(Base, BaseEntity):
     is_active = Column(Boolean, default=True, nullable=False)
     is_admin = Column(Boolean, default=False, nullable=False)
     is_superuser = Column(Boolean, default=False, nullable=False)
+    # Bumped on every write to this user's tasks; the ETag of their task lists.
+    task_revision = Column(Integer, default=0, server_default="0", nullable=False)
 
     company_id = Column(UUID(), ForeignKey("companies.id"))
-    tasks = relationship("Task")
+    # lazy="raise": every query must choose its own loader (selectinload/joinedload)
+    # instead of silently issuing one SELECT per row.
+    company = relationship("Company", back_populates="users", lazy="raise")
+    tasks = relationship("Task", back_populates="user", lazy="raise")
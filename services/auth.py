@@ -1,32 +1,172 @@
+import asyncio
+import hashlib
+import multiprocessing
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from typing import Annotated
-from fastapi import Depends
+from fastapi import Depends, HTTPException, status
 from passlib.context import CryptContext
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from jose import jwt
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from jose import jwt, JWTError
 
 from schemas.user import User
-from settings import jwt_secret, jwt_algorithm
+from services.logger import user_id_var
+from services.metrics import (
+    password_pool_in_flight, password_pool_queue_depth, password_pool_rejected,
+    token_cache_hits, token_cache_misses, token_cache_size,
+)
+from settings import (
+    jwt_secret, jwt_algorithm, password_pool_workers, password_pool_queue_size,
+    token_cache_max_size, token_cache_ttl,
+)
 
 pw_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
 
+class PasswordPoolBusy(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many password operations in progress",
+            headers={"Retry-After": "1"},
+        )
+
+
+class PasswordPool:
+    """Runs bcrypt in worker processes so it never holds the event loop.
+
+    At most `max_workers + max_queued` jobs are accepted at once; past that
+    `PasswordPoolBusy` is raised so a login burst is shed instead of queued.
+    """
+
+    def __init__(self, max_workers: int, max_queued: int):
+        self.max_workers = max_workers
+        self.limit = max_workers + max_queued
+        self.in_flight = 0
+        self.executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+    @property
+    def queue_depth(self) -> int:
+        return max(0, self.in_flight - self.max_workers)
+
+    async def run(self, fn, *args):
+        if self.in_flight >= self.limit:
+            password_pool_rejected.inc()
+            raise PasswordPoolBusy()
+
+        self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+        finally:
+            self.in_flight -= 1
+
+
+password_pool = PasswordPool(password_pool_workers, password_pool_queue_size)
+password_pool_in_flight.set_function(lambda: password_pool.in_flight)
+password_pool_queue_depth.set_function(lambda: password_pool.queue_depth)
+
+
+class TokenCache:
+    """Bounded LRU of verified JWT claims, keyed by the SHA-256 digest of the token.
+
+    An entry lives for `ttl` seconds or until the token's own `exp`, whichever
+    comes first. Only touched from the event loop, so no locking.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries: OrderedDict[bytes, tuple[dict, float]] = OrderedDict()
+
+    @staticmethod
+    def key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> dict | None:
+        key = self.key(token)
+        entry = self.entries.get(key)
+        if entry is None or entry[1] <= time.time():
+            self.entries.pop(key, None)
+            token_cache_misses.inc()
+            return None
+
+        self.entries.move_to_end(key)
+        token_cache_hits.inc()
+        return entry[0]
+
+    def put(self, token: str, claims: dict):
+        expires_at = time.time() + self.ttl
+        if "exp" in claims:
+            expires_at = min(expires_at, float(claims["exp"]))
+
+        key = self.key(token)
+        self.entries[key] = (claims, expires_at)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def invalidate(self, token: str):
+        self.entries.pop(self.key(token), None)
+
+    def invalidate_user(self, user_id: str):
+        for key in [key for key, (claims, _) in self.entries.items() if claims.get("id") == user_id]:
+            del self.entries[key]
+
+    def clear(self):
+        self.entries.clear()
+
+
+token_cache = TokenCache(token_cache_max_size, token_cache_ttl)
+token_cache_size.set_function(lambda: len(token_cache.entries))
+
+
 def hash_password(password: str) -> str:
     return pw_context.hash(password)
 
 
+def hash_passwords(passwords: list[str]) -> list[str]:
+    return [pw_context.hash(password) for password in passwords]
+
+
 def verfiy_password(plain_password: str, hashed_password: str):
     return pw_context.verify(secret=plain_password, hash=hashed_password)
 
 
-async def sign_in(username: str, password: str, db: Session):
-    user = db.query(User).filter(User.username == username).first()
+async def hash_password_async(password: str) -> str:
+    return await password_pool.run(hash_password, password)
+
+
+# Small chunks, at most one per worker at a time: a bulk import uses every
+# worker, but a login waits for one chunk at most instead of the whole import.
+HASH_CHUNK_SIZE = 8
+
+
+async def hash_passwords_async(passwords: list[str]) -> list[str]:
+    slots = asyncio.Semaphore(password_pool.max_workers)
+
+    async def hash_chunk(chunk):
+        async with slots:
+            return await password_pool.run(hash_passwords, chunk)
+
+    chunks = [passwords[start:start + HASH_CHUNK_SIZE] for start in range(0, len(passwords), HASH_CHUNK_SIZE)]
+    return [hashed for chunk in await asyncio.gather(*map(hash_chunk, chunks)) for hashed in chunk]
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_pool.run(verfiy_password, plain_password, hashed_password)
+
+
+async def sign_in(username: str, password: str, db: AsyncSession):
+    user = await db.scalar(select(User).filter(User.username == username))
 
     if not user:
         return None
-    return user if verfiy_password(password, user.password) else None
+    return user if await verify_password_async(password, user.password) else None
 
 
 def create_access_token(user: User):
@@ -43,5 +183,20 @@ def create_access_token(user: User):
     return jwt.encode(claims, jwt_secret, algorithm=jwt_algorithm)
 
 
-def get_current_user(token: Annotated[str, Depends(oauth2_scheme)]):
-    return jwt.decode(token, key=jwt_secret, algorithms=jwt_algorithm)
+# async so the cache lookup runs on the event loop instead of a threadpool hop.
+async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)]):
+    claims = token_cache.get(token)
+    if claims is None:
+        try:
+            claims = jwt.decode(token, key=jwt_secret, algorithms=jwt_algorithm)
+        except JWTError:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        token_cache.put(token, claims)
+
+    user_id_var.set(claims.get("id"))
+    # A copy, so a handler can never modify the cached claims.
+    return dict(claims)
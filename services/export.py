@@ -0,0 +1,56 @@
+import csv
+import io
+import json
+
+from database import SessionLocal
+
+
+EXPORT_BATCH_SIZE = 1000
+EXPORT_COLUMNS = ("id", "summary", "description", "status", "priority", "user_id")
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _values(row) -> list:
+    return [
+        str(row.id),
+        row.summary,
+        row.description,
+        row.status.name,
+        row.priority,
+        str(row.user_id) if row.user_id else None,
+    ]
+
+
+def to_ndjson(rows) -> str:
+    return "".join(json.dumps(dict(zip(EXPORT_COLUMNS, _values(row)))) + "\n" for row in rows)
+
+
+def to_csv(rows) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(_values(row) for row in rows)
+    return buffer.getvalue()
+
+
+def csv_header() -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(EXPORT_COLUMNS)
+    return buffer.getvalue()
+
+
+async def stream_export(query, format: str):
+    """Stream `query` rows through a server-side cursor, one chunk per fetched batch.
+
+    The response outlives request-scoped dependencies, so the session is opened here.
+    """
+    encode = to_csv if format == "csv" else to_ndjson
+    if format == "csv":
+        yield csv_header()
+
+    async with SessionLocal() as db:
+        result = await db.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for rows in result.partitions():
+            yield encode(rows)
@@ -0,0 +1,30 @@
+import orjson
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+
+class FastJSONResponse(ORJSONResponse):
+    """orjson rendering that also accepts driver types orjson does not know, like asyncpg's UUID."""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+
+def view_columns(view: type[BaseModel], entity, **overrides) -> list:
+    """Core columns of `entity` named after the fields of a models/* view, in field order.
+
+    Selecting these instead of the entity skips ORM instances and the identity map;
+    `overrides` replaces a column, e.g. to cast it to the view's type.
+    """
+    return [overrides.get(name, getattr(entity, name)) for name in view.model_fields]
+
+
+def page_response(page: dict, fields=None) -> FastJSONResponse:
+    """Render a `paginate` page of RowMappings straight to JSON, skipping per-row model validation.
+
+    `fields` keeps only those keys, for rows that also carry a sort key the view does not show.
+    """
+    return FastJSONResponse({
+        "items": [dict(row) if fields is None else {name: row[name] for name in fields} for row in page["items"]],
+        "next_cursor": page["next_cursor"],
+    })
@@ -1,6 +1,233 @@
+import atexit
+import logging
+import queue
+import random
+import sys
+import threading
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
 
+import orjson
 
-def logger(e: Exception):
-    print("============== LOG ERROR ==================")
-    print(e)
-    print("============ END LOG ERROR ================")
+from services.metrics import log_queue_depth, log_records_dropped, log_records_sampled_out
+from settings import db_echo, log_level, log_queue_size, log_batch_size, log_sample_rates
+
+
+request_id_var: ContextVar[str | None] = ContextVar("request_id", default=None)
+user_id_var: ContextVar[str | None] = ContextVar("user_id", default=None)
+
+# Attributes every LogRecord has; anything else came in through `extra=` and is logged as a field.
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+logger = logging.getLogger("todos")
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line, with the request and user the record belongs to."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+            "user_id": getattr(record, "user_id", None),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and key not in entry:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return orjson.dumps(entry, default=str).decode()
+
+
+class CorrelationFilter(logging.Filter):
+    """Stamp records with the request and user ids while still on the request path."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        record.user_id = user_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a fraction of the records below WARNING from noisy loggers.
+
+    `rates` maps a logger name to the fraction kept; it also applies to the
+    logger's children. Warnings and errors are never sampled out.
+    """
+
+    def __init__(self, rates: dict[str, float]):
+        super().__init__()
+        self.rates = rates
+
+    def rate_for(self, name: str) -> float:
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition(".")[0]
+        return 1.0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        if random.random() < self.rate_for(record.name):
+            return True
+        log_records_sampled_out.labels(record.name).inc()
+        return False
+
+
+class DroppingQueueHandler(logging.Handler):
+    """Hand records to the writer thread without ever blocking the caller.
+
+    When the queue is full the record is dropped and counted instead.
+    """
+
+    def __init__(self, records: queue.Queue):
+        super().__init__()
+        self.records = records
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            # Format now: the message arguments and the exception belong to the caller's frame.
+            record.msg = record.getMessage()
+            record.args = None
+            if record.exc_info:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+                record.exc_info = None
+            self.records.put_nowait(record)
+        except queue.Full:
+            log_records_dropped.inc()
+        except Exception:
+            self.handleError(record)
+
+
+class LogWriter:
+    """Background thread that drains the queue and writes records in batches."""
+
+    _stop = object()
+
+    def __init__(self, records: queue.Queue, stream, formatter: logging.Formatter, batch_size: int):
+        self.records = records
+        self.stream = stream
+        self.formatter = formatter
+        self.batch_size = batch_size
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name="log-writer", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if self.thread is None:
+            return
+        # Blocking put: everything queued before the sentinel still gets written.
+        self.records.put(self._stop)
+        self.thread.join()
+        self.thread = None
+
+    def run(self):
+        while True:
+            batch = [self.records.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.records.get_nowait())
+                except queue.Empty:
+                    break
+
+            stopping = batch[-1] is self._stop
+            if stopping:
+                batch.pop()
+            self.write(batch)
+            if stopping:
+                return
+
+    def write(self, batch: list[logging.LogRecord]):
+        if not batch:
+            return
+        lines = []
+        for record in batch:
+            try:
+                lines.append(self.formatter.format(record))
+            except Exception:
+                lines.append(orjson.dumps({"level": "ERROR", "message": "unformattable log record"}).decode())
+        try:
+            self.stream.write("\n".join(lines) + "\n")
+            self.stream.flush()
+        except Exception:
+            log_records_dropped.inc(len(lines))
+
+
+def parse_sample_rates(value: str) -> dict[str, float]:
+    """Parse `LOG_SAMPLE_RATES`, e.g. "sqlalchemy.engine=0.01,todos.access=0.1"."""
+    rates = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        name, _, rate = item.partition("=")
+        rates[name.strip()] = float(rate)
+    return rates
+
+
+_writer: LogWriter | None = None
+
+
+def configure_logging(stream=None) -> LogWriter:
+    """Route every logger through a bounded queue to a single JSON writer thread."""
+    global _writer
+    if _writer is not None:
+        return _writer
+
+    records = queue.Queue(maxsize=log_queue_size)
+    handler = DroppingQueueHandler(records)
+    handler.addFilter(CorrelationFilter())
+    handler.addFilter(SamplingFilter(parse_sample_rates(log_sample_rates)))
+
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(log_level)
+    # SQL echo goes through the queue too, instead of the stdout handler `echo=True` installs.
+    if db_echo:
+        logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO)
+    # Uvicorn installs its own stdout handlers before the app is imported.
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        logging.getLogger(name).handlers = []
+        logging.getLogger(name).propagate = True
+
+    log_queue_depth.set_function(records.qsize)
+
+    _writer = LogWriter(records, stream or sys.stdout, JSONFormatter(), log_batch_size)
+    _writer.start()
+    atexit.register(_writer.stop)
+    return _writer
+
+
+class RequestContextMiddleware:
+    """Give every request an id, taken from `X-Request-ID` if the caller sent one."""
+
+    header = b"x-request-id"
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = dict(scope["headers"]).get(self.header, b"").decode("latin-1")[:64] or uuid.uuid4().hex
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (self.header, request_id.encode("latin-1"))]
+            await send(message)
+
+        request_token = request_id_var.set(request_id)
+        user_token = user_id_var.set(None)
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(request_token)
+            user_id_var.reset(user_token)
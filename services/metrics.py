@@ -0,0 +1,64 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+
+db_pool_checkout_seconds = Histogram(
+    "db_pool_checkout_seconds",
+    "Time spent waiting for a connection from the pool",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+db_pool_checked_out = Gauge("db_pool_checked_out", "Connections currently checked out of the pool")
+db_pool_overflow = Counter("db_pool_overflow", "Checkouts that opened a connection beyond DB_POOL_SIZE")
+db_pool_timeouts = Counter("db_pool_timeouts", "Checkouts that gave up after DB_POOL_TIMEOUT")
+
+password_pool_in_flight = Gauge("password_pool_in_flight", "Password hash/verify jobs running or queued")
+password_pool_queue_depth = Gauge("password_pool_queue_depth", "Password hash/verify jobs waiting for a worker")
+password_pool_rejected = Counter("password_pool_rejected", "Password jobs rejected because the queue was full")
+
+token_cache_hits = Counter("token_cache_hits", "Bearer tokens served from the verified-token cache")
+token_cache_misses = Counter("token_cache_misses", "Bearer tokens that needed a full JWT decode")
+token_cache_size = Gauge("token_cache_size", "Entries in the verified-token cache")
+db_replica_up = Gauge("db_replica_up", "Whether a read replica is currently used (1) or skipped (0)", ["replica"])
+db_read_sessions = Counter("db_read_sessions", "Read-only sessions opened, by the database serving them", ["target"])
+
+http_requests_in_flight = Gauge("http_requests_in_flight", "HTTP requests currently being served")
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template and status",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+http_request_db_seconds = Histogram(
+    "http_request_db_seconds",
+    "Time spent executing SQL per HTTP request",
+    ["method", "route"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+http_request_size_bytes = Histogram(
+    "http_request_size_bytes",
+    "HTTP request body size",
+    ["method", "route"],
+    buckets=(0, 100, 1_000, 10_000, 100_000, 1_000_000),
+)
+http_response_size_bytes = Histogram(
+    "http_response_size_bytes",
+    "HTTP response body size",
+    ["method", "route"],
+    buckets=(0, 100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000),
+)
+
+log_queue_depth = Gauge("log_queue_depth", "Log records waiting for the writer thread")
+log_records_dropped = Counter("log_records_dropped", "Log records dropped because the queue was full")
+log_records_sampled_out = Counter("log_records_sampled_out", "Log records discarded by sampling", ["logger"])
+
+response_cache_hits = Counter("response_cache_hits", "Responses served from the response cache", ["namespace"])
+response_cache_misses = Counter("response_cache_misses", "Response cache lookups that had to query the database", ["namespace"])
+response_not_modified = Counter("response_not_modified", "Conditional GETs answered with 304 Not Modified", ["route"])
+
+task_feed_subscribers = Gauge("task_feed_subscribers", "Clients connected to the task feed")
+task_feed_events = Counter("task_feed_events", "Task events published to the feed", ["event"])
+task_feed_overflows = Counter("task_feed_overflows", "Feed clients told to resync because their buffer filled up")
+
+login_attempts_rejected = Counter("login_attempts_rejected", "Login attempts refused by the rate limiter, by the bucket that was empty", ["scope"])
+login_rate_limit_keys = Gauge("login_rate_limit_keys", "Login rate limit buckets held in this worker")
+
+task_counts_drift = Gauge("task_counts_drift", "(user, status) task counters that disagreed with the task table at the last consistency check")
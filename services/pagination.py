@@ -0,0 +1,36 @@
+import base64
+import json
+
+from fastapi import HTTPException, Query, status
+
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+PageSize = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+
+
+def encode_cursor(*values) -> str:
+    raw = json.dumps([str(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types) -> tuple:
+    """Decode a cursor from `encode_cursor`, converting each value with the matching type."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(types) or not all(isinstance(v, str) for v in values):
+            raise ValueError(cursor)
+        return tuple(cast(value) for cast, value in zip(types, values))
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def paginate(rows: list, limit: int, key) -> dict:
+    """Build a page from `limit + 1` fetched rows; the extra row only signals that more exist."""
+    if len(rows) <= limit:
+        return {"items": rows, "next_cursor": None}
+
+    items = rows[:limit]
+    return {"items": items, "next_cursor": encode_cursor(*key(items[-1]))}
@@ -0,0 +1,126 @@
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import NamedTuple
+
+from fastapi import HTTPException, status
+
+from services.metrics import login_attempts_rejected, login_rate_limit_keys
+from settings import (
+    login_rate_limit_url, login_rate_limit_max_keys,
+    login_username_burst, login_username_per_minute, login_ip_burst, login_ip_per_minute,
+)
+
+
+class Limit(NamedTuple):
+    burst: int
+    per_second: float
+
+
+class LoginRateLimited(HTTPException):
+    def __init__(self, retry_after: float):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+
+class BucketStore(ABC):
+    """Token buckets by key. A missing bucket is a full one."""
+
+    @abstractmethod
+    async def take(self, key: str, limit: Limit) -> float:
+        """Take one token; 0 if there was one, else the seconds until there will be"""
+
+
+class LocalBucketStore(BucketStore):
+    """In-process buckets, one set per worker, as (tokens, updated_at) tuples.
+
+    At most `max_keys` buckets are kept; the least recently used go first. An
+    evicted bucket comes back full, so eviction only ever forgives a client.
+    """
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self.buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    async def take(self, key: str, limit: Limit) -> float:
+        now = time.monotonic()
+        tokens, updated_at = self.buckets.get(key, (limit.burst, now))
+        tokens = min(limit.burst, tokens + (now - updated_at) * limit.per_second)
+
+        retry_after = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            retry_after = (1 - tokens) / limit.per_second
+
+        self.buckets[key] = (tokens, now)
+        self.buckets.move_to_end(key)
+        while len(self.buckets) > self.max_keys:
+            self.buckets.popitem(last=False)
+        return retry_after
+
+
+# Same algorithm as LocalBucketStore, atomic on the server and timed by its clock.
+_TAKE_SCRIPT = """
+local burst, rate = tonumber(ARGV[1]), tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = math.min(burst, (tonumber(bucket[1]) or burst) + (now - (tonumber(bucket[2]) or now)) * rate)
+local retry_after = 0
+if tokens >= 1 then tokens = tokens - 1 else retry_after = (1 - tokens) / rate end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000))
+return tostring(retry_after)
+"""
+
+
+class RedisBucketStore(BucketStore):
+    """Buckets shared by every worker. Needs the `redis` package, imported only when configured.
+
+    A bucket expires once it would have refilled, so idle keys cost nothing.
+    """
+
+    def __init__(self, url: str):
+        from redis.asyncio import Redis
+
+        self.redis = Redis.from_url(url)
+        self.script = self.redis.register_script(_TAKE_SCRIPT)
+
+    async def take(self, key: str, limit: Limit) -> float:
+        return float(await self.script(keys=[key], args=[limit.burst, limit.per_second]))
+
+
+class LoginRateLimiter:
+    """Throttle login attempts per client IP and per username.
+
+    The IP bucket stops one client trying many accounts; the username bucket
+    stops many clients (a botnet) trying one account. Both are checked before
+    the user is looked up or a password verified, so a rejected attempt costs
+    a dict update, not a query and a bcrypt round.
+    """
+
+    def __init__(self, store: BucketStore, username_limit: Limit, ip_limit: Limit):
+        self.store = store
+        self.limits = {"ip": ip_limit, "username": username_limit}
+
+    async def check(self, username: str, ip: str):
+        # IP first: a client already over its own limit does not drain the username's bucket.
+        for scope, key in (("ip", ip), ("username", username)):
+            retry_after = await self.store.take(f"login:{scope}:{key}", self.limits[scope])
+            if retry_after:
+                login_attempts_rejected.labels(scope).inc()
+                raise LoginRateLimited(retry_after)
+
+
+login_limiter = LoginRateLimiter(
+    RedisBucketStore(login_rate_limit_url) if login_rate_limit_url else LocalBucketStore(login_rate_limit_max_keys),
+    Limit(login_username_burst, login_username_per_minute / 60),
+    Limit(login_ip_burst, login_ip_per_minute / 60),
+)
+if isinstance(login_limiter.store, LocalBucketStore):
+    login_rate_limit_keys.set_function(lambda: len(login_limiter.store.buckets))
@@ -0,0 +1,92 @@
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+from services.metrics import (
+    http_requests_in_flight, http_request_duration_seconds, http_request_db_seconds,
+    http_request_size_bytes, http_response_size_bytes,
+)
+
+
+# SQL time of the current request, as a one-item list the engine events add to.
+request_db_time: ContextVar[list | None] = ContextVar("request_db_time", default=None)
+# ASGI scope of the current request; the router fills in "route" once it matches.
+request_scope: ContextVar[dict | None] = ContextVar("request_scope", default=None)
+
+
+def current_route() -> str | None:
+    """Template of the route serving the current request, e.g. `/users/{username}/tasks`."""
+    scope = request_scope.get()
+    route = scope.get("route") if scope is not None else None
+    return route.path if route is not None else None
+
+
+def instrument_engine(sync_engine):
+    """Add each statement's execution time to the current request's DB time."""
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        db_time = request_db_time.get()
+        if db_time is not None:
+            db_time[0] += elapsed
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording latency, status, body sizes and DB time per route.
+
+    Routes are labelled by their template (`/users/{username}/tasks`), so label
+    cardinality stays bounded; requests that match no route share "unmatched".
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_bytes = 0
+        response_bytes = 0
+        status = 500
+
+        async def counting_receive():
+            nonlocal request_bytes
+            message = await receive()
+            request_bytes += len(message.get("body", b""))
+            return message
+
+        async def counting_send(message):
+            nonlocal response_bytes, status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        db_time = [0.0]
+        token = request_db_time.set(db_time)
+        scope_token = request_scope.set(scope)
+        http_requests_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, counting_receive, counting_send)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_requests_in_flight.dec()
+            request_db_time.reset(token)
+            request_scope.reset(scope_token)
+
+            route = scope.get("route")
+            path = route.path if route is not None else "unmatched"
+            method = scope["method"]
+            http_request_duration_seconds.labels(method, path, str(status)).observe(elapsed)
+            http_request_db_seconds.labels(method, path).observe(db_time[0])
+            http_request_size_bytes.labels(method, path).observe(request_bytes)
+            http_response_size_bytes.labels(method, path).observe(response_bytes)
@@ -0,0 +1,213 @@
+import hashlib
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from fastapi import Request, Response
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from database import engine
+from schemas.cache_counter import CacheCounter
+from services.metrics import response_cache_hits, response_cache_misses, response_not_modified
+from settings import db_read_your_writes_seconds, response_cache_max_size, response_cache_ttl, response_cache_url
+
+
+class CacheBackend(ABC):
+    """Storage behind ResponseCache. Values are bytes so a shared store can hold them."""
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float):
+        ...
+
+    @abstractmethod
+    async def incr(self, key: str) -> int:
+        """Increment a counter that is never evicted and return its new value"""
+
+    @abstractmethod
+    async def counter(self, key: str) -> int:
+        ...
+
+
+class DatabaseCounters:
+    """Counters in the cache_counters table, so every worker sees every invalidation.
+
+    Always on the primary: a replica could still return a version from before one.
+    """
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+
+    async def incr(self, key: str) -> int:
+        async with self.engine.begin() as connection:
+            return await connection.scalar(
+                insert(CacheCounter)
+                .values(key=key, value=1)
+                .on_conflict_do_update(index_elements=[CacheCounter.key], set_={"value": CacheCounter.value + 1})
+                .returning(CacheCounter.value)
+            )
+
+    async def counter(self, key: str) -> int:
+        async with self.engine.connect() as connection:
+            return await connection.scalar(select(CacheCounter.value).where(CacheCounter.key == key)) or 0
+
+
+class LRUCacheBackend(CacheBackend):
+    """In-process backend: one copy per worker, least recently used entries go first.
+
+    Counters live in `counters` when given; otherwise in this process only,
+    which is enough for a single worker but leaves the others serving stale
+    entries after an invalidation.
+    """
+
+    def __init__(self, max_size: int, counters: DatabaseCounters | None = None):
+        self.max_size = max_size
+        self.entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self.shared_counters = counters
+        self.counters: dict[str, int] = {}
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float):
+        self.entries[key] = (time.monotonic() + ttl, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    async def incr(self, key: str) -> int:
+        if self.shared_counters is not None:
+            return await self.shared_counters.incr(key)
+        self.counters[key] = self.counters.get(key, 0) + 1
+        return self.counters[key]
+
+    async def counter(self, key: str) -> int:
+        if self.shared_counters is not None:
+            return await self.shared_counters.counter(key)
+        return self.counters.get(key, 0)
+
+
+class RedisCacheBackend(CacheBackend):
+    """Shared backend, so every worker sees the same entries and invalidations.
+
+    Needs the `redis` package, which is only imported when a cache URL is configured.
+    """
+
+    def __init__(self, url: str):
+        from redis.asyncio import Redis
+
+        self.redis = Redis.from_url(url)
+
+    async def get(self, key: str) -> bytes | None:
+        return await self.redis.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float):
+        await self.redis.set(key, value, px=int(ttl * 1000))
+
+    async def incr(self, key: str) -> int:
+        return await self.redis.incr(key)
+
+    async def counter(self, key: str) -> int:
+        return int(await self.redis.get(key) or 0)
+
+
+class ResponseCache:
+    """Rendered response bodies, grouped in namespaces that are invalidated as a whole.
+
+    Each namespace has a version counter that is part of every key; invalidating
+    bumps it, so old entries are never read again and simply age out. A reader
+    keys its entry with the version it saw *before* querying, so a result
+    computed while a write commits is stored under the old version.
+
+    A result read from a replica can still predate a write committed before the
+    invalidation, so for `replica_lag` seconds after this process first sees a
+    namespace's version, recently_invalidated() is true and readers should fill
+    misses from the primary instead.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float, replica_lag: float = 0):
+        self.backend = backend
+        self.ttl = ttl
+        self.replica_lag = replica_lag
+        # Namespace -> (newest version seen, when this process first saw it).
+        self.versions_seen: dict[str, tuple[int, float]] = {}
+
+    def saw_version(self, namespace: str, version: int):
+        seen = self.versions_seen.get(namespace)
+        if seen is None or version > seen[0]:
+            self.versions_seen[namespace] = (version, time.monotonic())
+
+    async def lookup(self, namespace: str, key: str) -> tuple[str, bytes | None]:
+        version = await self.backend.counter(f"{namespace}:version")
+        self.saw_version(namespace, version)
+        cache_key = f"{namespace}:v{version}:{key}"
+        body = await self.backend.get(cache_key)
+        (response_cache_hits if body is not None else response_cache_misses).labels(namespace).inc()
+        return cache_key, body
+
+    async def store(self, cache_key: str, body: bytes):
+        await self.backend.set(cache_key, body, self.ttl)
+
+    async def invalidate(self, namespace: str):
+        self.saw_version(namespace, await self.backend.incr(f"{namespace}:version"))
+
+    def recently_invalidated(self, namespace: str) -> bool:
+        # Another worker may have bumped the version just before this one first
+        # read it, so a version is new for `replica_lag` after it is first seen.
+        seen = self.versions_seen.get(namespace)
+        return seen is not None and time.monotonic() - seen[1] < self.replica_lag
+
+
+def etag_for(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def version_etag(*parts) -> str:
+    """ETag from whatever determines a response (a revision, the query parameters...), without rendering it"""
+    return etag_for("\x1f".join(map(str, parts)).encode())
+
+
+def cache_headers(etag: str) -> dict:
+    # no-cache: clients may keep the body but must revalidate it on every use.
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+
+def not_modified(request: Request, etag: str) -> Response | None:
+    """An empty 304 if the client already has the response tagged `etag`"""
+    if not etag_matches(request.headers.get("if-none-match"), etag):
+        return None
+    response_not_modified.labels(request.scope["route"].path).inc()
+    return Response(status_code=304, headers=cache_headers(etag))
+
+
+def conditional_response(request: Request, body: bytes, etag: str | None = None, media_type: str = "application/json") -> Response:
+    """200 with an ETag (by default a hash of the body), or an empty 304 when the client already has it"""
+    etag = etag or etag_for(body)
+    return not_modified(request, etag) or Response(content=body, media_type=media_type, headers=cache_headers(etag))
+
+
+response_cache = ResponseCache(
+    RedisCacheBackend(response_cache_url) if response_cache_url else LRUCacheBackend(response_cache_max_size, DatabaseCounters(engine)),
+    response_cache_ttl,
+    db_read_your_writes_seconds,
+)
@@ -0,0 +1,125 @@
+import logging
+import re
+import threading
+import time
+
+from sqlalchemy import event
+
+from services.request_metrics import current_route
+from settings import sql_profiler_enabled, sql_profiler_max_statements, sql_slow_query_ms
+
+
+logger = logging.getLogger("todos.sql")
+
+_FINGERPRINT_RULES = [
+    (re.compile(r"'(?:[^']|'')*'"), "?"),                  # string literals
+    (re.compile(r"\$\d+(?:::\w+(?:\[\])?)?"), "?"),        # asyncpg: $1::UUID
+    (re.compile(r"%\(\w+\)s|%s"), "?"),                    # psycopg: %(name)s
+    (re.compile(r"(?<![:\w]):\w+"), "?"),                  # named: :name, but not ::cast
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),               # numeric literals
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)"), "(?+)"),   # IN (?, ?, ?) and VALUES rows
+    (re.compile(r"\(\?\+\)(?:\s*,\s*\(\?\+\))+"), "(?+), ..."),
+    (re.compile(r"\s+"), " "),
+]
+
+
+def fingerprint(statement: str) -> str:
+    """Normalise a statement so the same query with different values groups together."""
+    for pattern, replacement in _FINGERPRINT_RULES:
+        statement = pattern.sub(replacement, statement)
+    return statement.strip()
+
+
+def redact(parameters, executemany: bool = False):
+    """Keep the shape and types of statement parameters, never their values."""
+    if executemany:
+        return f"<{len(parameters)} parameter sets>"
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+class StatementStats:
+
+    def __init__(self, fingerprint: str, route: str | None):
+        self.fingerprint = fingerprint
+        self.route = route
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, elapsed: float):
+        self.calls += 1
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+
+    def as_dict(self) -> dict:
+        return {
+            "fingerprint": self.fingerprint,
+            "route": self.route,
+            "calls": self.calls,
+            "total_ms": self.total * 1000,
+            "mean_ms": self.total / self.calls * 1000,
+            "max_ms": self.max * 1000,
+        }
+
+
+class SqlProfiler:
+    """Aggregate statement time per (fingerprint, route) and log slow statements.
+
+    At most `max_statements` distinct fingerprints are tracked; statements
+    beyond that are still timed and logged when slow, but only counted in
+    `untracked`.
+    """
+
+    def __init__(self, slow_query_ms: float, max_statements: int):
+        self.slow_query = slow_query_ms / 1000
+        self.max_statements = max_statements
+        self.stats: dict[tuple[str, str | None], StatementStats] = {}
+        self.untracked = 0
+        self.lock = threading.Lock()
+
+    def install(self, sync_engine):
+        event.listen(sync_engine, "before_cursor_execute", self.before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", self.after_cursor_execute)
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("profiler_started", []).append(time.perf_counter())
+
+    def after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["profiler_started"].pop()
+        self.record(statement, parameters, elapsed, current_route(), executemany)
+
+    def record(self, statement: str, parameters, elapsed: float, route: str | None, executemany: bool = False):
+        key = (fingerprint(statement), route)
+        with self.lock:
+            stats = self.stats.get(key)
+            if stats is None and len(self.stats) < self.max_statements:
+                stats = self.stats[key] = StatementStats(*key)
+            if stats is not None:
+                stats.add(elapsed)
+            else:
+                self.untracked += 1
+
+        if elapsed >= self.slow_query:
+            logger.warning("Slow query", extra={
+                "duration_ms": round(elapsed * 1000, 3),
+                "route": route,
+                "statement": statement,
+                "parameters": redact(parameters, executemany),
+            })
+
+    def top(self, limit: int) -> list[dict]:
+        with self.lock:
+            ranked = sorted(self.stats.values(), key=lambda stats: stats.total, reverse=True)
+            return [stats.as_dict() for stats in ranked[:limit]]
+
+    def reset(self):
+        with self.lock:
+            self.stats.clear()
+            self.untracked = 0
+
+
+sql_profiler = SqlProfiler(sql_slow_query_ms, sql_profiler_max_statements) if sql_profiler_enabled else None
@@ -0,0 +1,45 @@
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from schemas.task import Task, Status
+from schemas.user import User
+
+
+async def claim_tasks(db: AsyncSession, limit: int, user_id=None, company_id=None) -> list:
+    """Move up to `limit` of the top TODO tasks of a user, or of a company, to IN_PROGRESS in one statement.
+
+    Tasks are locked first, FOR UPDATE SKIP LOCKED, then their owners in id order to bump task_revision.
+    """
+    scope = User.id == user_id if company_id is None else User.company_id == company_id
+    picked = (
+        select(Task.id, Task.user_id)
+        .join(User, User.id == Task.user_id)
+        .filter(scope, Task.status == Status.TODO)
+        .order_by(Task.priority.desc(), Task.id.desc())
+        .limit(limit)
+        .with_for_update(of=Task, skip_locked=True)
+        .cte("picked")
+    )
+    owners = (
+        select(User.id)
+        .where(User.id.in_(select(picked.c.user_id)))
+        .order_by(User.id)
+        .with_for_update()
+        .cte("owners")
+    )
+    bumped = (
+        update(User)
+        .where(User.id.in_(select(owners.c.id)))
+        .values(task_revision=User.task_revision + 1, updated_at=User.updated_at)
+        .returning(User.id, User.task_revision)
+        .cte("bumped")
+    )
+    result = await db.execute(
+        update(Task)
+        .where(Task.id == picked.c.id, bumped.c.id == picked.c.user_id, Task.status == Status.TODO)
+        .values(status=Status.IN_PROGRESS, revision=bumped.c.task_revision)
+        .returning(Task.id, Task.summary, Task.description, Task.priority, Task.status, Task.user_id)
+        # Nothing to synchronize: the session holds no tasks, and "auto" cannot evaluate the CTEs.
+        .execution_options(synchronize_session=False)
+    )
+    return sorted(result, key=lambda task: (task.priority, task.id), reverse=True)
@@ -0,0 +1,227 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from collections import deque
+from contextlib import contextmanager, suppress
+
+import orjson
+from sqlalchemy import func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from database import async_connection_str, engine
+from models.task import ViewTask
+from services.metrics import task_feed_events, task_feed_overflows, task_feed_subscribers
+from settings import task_feed_broker, task_feed_buffer_size, task_feed_heartbeat
+
+logger = logging.getLogger("todos.feed")
+
+# pg_notify payloads are capped at 8000 bytes; a task is at most ~450 bytes of JSON.
+MAX_TASKS_PER_MESSAGE = 10
+
+
+def task_event(task) -> dict:
+    """The ViewTask fields of an ORM task or a RETURNING row"""
+    return {name: getattr(task, name) for name in ViewTask.model_fields}
+
+
+class Subscription:
+    """One connected client: a bounded buffer of rendered events.
+
+    A client that falls `buffer_size` events behind is not waited for; its
+    buffer is dropped and it is told to resync (from GET /tasks/changes).
+    """
+
+    def __init__(self, buffer_size: int):
+        self.buffer_size = buffer_size
+        self.buffer: deque[bytes] = deque()
+        self.ready = asyncio.Event()
+        self.overflowed = False
+
+    def push(self, event: bytes):
+        if self.overflowed:
+            return
+        if len(self.buffer) >= self.buffer_size:
+            self.overflowed = True
+            self.buffer.clear()
+            task_feed_overflows.inc()
+        else:
+            self.buffer.append(event)
+        self.ready.set()
+
+    async def get(self, timeout: float) -> list[bytes] | None:
+        """Buffered events; [] if none arrived within `timeout`, None once the client has to resync"""
+        if not self.buffer and not self.overflowed:
+            try:
+                await asyncio.wait_for(self.ready.wait(), timeout)
+            except TimeoutError:
+                return []
+        self.ready.clear()
+        if self.overflowed:
+            return None
+        events = list(self.buffer)
+        self.buffer.clear()
+        return events
+
+
+class FeedBroker(ABC):
+    """Carries published messages to the TaskFeed of every worker, this one included."""
+
+    def bind(self, deliver, lost):
+        """Called once by TaskFeed: `deliver(message)` for every message, `lost()` when some may have been missed"""
+        self.deliver = deliver
+        self.lost = lost
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    @abstractmethod
+    async def publish(self, message: bytes):
+        ...
+
+
+class LocalBroker(FeedBroker):
+    """Single-worker stand-in: messages go straight to this process's subscribers."""
+
+    async def publish(self, message: bytes):
+        self.deliver(message)
+
+
+class PostgresBroker(FeedBroker):
+    """LISTEN/NOTIFY on the primary, so every worker sees every message.
+
+    Publishing borrows a pooled connection; listening holds one dedicated
+    asyncpg connection, re-established after `retry_after` seconds if it drops.
+    """
+
+    channel = "task_feed"
+
+    def __init__(self, engine: AsyncEngine, dsn: str, retry_after: float = 5):
+        self.engine = engine
+        self.dsn = dsn
+        self.retry_after = retry_after
+        self.listener = None
+
+    async def start(self):
+        self.listener = asyncio.create_task(self.listen())
+
+    async def stop(self):
+        if self.listener is not None:
+            self.listener.cancel()
+            with suppress(asyncio.CancelledError):
+                await self.listener
+            self.listener = None
+
+    async def publish(self, message: bytes):
+        async with self.engine.begin() as connection:
+            await connection.execute(select(func.pg_notify(self.channel, message.decode())))
+
+    async def listen(self):
+        import asyncpg
+
+        while True:
+            try:
+                connection = await asyncpg.connect(self.dsn)
+            except Exception as e:
+                logger.warning("Task feed listener cannot connect", extra={"error": repr(e)})
+                await asyncio.sleep(self.retry_after)
+                continue
+            try:
+                await connection.add_listener(self.channel, lambda conn, pid, channel, payload: self.deliver(payload.encode()))
+                # Anything published while we were not listening is gone.
+                self.lost()
+                while not connection.is_closed():
+                    await asyncio.sleep(self.retry_after)
+                logger.warning("Task feed listener disconnected")
+            finally:
+                await connection.close()
+
+
+class TaskFeed:
+    """In-process fan-out of task events to the connected clients.
+
+    Subscribers are indexed by topic ("user:<id>", "company:<id>"), so a
+    message costs one dict lookup per topic plus one append per interested
+    client, however many idle clients are connected. Events are rendered to
+    server-sent-event bytes once per message, not once per client.
+    """
+
+    def __init__(self, broker: FeedBroker, buffer_size: int):
+        self.broker = broker
+        self.buffer_size = buffer_size
+        self.subscribers: dict[str, set[Subscription]] = {}
+        broker.bind(self.deliver, self.resync_all)
+
+    async def start(self):
+        await self.broker.start()
+
+    async def stop(self):
+        await self.broker.stop()
+
+    @contextmanager
+    def subscribe(self, topic: str):
+        subscription = Subscription(self.buffer_size)
+        self.subscribers.setdefault(topic, set()).add(subscription)
+        task_feed_subscribers.inc()
+        try:
+            yield subscription
+        finally:
+            subscribers = self.subscribers[topic]
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self.subscribers[topic]
+            task_feed_subscribers.dec()
+
+    async def publish(self, event: str, tasks: list[dict], user_id: str, company_id: str | None):
+        """Send `event` ("created" or "updated") for tasks of `user_id` to every worker"""
+        topics = [f"user:{user_id}"] + ([f"company:{company_id}"] if company_id else [])
+        try:
+            for start in range(0, len(tasks), MAX_TASKS_PER_MESSAGE):
+                message = {"topics": topics, "event": event, "tasks": tasks[start:start + MAX_TASKS_PER_MESSAGE]}
+                await self.broker.publish(orjson.dumps(message, default=str))
+        # The write is already committed; the feed is best effort and clients catch up from /tasks/changes.
+        except Exception:
+            logger.exception("Failed to publish task feed event", extra={"event": event})
+            return
+        task_feed_events.labels(event).inc(len(tasks))
+
+    def deliver(self, message: bytes):
+        message = orjson.loads(message)
+        event = b"event: %s\ndata: %s\n\n" % (message["event"].encode(), orjson.dumps(message["tasks"]))
+        for topic in message["topics"]:
+            for subscription in self.subscribers.get(topic, ()):
+                subscription.push(event)
+
+    def resync_all(self):
+        for subscribers in self.subscribers.values():
+            for subscription in subscribers:
+                subscription.overflowed = True
+                subscription.ready.set()
+
+
+async def stream_feed(feed: TaskFeed, topic: str, heartbeat: float = task_feed_heartbeat):
+    """Server-sent events for `topic` until the client disconnects or has to resync.
+
+    A comment line every `heartbeat` seconds keeps idle connections open
+    through proxies and lets the server notice clients that went away.
+    """
+    with feed.subscribe(topic) as subscription:
+        yield b": connected\n\n"
+        while True:
+            events = await subscription.get(heartbeat)
+            if events is None:
+                yield b"event: resync\ndata: {}\n\n"
+                return
+            yield b"".join(events) if events else b": keep-alive\n\n"
+
+
+def create_broker(name: str) -> FeedBroker:
+    if name == "postgres":
+        return PostgresBroker(engine, make_url(async_connection_str).set(drivername="postgresql").render_as_string(hide_password=False))
+    return LocalBroker()
+
+
+task_feed = TaskFeed(create_broker(task_feed_broker), task_feed_buffer_size)
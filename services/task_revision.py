@@ -0,0 +1,38 @@
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from schemas.task import Task
+from schemas.user import User
+
+
+# Every write to a user's tasks bumps users.task_revision in the same transaction,
+# so "has this task list changed?" is a primary-key lookup instead of a re-query.
+async def bump_task_revision(db: AsyncSession, user_id) -> int:
+    """Take the next revision for the user's tasks and stamp it on every task the transaction writes.
+
+    Call it before writing the tasks: the row lock it takes on the user is held
+    until commit, so a user's task writes commit in revision order and a reader
+    that has seen revision N has also seen everything before it. Writes to
+    existing tasks lock them with lock_tasks first, as claims do.
+    """
+    return await db.scalar(
+        update(User)
+        .where(User.id == user_id)
+        # Kept as is: updated_at is for changes to the user itself, not to its tasks.
+        .values(task_revision=User.task_revision + 1, updated_at=User.updated_at)
+        .returning(User.task_revision)
+    )
+
+
+async def lock_tasks(db: AsyncSession, user_id, task_ids) -> None:
+    """Lock the user's tasks among `task_ids`, in id order, before bump_task_revision: the order claims lock in"""
+    await db.execute(
+        select(Task.id)
+        .where(Task.id.in_(task_ids), Task.user_id == user_id)
+        .order_by(Task.id)
+        .with_for_update()
+    )
+
+
+async def get_task_revision(db: AsyncSession, user_id) -> int:
+    return await db.scalar(select(User.task_revision).where(User.id == user_id)) or 0
@@ -0,0 +1,103 @@
+import re
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.task import ViewTask
+from schemas.task import Task, Status
+from services.fast_json import view_columns
+from services.task_filter import ACTIVE
+
+
+MAX_SEARCH_TERMS = 8
+# Shorter prefixes match a large share of every user's words, so the GIN index
+# would hand back most of the table for the user_id filter to throw away.
+MIN_TERM_LENGTH = 3
+# Relative weight of a description match, as ts_rank_cd weighs 'B' against 'A'.
+DESCRIPTION_WEIGHT = 0.4
+
+_WORD = re.compile(r"\w+")
+
+
+def search_terms(q: str) -> list[str]:
+    """Distinct lower-cased words of a query; each one is matched as a prefix"""
+    terms = list(dict.fromkeys(word.lower() for word in _WORD.findall(q)))[:MAX_SEARCH_TERMS]
+    short = [term for term in terms if len(term) < MIN_TERM_LENGTH]
+    if short:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail=f"Search terms need at least {MIN_TERM_LENGTH} characters: {', '.join(short)}",
+        )
+    return terms
+
+
+def local_rank(summary: str, description: str, terms: list[str]) -> float:
+    """0 unless every term starts a word of the task; summary matches count most"""
+    summary_words, description_words = _WORD.findall(summary.lower()), _WORD.findall(description.lower())
+    rank = 0.0
+    for term in terms:
+        if any(word.startswith(term) for word in summary_words):
+            rank += 1.0
+        elif any(word.startswith(term) for word in description_words):
+            rank += DESCRIPTION_WEIGHT
+        else:
+            return 0.0
+    return rank
+
+
+async def search_postgres(db: AsyncSession, query, terms: list[str], limit: int) -> list[dict]:
+    # Terms are \w+ only, so they cannot inject tsquery operators.
+    tsquery = func.to_tsquery("simple", " & ".join(f"{term}:*" for term in terms))
+    rank = func.ts_rank_cd(Task.search_vector, tsquery)
+    result = await db.execute(
+        query.add_columns(rank.label("rank"))
+        .filter(Task.search_vector.bool_op("@@")(tsquery))
+        .order_by(rank.desc(), Task.priority.desc(), Task.id.desc())
+        .limit(limit)
+    )
+    return [dict(row) for row in result.mappings()]
+
+
+async def search_local(db: AsyncSession, query, terms: list[str], limit: int) -> list[dict]:
+    """Fallback for databases without full-text search: LIKE narrows the rows, Python ranks them"""
+    text = func.lower(Task.summary + " " + Task.description)
+    for term in terms:
+        query = query.filter(text.contains(term, autoescape=True))
+
+    result = await db.execute(query)
+    ranked = []
+    for row in result.mappings():
+        rank = local_rank(row["summary"], row["description"], terms)
+        if rank:
+            ranked.append({**row, "rank": rank})
+    ranked.sort(key=lambda task: (task["rank"], task["priority"], task["id"]), reverse=True)
+    return ranked[:limit]
+
+
+async def search_user_tasks(
+    db: AsyncSession,
+    user_id: str,
+    q: str,
+    statuses: list[Status] | None = None,
+    min_priority: int | None = None,
+    max_priority: int | None = None,
+    limit: int = 50,
+) -> list[dict]:
+    """The user's tasks matching every word of `q`, best match first; REMOVED ones only if asked for"""
+    terms = search_terms(q)
+    if not terms:
+        return []
+
+    query = select(*view_columns(ViewTask, Task)).filter(Task.user_id == user_id)
+    if not statuses or Status.REMOVED not in statuses:
+        query = query.filter(ACTIVE)
+    if statuses:
+        query = query.filter(Task.status.in_(statuses))
+    if min_priority is not None:
+        query = query.filter(Task.priority >= min_priority)
+    if max_priority is not None:
+        query = query.filter(Task.priority <= max_priority)
+
+    search = search_postgres if db.get_bind().dialect.name == "postgresql" else search_local
+    return await search(db, query, terms, limit)
@@ -0,0 +1,85 @@
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from schemas.task import Task, Status
+from schemas.task_count import TaskCount
+from schemas.user import User
+from services.metrics import task_counts_drift
+
+
+def stats_from_rows(rows) -> dict:
+    """TaskStats fields from (status, count) rows; statuses without a row count 0"""
+    counts = dict(rows)
+    return {status.name.lower(): int(counts.get(status, 0)) for status in Status}
+
+
+async def get_task_stats(db: AsyncSession, user_id=None, company_id=None) -> dict:
+    """Task counts by status for a user, or for every user of a company.
+
+    On PostgreSQL this sums the task_counts rows, at most one per user and
+    status, so it costs the same for ten tasks as for ten million. Other
+    databases have no counter triggers and count the task table instead.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        source, count = TaskCount, func.sum(TaskCount.count)
+    else:
+        source, count = Task, func.count()
+
+    query = select(source.status, count).group_by(source.status)
+    if company_id is None:
+        query = query.filter(source.user_id == user_id)
+    else:
+        query = query.join(User, User.id == source.user_id).filter(User.company_id == company_id)
+    result = await db.execute(query)
+    return stats_from_rows(result.all())
+
+
+async def find_count_drift(db: AsyncSession) -> list[dict]:
+    """Every (user, status) whose counter disagrees with the task table.
+
+    One statement, so counters and tasks are read from the same snapshot and
+    writes committing meanwhile cannot show up as drift. Scans the task table.
+    """
+    actual = (
+        select(Task.user_id, Task.status, func.count().label("count"))
+        .filter(Task.user_id.is_not(None))
+        .group_by(Task.user_id, Task.status)
+        .subquery()
+    )
+    counted = func.coalesce(TaskCount.count, 0)
+    actual_count = func.coalesce(actual.c.count, 0)
+    result = await db.execute(
+        select(
+            func.coalesce(actual.c.user_id, TaskCount.user_id).label("user_id"),
+            func.coalesce(actual.c.status, TaskCount.status).label("status"),
+            counted.label("counted"),
+            actual_count.label("actual"),
+        )
+        .select_from(actual)
+        .join(TaskCount, (TaskCount.user_id == actual.c.user_id) & (TaskCount.status == actual.c.status), full=True)
+        .filter(counted != actual_count)
+        .order_by("user_id", "status")
+    )
+    drift = [dict(row) for row in result.mappings()]
+    task_counts_drift.set(len(drift))
+    return drift
+
+
+async def reconcile_task_counts(db: AsyncSession) -> list[dict]:
+    """Recount the tasks of every user with drifted counters and commit; returns the drift found.
+
+    Each such user's row is locked first, as task writes do, so no write can
+    change their tasks between the recount and the commit.
+    """
+    drift = await find_count_drift(db)
+    user_ids = sorted({row["user_id"] for row in drift})
+    if user_ids:
+        await db.execute(select(User.id).filter(User.id.in_(user_ids)).order_by(User.id).with_for_update())
+        await db.execute(delete(TaskCount).filter(TaskCount.user_id.in_(user_ids)))
+        await db.execute(insert(TaskCount).from_select(
+            ["user_id", "status", "count"],
+            select(Task.user_id, Task.status, func.count()).filter(Task.user_id.in_(user_ids)).group_by(Task.user_id, Task.status),
+        ))
+    await db.commit()
+    task_counts_drift.set(0)
+    return drift
@@ -0,0 +1,53 @@
+import csv
+import io
+
+import orjson
+from fastapi import HTTPException, Request, status
+from fastapi.exceptions import RequestValidationError
+from pydantic import TypeAdapter, ValidationError
+
+from models.user import BulkCreateUsersPayload, UserCreate
+
+
+IMPORT_BATCH_SIZE = 500
+IMPORT_COLUMNS = tuple(UserCreate.model_fields)
+
+_payload = TypeAdapter(BulkCreateUsersPayload)
+
+# Request body documentation for the two accepted formats.
+OPENAPI_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {"schema": _payload.json_schema()},
+            "text/csv": {
+                "schema": {"type": "string"},
+                "example": "username,first_name,last_name,password,is_admin\njdoe,John,Doe,s3cret,false\n",
+            },
+        },
+    }
+}
+
+
+def from_csv(body: bytes) -> list[dict]:
+    """One dict per row, keyed by the header; empty cells are left out so defaults apply"""
+    reader = csv.DictReader(io.StringIO(body.decode("utf-8-sig")))
+    return [{key: value for key, value in row.items() if key and value} for row in reader]
+
+
+async def parse_users(request: Request) -> list[UserCreate]:
+    """Users from a JSON array or a CSV file with a header row, validated as a whole"""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    body = await request.body()
+    try:
+        if content_type == "text/csv":
+            rows = from_csv(body)
+        elif content_type in ("application/json", ""):
+            rows = orjson.loads(body)
+        else:
+            raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail="Send application/json or text/csv")
+        return _payload.validate_python(rows)
+    except (orjson.JSONDecodeError, UnicodeDecodeError, csv.Error) as e:
+        raise RequestValidationError([{"type": "value_error", "loc": ("body",), "msg": str(e), "input": None}])
+    except ValidationError as e:
+        raise RequestValidationError([{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)])
@@ -0,0 +1,38 @@
+import argparse
+import asyncio
+import pytest
+
+from benchmarks.load import in_process_app, postgres_url
+from database import get_session, get_read_session, get_read_session_factory
+from main import app as main_app
+
+
+class TestInProcessApp:
+
+    def test_every_session_dependency_uses_the_benchmark_database(self):
+        saved = dict(main_app.dependency_overrides)
+        # Sessions only connect when used, so no server needs to be listening.
+        app, engine = in_process_app("postgresql://load@benchmark-host/load")
+        try:
+            overrides = app.dependency_overrides
+            assert {get_session, get_read_session, get_read_session_factory} <= overrides.keys()
+
+            async def binds():
+                write = await anext(overrides[get_session]())
+                read = await anext(overrides[get_read_session]())
+                async with overrides[get_read_session_factory]()() as factory:
+                    return write.bind, read.bind, factory.bind
+
+            assert set(asyncio.run(binds())) == {engine}
+            assert engine.url.host == "benchmark-host"
+        finally:
+            app.dependency_overrides.clear()
+            app.dependency_overrides.update(saved)
+
+
+class TestPostgresUrl:
+
+    def test_rejects_other_databases(self):
+        assert postgres_url("postgresql://postgres@localhost/todos") == "postgresql://postgres@localhost/todos"
+        with pytest.raises(argparse.ArgumentTypeError):
+            postgres_url("sqlite:///load.db")
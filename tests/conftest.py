@@ -1,16 +1,43 @@
 import pytest
-from unittest.mock import Mock
-from sqlalchemy.orm import Session
+from unittest.mock import Mock, AsyncMock, patch
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import uuid4
 from fastapi import FastAPI
 
 from schemas.task import Status
+from services.response_cache import ResponseCache, LRUCacheBackend
+from services.rate_limit import Limit, LocalBucketStore, LoginRateLimiter
+from services.task_feed import LocalBroker, TaskFeed
 
 
 # Common fixtures
+@pytest.fixture(autouse=True)
+def response_cache():
+    """Every test starts with an empty response cache"""
+    cache = ResponseCache(LRUCacheBackend(max_size=100), ttl=60, replica_lag=5)
+    with patch("routes.companies.response_cache", cache):
+        yield cache
+
+
+@pytest.fixture(autouse=True)
+def task_feed():
+    """Every test gets its own in-process task feed, with nobody subscribed"""
+    feed = TaskFeed(LocalBroker(), buffer_size=10)
+    with patch("routes.tasks.task_feed", feed):
+        yield feed
+
+
+@pytest.fixture(autouse=True)
+def login_limiter():
+    """Every test starts with full login buckets: 3 attempts per username, 5 per IP"""
+    limiter = LoginRateLimiter(LocalBucketStore(max_keys=100), Limit(3, 1 / 60), Limit(5, 1 / 60))
+    with patch("routes.auth.login_limiter", limiter):
+        yield limiter
+
+
 @pytest.fixture
 def mock_db_session():
-    return Mock(spec=Session)
+    return Mock(spec=AsyncSession)
 
 
 @pytest.fixture
@@ -20,10 +47,17 @@ def mock_user():
         'username': 'testuser',
         'first_name': 'Test',
         'last_name': 'User',
-        'is_superuser': False
+        'is_admin': False,
+        'is_superuser': False,
+        'company_id': str(uuid4())
     }
 
 
+@pytest.fixture
+def mock_admin_user(mock_user):
+    return {**mock_user, 'is_admin': True}
+
+
 @pytest.fixture
 def superuser():
     return {
@@ -113,6 +147,31 @@ def sample_tasks(user_id):
 
 
 # Helper functions
+def mock_mappings_result(rows):
+    """Build the object returned by `await db.execute(...)` for a `.mappings().all()` call"""
+    result = Mock()
+    result.mappings.return_value.all.return_value = rows
+    return result
+
+
+def mock_stream_result(partitions):
+    """Build the object returned by `await db.stream(...)` for a `.partitions()` loop"""
+    async def iterate_partitions():
+        for partition in partitions:
+            yield partition
+
+    result = Mock()
+    result.partitions = iterate_partitions
+    return result
+
+
+def mock_session_factory(mock_db_session):
+    """Stand-in for `SessionLocal` where code opens its own `async with SessionLocal()` block"""
+    mock_db_session.__aenter__ = AsyncMock(return_value=mock_db_session)
+    mock_db_session.__aexit__ = AsyncMock(return_value=None)
+    return Mock(return_value=mock_db_session)
+
+
 def create_test_app_with_overrides(router, mock_db_session, mock_user):
     """Helper function to create FastAPI app with dependency overrides"""
     app = FastAPI()
@@ -124,9 +183,12 @@ def create_test_app_with_overrides(router, mock_db_session, mock_user):
     def override_get_session():
         return mock_db_session
 
+    from database import get_read_session, get_read_session_factory
     from routes.companies import get_current_user, get_session
     app.dependency_overrides[get_current_user] = override_get_current_user
     app.dependency_overrides[get_session] = override_get_session
+    app.dependency_overrides[get_read_session] = override_get_session
+    app.dependency_overrides[get_read_session_factory] = lambda: mock_session_factory(mock_db_session)
 
     return app
 
@@ -142,8 +204,9 @@ def create_tasks_test_app_with_overrides(router, mock_db_session, mock_user):
     def override_get_session():
         return mock_db_session
 
-    from routes.tasks import get_current_user, get_session
+    from routes.tasks import get_current_user, get_session, get_read_session
     app.dependency_overrides[get_current_user] = override_get_current_user
     app.dependency_overrides[get_session] = override_get_session
+    app.dependency_overrides[get_read_session] = override_get_session
 
     return app
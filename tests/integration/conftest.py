@@ -0,0 +1,105 @@
+import os
+import pytest
+from contextlib import contextmanager
+from fastapi import FastAPI
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import NullPool
+
+from schemas.base_entity import Base
+import schemas.company, schemas.user, schemas.task, schemas.task_count, schemas.cache_counter  # noqa
+
+
+# A throwaway Postgres database, e.g. postgresql://postgres@localhost:5432/todos_test.
+# Its tables are dropped and recreated by these tests.
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+# A second throwaway database standing in for a read replica.
+TEST_REPLICA_DATABASE_URL = os.getenv("TEST_REPLICA_DATABASE_URL")
+
+
+def create_test_database(url):
+    engine = create_engine(url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def create_test_async_engine(engine):
+    # NullPool: TestClient runs each request on a fresh event loop, and asyncpg
+    # connections cannot move between loops.
+    return create_async_engine(engine.url.set(drivername="postgresql+asyncpg"), poolclass=NullPool)
+
+
+@pytest.fixture(scope="module")
+def pg_engine():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+
+    engine = create_test_database(TEST_DATABASE_URL)
+    yield engine
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+
+@pytest.fixture(scope="module")
+def pg_async_engine(pg_engine):
+    return create_test_async_engine(pg_engine)
+
+
+@pytest.fixture(scope="module")
+def pg_replica_engine(pg_engine):
+    if not TEST_REPLICA_DATABASE_URL:
+        pytest.skip("TEST_REPLICA_DATABASE_URL is not set")
+
+    engine = create_test_database(TEST_REPLICA_DATABASE_URL)
+    yield engine
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+
+@pytest.fixture(scope="module")
+def pg_replica_async_engine(pg_replica_engine):
+    return create_test_async_engine(pg_replica_engine)
+
+
+def create_integration_app(router, async_engine, user):
+    """Helper function to create FastAPI app backed by a real database"""
+    app = FastAPI()
+    app.include_router(router)
+    session_factory = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+    def override_get_current_user():
+        return user
+
+    async def override_get_session():
+        async with session_factory() as db:
+            yield db
+
+    from database import get_session, get_read_session, get_read_session_factory
+    from services.auth import get_current_user
+    app.dependency_overrides[get_current_user] = override_get_current_user
+    app.dependency_overrides[get_session] = override_get_session
+    app.dependency_overrides[get_read_session] = override_get_session
+    app.dependency_overrides[get_read_session_factory] = lambda: session_factory
+
+    return app
+
+
+@contextmanager
+def assert_max_statements(engine, budget: int):
+    """Fail if more than `budget` SQL statements are sent to `engine` inside the block"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(sync_engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", record)
+
+    assert len(statements) <= budget, (
+        f"{len(statements)} statements, budget is {budget}:\n" + "\n---\n".join(statements)
+    )
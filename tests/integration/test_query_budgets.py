@@ -0,0 +1,100 @@
+import pytest
+from uuid import uuid4
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from routes.companies import router as companies_router
+from routes.tasks import router as tasks_router
+from routes.users import router as users_router
+from schemas.company import Company
+from schemas.task import Task, Status
+from schemas.user import User
+from tests.integration.conftest import create_integration_app, assert_max_statements
+
+pytestmark = pytest.mark.integration
+
+
+@pytest.fixture(scope="module")
+def admin(pg_engine):
+    company_id = uuid4()
+    users = [
+        {"id": uuid4(), "username": f"budget user {u}", "first_name": "", "last_name": "", "password": "",
+         "is_admin": u == 0, "company_id": company_id}
+        for u in range(5)
+    ]
+    tasks = [
+        {"summary": f"budget task {u}-{t}", "description": "", "status": Status.TODO, "priority": t, "user_id": user["id"]}
+        for u, user in enumerate(users)
+        for t in range(20)
+    ]
+    with pg_engine.begin() as connection:
+        connection.execute(insert(Company), [{"id": company_id, "name": "budget company", "description": "", "rating": 3}])
+        connection.execute(insert(User), users)
+        connection.execute(insert(Task), tasks)
+
+    admin = users[0]
+    return {
+        "id": str(admin["id"]),
+        "username": admin["username"],
+        "is_admin": True,
+        "is_superuser": False,
+        "company_id": str(company_id),
+    }
+
+
+class TestQueryBudgets:
+
+    def test_get_user_tasks(self, pg_async_engine, admin):
+        client = TestClient(create_integration_app(users_router, pg_async_engine, admin))
+        with assert_max_statements(pg_async_engine, 2):
+            response = client.get("/users/budget user 3/tasks")
+
+        assert response.status_code == 200
+        assert len(response.json()) == 20
+
+    def test_get_user_tasks_not_modified(self, pg_async_engine, admin):
+        client = TestClient(create_integration_app(users_router, pg_async_engine, admin))
+        etag = client.get("/users/budget user 3/tasks").headers["etag"]
+        with assert_max_statements(pg_async_engine, 1):
+            response = client.get("/users/budget user 3/tasks", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+
+    def test_get_users(self, pg_async_engine, admin):
+        client = TestClient(create_integration_app(users_router, pg_async_engine, admin))
+        with assert_max_statements(pg_async_engine, 1):
+            response = client.get("/users")
+
+        assert response.status_code == 200
+        assert len(response.json()["items"]) == 5
+
+    def test_get_tasks(self, pg_async_engine, admin):
+        client = TestClient(create_integration_app(tasks_router, pg_async_engine, admin))
+        with assert_max_statements(pg_async_engine, 2):
+            response = client.get("/tasks", params={"limit": 10})
+
+        assert response.status_code == 200
+        assert len(response.json()["items"]) == 10
+
+    def test_get_tasks_not_modified(self, pg_async_engine, admin):
+        client = TestClient(create_integration_app(tasks_router, pg_async_engine, admin))
+        etag = client.get("/tasks", params={"limit": 10}).headers["etag"]
+        with assert_max_statements(pg_async_engine, 1):
+            response = client.get("/tasks", params={"limit": 10}, headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.content == b""
+
+    def test_get_companies(self, pg_async_engine, admin):
+        client = TestClient(create_integration_app(companies_router, pg_async_engine, admin))
+        with assert_max_statements(pg_async_engine, 1):
+            response = client.get("/companies")
+
+        assert response.status_code == 200
+
+    def test_budget_violation_is_reported(self, pg_async_engine, admin):
+        client = TestClient(create_integration_app(tasks_router, pg_async_engine, admin))
+        with pytest.raises(AssertionError, match="4 statements, budget is 2"):
+            with assert_max_statements(pg_async_engine, 2):
+                client.get("/tasks")
+                client.get("/tasks")
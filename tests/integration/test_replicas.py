@@ -0,0 +1,75 @@
+import pytest
+from unittest.mock import patch
+from uuid import uuid4
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from database import PrimarySession, RecentWriters, ReplicaSet
+from routes.tasks import router as tasks_router
+from schemas.company import Company
+from schemas.task import Task, Status
+from schemas.user import User
+from services.logger import user_id_var
+
+pytestmark = pytest.mark.integration
+
+
+@pytest.fixture(scope="module")
+def user(pg_engine, pg_replica_engine):
+    company_id, user_id = uuid4(), uuid4()
+    # Same user on both databases, with a task that tells them apart.
+    for engine, source in ((pg_engine, "primary"), (pg_replica_engine, "replica")):
+        with engine.begin() as connection:
+            connection.execute(insert(Company), [{"id": company_id, "name": "replica company", "description": "", "rating": 3}])
+            connection.execute(insert(User), [{"id": user_id, "username": "replica user", "first_name": "", "last_name": "",
+                                               "password": "", "company_id": company_id}])
+            connection.execute(insert(Task), [{"summary": f"{source} task", "description": "", "status": Status.TODO,
+                                               "priority": 1, "user_id": user_id}])
+
+    return {"id": str(user_id), "username": "replica user", "is_admin": False, "is_superuser": False, "company_id": str(company_id)}
+
+
+@pytest.fixture
+def client(pg_async_engine, pg_replica_async_engine, user):
+    primary_sessions = async_sessionmaker(bind=pg_async_engine, autoflush=False, expire_on_commit=False,
+                                          sync_session_class=PrimarySession)
+
+    async def override_get_current_user():
+        user_id_var.set(user["id"])
+        return user
+
+    async def override_get_session():
+        async with primary_sessions() as db:
+            yield db
+
+    from database import get_session
+    from services.auth import get_current_user
+    app = FastAPI()
+    app.include_router(tasks_router)
+    app.dependency_overrides[get_current_user] = override_get_current_user
+    app.dependency_overrides[get_session] = override_get_session
+
+    with patch("database.SessionLocal", primary_sessions), \
+            patch("database.replicas", ReplicaSet([pg_replica_async_engine], retry_after=60)), \
+            patch("database.recent_writers", RecentWriters(window=60)):
+        yield TestClient(app)
+
+
+def summaries(response):
+    return [task["summary"] for task in response.json()["items"]]
+
+
+class TestReadReplicas:
+
+    def test_reads_are_served_by_the_replica(self, client):
+        assert summaries(client.get("/tasks")) == ["replica task"]
+
+    def test_writes_go_to_the_primary_and_are_read_back_from_it(self, client, pg_replica_engine):
+        response = client.post("/tasks/create", json={"summary": "new task", "description": "", "priority": 0})
+        assert response.status_code == 201
+
+        assert summaries(client.get("/tasks")) == ["primary task", "new task"]
+        with pg_replica_engine.connect() as connection:
+            assert connection.execute(Task.__table__.select().where(Task.summary == "new task")).first() is None
@@ -0,0 +1,36 @@
+import asyncio
+import pytest
+
+from services.response_cache import DatabaseCounters, LRUCacheBackend, ResponseCache
+
+pytestmark = pytest.mark.integration
+
+
+class TestDatabaseCounters:
+
+    def test_invalidation_reaches_every_worker(self, pg_async_engine):
+        """Two workers' caches: bodies stay in each process, versions are shared"""
+        first, second = (
+            ResponseCache(LRUCacheBackend(max_size=10, counters=DatabaseCounters(pg_async_engine)), ttl=60, replica_lag=60)
+            for _ in range(2)
+        )
+
+        async def scenario():
+            for cache in (first, second):
+                key, _ = await cache.lookup("companies", "page-1")
+                await cache.store(key, b"before")
+            cached = [(await cache.lookup("companies", "page-1"))[1] for cache in (first, second)]
+            # The second worker has served version 0 for long past the replica lag.
+            second.versions_seen["companies"] = (0, 0)
+
+            await first.invalidate("companies")
+            key, body = await second.lookup("companies", "page-1")
+            return cached, key, body
+
+        cached, key, body = asyncio.run(scenario())
+
+        assert cached == [b"before", b"before"]
+        assert body is None
+        assert key == "companies:v1:page-1"
+        # The second worker has only now seen the new version, so its replicas may lag it.
+        assert second.recently_invalidated("companies")
@@ -0,0 +1,79 @@
+import pytest
+from uuid import uuid4
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, select
+
+from routes.tasks import router as tasks_router
+from schemas.company import Company
+from schemas.task import Status
+from schemas.user import User
+from tests.integration.conftest import create_integration_app, assert_max_statements
+
+pytestmark = pytest.mark.integration
+
+
+@pytest.fixture
+def user(pg_engine):
+    company_id, user_id = uuid4(), uuid4()
+    with pg_engine.begin() as connection:
+        connection.execute(insert(Company), [{"id": company_id, "name": f"sync company {company_id}", "description": "", "rating": 3}])
+        connection.execute(insert(User), [{"id": user_id, "username": f"sync user {user_id}", "first_name": "", "last_name": "",
+                                           "password": "", "company_id": company_id}])
+    return {"id": str(user_id), "username": "sync", "is_admin": False, "is_superuser": False, "company_id": str(company_id)}
+
+
+@pytest.fixture
+def client(pg_async_engine, user):
+    return TestClient(create_integration_app(tasks_router, pg_async_engine, user))
+
+
+def sync(client, cursor):
+    """Follow `has_more` to the end, like an offline client does"""
+    items = []
+    while True:
+        data = client.get("/tasks/changes", params={"since": cursor, "limit": 2} if cursor else {"limit": 2}).json()
+        items += data["items"]
+        cursor = data["cursor"]
+        if not data["has_more"]:
+            return items, cursor
+
+
+class TestTaskChanges:
+
+    def test_only_changes_since_cursor(self, client, pg_async_engine):
+        created = client.post("/tasks/bulk", json=[
+            {"summary": f"sync {uuid4()}", "description": "", "priority": p} for p in range(5)
+        ]).json()
+        items, cursor = sync(client, None)
+        assert {item["id"] for item in items} == {result["task"]["id"] for result in created}
+        assert all(item["updated_at"] for item in items)
+
+        removed, done = created[1]["task"]["id"], created[3]["task"]["id"]
+        client.patch("/tasks/status", json={"ids": [removed], "status": Status.REMOVED.value})
+        client.patch("/tasks/status", json={"ids": [done], "status": Status.COMPLETED.value})
+        new = client.post("/tasks/create", json={"summary": f"sync {uuid4()}", "description": "", "priority": 9}).json()
+
+        items, cursor = sync(client, cursor)
+        assert [(item["id"], item["status"]) for item in items] == [
+            (removed, Status.REMOVED.value),
+            (done, Status.COMPLETED.value),
+            (new["id"], Status.TODO.value),
+        ]
+
+        with assert_max_statements(pg_async_engine, 1):
+            assert sync(client, cursor) == ([], cursor)
+
+    def test_task_writes_leave_the_users_updated_at_alone(self, client, user, pg_engine):
+        def user_row():
+            with pg_engine.connect() as connection:
+                return connection.execute(select(User.updated_at, User.task_revision).where(User.id == user["id"])).one()
+
+        before = user_row()
+        created = client.post("/tasks/create", json={"summary": f"sync {uuid4()}", "description": "", "priority": 1}).json()
+        client.post("/tasks/bulk", json=[{"summary": f"sync {uuid4()}", "description": "", "priority": 2}])
+        client.patch("/tasks/status", json={"ids": [created["id"]], "status": Status.COMPLETED.value})
+        client.post("/tasks/claim", json={"limit": 1})
+        after = user_row()
+
+        assert after.task_revision == before.task_revision + 4
+        assert after.updated_at == before.updated_at
@@ -0,0 +1,144 @@
+import asyncio
+import pytest
+from collections import Counter
+from uuid import uuid4
+from fastapi.testclient import TestClient
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from routes.tasks import router as tasks_router
+from schemas.company import Company
+from schemas.task import Task, Status
+from schemas.user import User
+from services.task_claim import claim_tasks
+from tests.integration.conftest import create_integration_app, assert_max_statements
+
+pytestmark = pytest.mark.integration
+
+WORKERS = 16
+USERS = 4
+TASKS_PER_USER = 100
+
+
+@pytest.fixture
+def company(pg_engine):
+    """A company of USERS users with TASKS_PER_USER TODO tasks each, plus some that are not TODO"""
+    company_id = uuid4()
+    users = [
+        {"id": uuid4(), "username": f"claim user {uuid4()}", "first_name": "", "last_name": "", "password": "", "company_id": company_id}
+        for _ in range(USERS)
+    ]
+    tasks = [
+        {"summary": f"claim {uuid4()}", "description": "", "status": Status.TODO, "priority": t % 7, "user_id": user["id"]}
+        for user in users
+        for t in range(TASKS_PER_USER)
+    ] + [
+        {"summary": f"claim {uuid4()}", "description": "", "status": status, "priority": 99, "user_id": users[0]["id"]}
+        for status in (Status.IN_PROGRESS, Status.COMPLETED, Status.REMOVED)
+    ]
+    with pg_engine.begin() as connection:
+        connection.execute(insert(Company), [{"id": company_id, "name": f"claim company {company_id}", "description": "", "rating": 3}])
+        connection.execute(insert(User), users)
+        connection.execute(insert(Task), tasks)
+    return {"id": company_id, "users": [user["id"] for user in users]}
+
+
+def run_workers(pg_async_engine, claim, user_ids) -> list[list]:
+    """WORKERS concurrent workers, each on its own connection, claiming until no TODO task is left"""
+    async def scenario():
+        sessions = async_sessionmaker(bind=pg_async_engine, expire_on_commit=False)
+
+        async def todo_left(db) -> int:
+            return await db.scalar(select(func.count()).select_from(Task).filter(Task.status == Status.TODO, Task.user_id.in_(user_ids)))
+
+        async def worker() -> list:
+            claims = []
+            async with sessions() as db:
+                while True:
+                    claimed = await claim(db)
+                    await db.commit()
+                    if claimed:
+                        claims.append(claimed)
+                    elif not await todo_left(db):
+                        return claims
+                    else:
+                        # Everything left was held by other workers for that instant.
+                        await asyncio.sleep(0.001)
+
+        return await asyncio.gather(*(worker() for _ in range(WORKERS)))
+
+    return asyncio.run(scenario())
+
+
+class TestClaimTasks:
+
+    def test_concurrent_claims_are_exactly_once(self, pg_engine, pg_async_engine, company):
+        async def claim(db):
+            return await claim_tasks(db, 3, company_id=company["id"])
+
+        claims = [batch for worker in run_workers(pg_async_engine, claim, company["users"]) for batch in worker]
+        claimed = Counter(task.id for batch in claims for task in batch)
+
+        assert len(claimed) == USERS * TASKS_PER_USER
+        assert set(claimed.values()) == {1}
+        assert all(task.status == Status.IN_PROGRESS for batch in claims for task in batch)
+        assert all(len(batch) <= 3 for batch in claims)
+        with pg_engine.connect() as connection:
+            statuses = Counter(connection.execute(select(Task.status).filter(Task.user_id.in_(company["users"]))).scalars())
+        assert statuses == {Status.IN_PROGRESS: USERS * TASKS_PER_USER + 1, Status.COMPLETED: 1, Status.REMOVED: 1}
+
+    def test_concurrent_claims_on_one_user(self, pg_async_engine, company):
+        user_id = company["users"][1]
+
+        async def claim(db):
+            return await claim_tasks(db, 5, user_id=user_id)
+
+        claims = [batch for worker in run_workers(pg_async_engine, claim, [user_id]) for batch in worker]
+        claimed = Counter(task.id for batch in claims for task in batch)
+
+        assert len(claimed) == TASKS_PER_USER
+        assert set(claimed.values()) == {1}
+        assert {task.user_id for batch in claims for task in batch} == {user_id}
+
+    def test_simultaneous_claims_on_one_user_all_get_tasks(self, pg_async_engine, company):
+        """Workers on one owner each get their own tasks rather than queueing behind the owner's lock"""
+        user_id = company["users"][3]
+
+        async def scenario():
+            sessions = async_sessionmaker(bind=pg_async_engine, expire_on_commit=False)
+            ready = asyncio.Barrier(WORKERS)
+
+            async def worker() -> list:
+                async with sessions() as db:
+                    await db.connection()
+                    await ready.wait()
+                    claimed = await claim_tasks(db, 5, user_id=user_id)
+                    await db.commit()
+                    return claimed
+
+            return await asyncio.gather(*(worker() for _ in range(WORKERS)))
+
+        claims = asyncio.run(scenario())
+        claimed = Counter(task.id for batch in claims for task in batch)
+
+        assert all(claims)
+        assert set(claimed.values()) == {1}
+        assert len(claimed) == WORKERS * 5
+
+    def test_claim_endpoint(self, pg_async_engine, company):
+        user = {"id": str(company["users"][2]), "username": "claim", "is_admin": False, "is_superuser": False, "company_id": str(company["id"])}
+        client = TestClient(create_integration_app(tasks_router, pg_async_engine, user))
+        cursor = client.get("/tasks/changes", params={"limit": 200}).json()["cursor"]
+
+        with assert_max_statements(pg_async_engine, 1):
+            response = client.post("/tasks/claim", json={"limit": 4})
+
+        assert response.status_code == 200
+        tasks = response.json()
+        assert [task["priority"] for task in tasks] == [6, 6, 6, 6]
+        assert {task["status"] for task in tasks} == {Status.IN_PROGRESS.value}
+        # Claims bump the owner's revision like any write, so delta sync sees them.
+        changes = client.get("/tasks/changes", params={"since": cursor}).json()["items"]
+        assert sorted(change["id"] for change in changes) == sorted(task["id"] for task in tasks)
+
+        assert client.post("/tasks/claim", json={"scope": "company"}).status_code == 403
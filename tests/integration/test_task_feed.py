@@ -0,0 +1,27 @@
+import asyncio
+import pytest
+
+from services.task_feed import PostgresBroker, TaskFeed
+
+pytestmark = pytest.mark.integration
+
+
+class TestPostgresBroker:
+
+    def test_messages_reach_every_worker(self, pg_engine, pg_async_engine):
+        dsn = pg_engine.url.render_as_string(hide_password=False)
+
+        async def scenario():
+            # Two feeds on separate brokers, as two workers would have.
+            publisher, listener = (TaskFeed(PostgresBroker(pg_async_engine, dsn, retry_after=0.05), buffer_size=10) for _ in range(2))
+            await listener.start()
+            with listener.subscribe("user:u1") as subscription:
+                # The first get returns once LISTEN is in place: connecting asks subscribers to resync.
+                assert await subscription.get(timeout=5) is None
+                subscription.overflowed = False
+                await publisher.publish("created", [{"id": "t1"}], "u1", "c1")
+                events = await subscription.get(timeout=5)
+            await listener.stop()
+            return events
+
+        assert asyncio.run(scenario()) == [b'event: created\ndata: [{"id":"t1"}]\n\n']
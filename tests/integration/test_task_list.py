@@ -0,0 +1,64 @@
+import pytest
+from uuid import uuid4
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from routes.tasks import router as tasks_router
+from schemas.company import Company
+from schemas.task import Status
+from schemas.user import User
+from tests.integration.conftest import create_integration_app
+
+pytestmark = pytest.mark.integration
+
+
+@pytest.fixture
+def client(pg_engine, pg_async_engine):
+    company_id, user_id = uuid4(), uuid4()
+    with pg_engine.begin() as connection:
+        connection.execute(insert(Company), [{"id": company_id, "name": f"list company {company_id}", "description": "", "rating": 3}])
+        connection.execute(insert(User), [{"id": user_id, "username": f"list user {user_id}", "first_name": "", "last_name": "",
+                                           "password": "", "company_id": company_id}])
+    user = {"id": str(user_id), "username": "list", "is_admin": False, "is_superuser": False, "company_id": str(company_id)}
+    return TestClient(create_integration_app(tasks_router, pg_async_engine, user))
+
+
+def create(client, priority) -> dict:
+    return client.post("/tasks/create", json={"summary": f"list {uuid4()}", "description": "", "priority": priority}).json()
+
+
+def list_all(client, **params) -> list[dict]:
+    """Every page of GET /tasks, two tasks at a time"""
+    items, cursor = [], None
+    while True:
+        data = client.get("/tasks", params={**params, "limit": 2, **({"cursor": cursor} if cursor else {})}).json()
+        items += data["items"]
+        cursor = data["next_cursor"]
+        if not cursor:
+            return items
+
+
+class TestTaskList:
+
+    def test_filters_and_sorts(self, client):
+        tasks = [create(client, priority) for priority in (3, 1, 4, 1, 5)]
+        ids = [task["id"] for task in tasks]
+        client.patch("/tasks/status", json={"ids": [ids[2]], "status": Status.REMOVED.value})
+        client.patch("/tasks/status", json={"ids": [ids[0]], "status": Status.IN_PROGRESS.value})
+
+        assert [task["id"] for task in list_all(client)] == [ids[4], ids[0], *sorted([ids[1], ids[3]], reverse=True)]
+        assert [task["id"] for task in list_all(client, sort="created_at")] == [ids[0], ids[1], ids[3], ids[4]]
+        # Each status update is its own transaction, so it has a later updated_at.
+        assert [task["id"] for task in list_all(client, sort="-updated_at")][0] == ids[0]
+        assert [task["id"] for task in list_all(client, status="REMOVED")] == [ids[2]]
+        assert [task["id"] for task in list_all(client, status=["TODO", "REMOVED"], min_priority=2)] == [ids[4], ids[2]]
+        assert [task["id"] for task in list_all(client, min_priority=1, max_priority=1, status="TODO")] == sorted([ids[1], ids[3]], reverse=True)
+
+    def test_time_ranges(self, client):
+        task = create(client, 1)
+        # A new task's created_at is its updated_at, which the changes feed shows.
+        stamp = client.get("/tasks/changes").json()["items"][-1]["updated_at"]
+
+        for bound in ("created", "updated"):
+            assert [t["id"] for t in list_all(client, **{f"{bound}_since": stamp})] == [task["id"]]
+            assert list_all(client, **{f"{bound}_before": stamp}) == []
@@ -0,0 +1,90 @@
+import pytest
+from uuid import uuid4
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, update
+
+from routes.tasks import router as tasks_router
+from schemas.company import Company
+from schemas.task import Task, Status
+from schemas.user import User
+from tests.integration.conftest import create_integration_app, assert_max_statements
+
+pytestmark = pytest.mark.integration
+
+
+@pytest.fixture(scope="module")
+def user(pg_engine):
+    company_id, user_id, other_id = uuid4(), uuid4(), uuid4()
+    tag = user_id.hex[:8]
+    tasks = [
+        ("Deploy release", "", Status.TODO, 1),
+        ("Release notes", "written before we deploy", Status.TODO, 5),
+        ("Redeploy staging", "", Status.TODO, 9),
+        ("Deploy hotfix", "", Status.COMPLETED, 3),
+        ("Café menu", "", Status.TODO, 2),
+    ]
+    with pg_engine.begin() as connection:
+        connection.execute(insert(Company), [{"id": company_id, "name": f"search {tag}", "description": "", "rating": 3}])
+        connection.execute(insert(User), [
+            {"id": id, "username": f"search {id}", "first_name": "", "last_name": "", "password": "", "company_id": company_id}
+            for id in (user_id, other_id)
+        ])
+        connection.execute(insert(Task), [
+            {"summary": f"{summary} {tag}", "description": description, "status": status, "priority": priority, "user_id": user_id}
+            for summary, description, status, priority in tasks
+        ] + [{"summary": f"Deploy other {tag}", "description": "", "status": Status.TODO, "priority": 1, "user_id": other_id}])
+    return {"id": str(user_id), "username": "search", "is_admin": False, "is_superuser": False, "company_id": str(company_id), "tag": tag}
+
+
+def summaries(response):
+    assert response.status_code == 200
+    return [task["summary"].rsplit(" ", 1)[0] for task in response.json()]
+
+
+class TestTaskSearch:
+
+    def test_prefix_search_ranks_summary_first(self, pg_async_engine, user):
+        client = TestClient(create_integration_app(tasks_router, pg_async_engine, user))
+        with assert_max_statements(pg_async_engine, 1):
+            response = client.get("/tasks/search", params={"q": "DEPL"})
+
+        assert summaries(response) == ["Deploy hotfix", "Deploy release", "Release notes"]
+        ranks = [task["rank"] for task in response.json()]
+        assert ranks[1] > ranks[2]
+
+    def test_every_term_must_match(self, pg_async_engine, user):
+        client = TestClient(create_integration_app(tasks_router, pg_async_engine, user))
+
+        assert summaries(client.get("/tasks/search", params={"q": "release deploy"})) == ["Deploy release", "Release notes"]
+        assert summaries(client.get("/tasks/search", params={"q": "caf"})) == ["Café menu"]
+
+    def test_filters(self, pg_async_engine, user):
+        client = TestClient(create_integration_app(tasks_router, pg_async_engine, user))
+        response = client.get("/tasks/search", params={"q": "deploy", "status": [Status.TODO.value], "min_priority": 2})
+        assert summaries(response) == ["Release notes"]
+
+        response = client.get("/tasks/search", params={"q": "deploy", "status": ["completed", "todo"], "max_priority": 2})
+        assert summaries(response) == ["Deploy release"]
+
+    def test_operators_are_not_interpreted(self, pg_async_engine, user):
+        client = TestClient(create_integration_app(tasks_router, pg_async_engine, user))
+
+        response = client.get("/tasks/search", params={"q": "deploy & !release | (:*"})
+        assert summaries(response) == ["Deploy release", "Release notes"]
+        assert client.get("/tasks/search", params={"q": "&!"}).json() == []
+
+    def test_short_terms_are_rejected(self, pg_async_engine, user):
+        client = TestClient(create_integration_app(tasks_router, pg_async_engine, user))
+
+        response = client.get("/tasks/search", params={"q": "deploy d"})
+        assert response.status_code == 422
+        assert response.json()["detail"] == "Search terms need at least 3 characters: d"
+
+    def test_vector_follows_updates(self, pg_engine, pg_async_engine, user):
+        with pg_engine.begin() as connection:
+            connection.execute(
+                update(Task).where(Task.summary == f"Redeploy staging {user['tag']}").values(summary=f"Rollback staging {user['tag']}")
+            )
+        client = TestClient(create_integration_app(tasks_router, pg_async_engine, user))
+
+        assert summaries(client.get("/tasks/search", params={"q": "rollb"})) == ["Rollback staging"]
@@ -0,0 +1,72 @@
+import pytest
+from uuid import uuid4
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, text
+
+from routes.debug import router as debug_router
+from routes.tasks import router as tasks_router
+from schemas.company import Company
+from schemas.task import Status
+from schemas.user import User
+from tests.integration.conftest import create_integration_app, assert_max_statements
+
+pytestmark = pytest.mark.integration
+
+
+@pytest.fixture
+def users(pg_engine, pg_async_engine):
+    """Clients for two users of one company; the first is an admin and a superuser"""
+    company_id, user_ids = uuid4(), [uuid4(), uuid4()]
+    with pg_engine.begin() as connection:
+        connection.execute(insert(Company), [{"id": company_id, "name": f"stats company {company_id}", "description": "", "rating": 3}])
+        connection.execute(insert(User), [{"id": user_id, "username": f"stats user {user_id}", "first_name": "", "last_name": "",
+                                           "password": "", "company_id": company_id} for user_id in user_ids])
+    clients = []
+    for i, user_id in enumerate(user_ids):
+        user = {"id": str(user_id), "username": "stats", "is_admin": i == 0, "is_superuser": i == 0, "company_id": str(company_id)}
+        app = create_integration_app(tasks_router, pg_async_engine, user)
+        app.include_router(debug_router)
+        clients.append(TestClient(app))
+    return clients
+
+
+def stats(client, scope="user") -> dict:
+    return client.get("/tasks/stats", params={"scope": scope}).json()
+
+
+class TestTaskStats:
+
+    def test_counters_follow_every_write(self, users, pg_async_engine):
+        admin, user = users
+        created = admin.post("/tasks/bulk", json=[{"summary": f"stats {uuid4()}", "description": "", "priority": p} for p in range(6)]).json()
+        taken = created[0]["task"]["summary"]
+        admin.post("/tasks/bulk", json=[{"summary": taken, "description": "", "priority": 1}])
+        admin.post("/tasks/create", json={"summary": f"stats {uuid4()}", "description": "", "priority": 9})
+        user.post("/tasks/create", json={"summary": f"stats {uuid4()}", "description": "", "priority": 1})
+
+        ids = [result["task"]["id"] for result in created]
+        admin.patch("/tasks/status", json={"ids": ids[:2], "status": Status.COMPLETED.value})
+        admin.patch("/tasks/status", json={"ids": ids[1:3], "status": Status.REMOVED.value})
+        admin.post("/tasks/claim", json={"limit": 2})
+
+        with assert_max_statements(pg_async_engine, 1):
+            assert stats(admin) == {"todo": 2, "in_progress": 2, "completed": 1, "removed": 2}
+        assert stats(user) == {"todo": 1, "in_progress": 0, "completed": 0, "removed": 0}
+        assert stats(admin, "company") == {"todo": 3, "in_progress": 2, "completed": 1, "removed": 2}
+        assert admin.get("/debug/task-counts").json() == []
+
+    def test_company_stats_are_for_admins(self, users):
+        assert users[1].get("/tasks/stats", params={"scope": "company"}).status_code == 403
+
+    def test_reconcile_fixes_drift(self, users, pg_engine):
+        admin, _ = users
+        admin.post("/tasks/create", json={"summary": f"stats {uuid4()}", "description": "", "priority": 1})
+        user_id = admin.get("/tasks").json()["items"][0]["user_id"]
+        with pg_engine.begin() as connection:
+            connection.execute(text("UPDATE task_counts SET count = 7 WHERE user_id = :user_id"), {"user_id": user_id})
+
+        drift = [{"user_id": user_id, "status": Status.TODO.value, "counted": 7, "actual": 1}]
+        assert admin.get("/debug/task-counts").json() == drift
+        assert admin.post("/debug/task-counts/reconcile").json() == drift
+        assert admin.get("/debug/task-counts").json() == []
+        assert stats(admin)["todo"] == 1
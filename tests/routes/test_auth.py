@@ -0,0 +1,59 @@
+import time
+from unittest.mock import AsyncMock, Mock, patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from routes.auth import router
+from services.auth import hash_password, verfiy_password
+
+
+def create_auth_test_app(mock_db_session):
+    app = FastAPI()
+    app.include_router(router)
+
+    from routes.auth import get_session
+    app.dependency_overrides[get_session] = lambda: mock_db_session
+    return app
+
+
+class TestLogin:
+
+    def test_login_success(self, mock_db_session):
+        user = Mock(username="alice", id="1", first_name="", last_name="", is_admin=False, is_superuser=False, company_id="2")
+        app = create_auth_test_app(mock_db_session)
+        with patch("routes.auth.sign_in", AsyncMock(return_value=user)):
+            response = TestClient(app).post("/auth/login", data={"username": "alice", "password": "secret"})
+
+        assert response.status_code == 200
+        assert response.json()["token_type"] == "bearer"
+
+    def test_throttled_before_any_lookup(self, mock_db_session):
+        app = create_auth_test_app(mock_db_session)
+        client = TestClient(app)
+        with patch("routes.auth.sign_in", AsyncMock(return_value=None)) as sign_in:
+            statuses = [client.post("/auth/login", data={"username": "alice", "password": "guess"}).status_code for _ in range(5)]
+
+        assert statuses == [404, 404, 404, 429, 429]
+        assert sign_in.await_count == 3
+        mock_db_session.scalar.assert_not_called()
+
+    def test_rejected_attempts_cost_a_fraction_of_bcrypt(self, mock_db_session):
+        app = create_auth_test_app(mock_db_session)
+        client = TestClient(app)
+        with patch("routes.auth.sign_in", AsyncMock(return_value=None)):
+            for _ in range(3):
+                client.post("/auth/login", data={"username": "alice", "password": "guess"})
+
+            started = time.process_time()
+            for _ in range(50):
+                assert client.post("/auth/login", data={"username": "alice", "password": "guess"}).status_code == 429
+            rejected = (time.process_time() - started) / 50
+
+        hashed = hash_password("secret")
+        started = time.process_time()
+        verfiy_password("guess", hashed)
+        bcrypt = time.process_time() - started
+
+        # Includes the whole TestClient round trip, and is still far below one verification.
+        assert rejected < bcrypt / 10
@@ -2,19 +2,19 @@ import pytest
 from unittest.mock import Mock, patch
 from fastapi.testclient import TestClient
 from fastapi import HTTPException, FastAPI
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import uuid4
 
+from database import get_read_session_factory
 from routes.companies import router
 from models.company import ViewCompany, CreateCompanyPayload
-from tests.conftest import create_test_app_with_overrides
+from tests.conftest import create_test_app_with_overrides, mock_mappings_result, mock_session_factory
 
 
 class TestGetCompanies:
 
     def test_get_companies_success(self, mock_db_session, mock_user, sample_companies):
-        mock_query = Mock()
-        mock_query.all.return_value = sample_companies
-        mock_db_session.query.return_value = mock_query
+        mock_db_session.execute.return_value = mock_mappings_result(sample_companies)
 
         app = create_test_app_with_overrides(router, mock_db_session, mock_user)
         client = TestClient(app)
@@ -22,14 +22,13 @@ class TestGetCompanies:
 
         assert response.status_code == 200
         data = response.json()
-        assert len(data) == 2
-        assert data[0]["name"] == "Company A"
-        assert data[1]["name"] == "Company B"
+        assert len(data["items"]) == 2
+        assert data["items"][0]["name"] == "Company A"
+        assert data["items"][1]["name"] == "Company B"
+        assert data["next_cursor"] is None
 
     def test_get_companies_empty_list(self, mock_db_session, mock_user):
-        mock_query = Mock()
-        mock_query.all.return_value = []
-        mock_db_session.query.return_value = mock_query
+        mock_db_session.execute.return_value = mock_mappings_result([])
 
         app = create_test_app_with_overrides(router, mock_db_session, mock_user)
         client = TestClient(app)
@@ -37,7 +36,7 @@ class TestGetCompanies:
 
         assert response.status_code == 200
         data = response.json()
-        assert data == []
+        assert data == {"items": [], "next_cursor": None}
 
     def test_get_companies_unauthorized(self):
         app = FastAPI()
@@ -54,6 +53,42 @@ class TestGetCompanies:
 
         assert response.status_code == 401
 
+    def test_get_companies_served_from_cache(self, mock_db_session, mock_user, sample_companies):
+        mock_db_session.execute.return_value = mock_mappings_result(sample_companies)
+
+        app = create_test_app_with_overrides(router, mock_db_session, mock_user)
+        client = TestClient(app)
+        first = client.get("/companies")
+        second = client.get("/companies")
+
+        assert second.status_code == 200
+        assert second.content == first.content
+        assert second.headers["ETag"] == first.headers["ETag"]
+        mock_db_session.execute.assert_called_once()
+
+    def test_get_companies_not_modified(self, mock_db_session, mock_user, sample_companies):
+        mock_db_session.execute.return_value = mock_mappings_result(sample_companies)
+
+        app = create_test_app_with_overrides(router, mock_db_session, mock_user)
+        client = TestClient(app)
+        etag = client.get("/companies").headers["ETag"]
+        response = client.get("/companies", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["ETag"] == etag
+        mock_db_session.execute.assert_called_once()
+
+    def test_get_companies_cached_per_page(self, mock_db_session, mock_user, sample_companies):
+        mock_db_session.execute.return_value = mock_mappings_result(sample_companies)
+
+        app = create_test_app_with_overrides(router, mock_db_session, mock_user)
+        client = TestClient(app)
+        client.get("/companies")
+        client.get("/companies", params={"limit": 1})
+
+        assert mock_db_session.execute.call_count == 2
+
 
 class TestAddCompany:
 
@@ -83,6 +118,42 @@ class TestAddCompany:
         mock_db_session.commit.assert_called_once()
         mock_db_session.refresh.assert_called_once()
 
+    def test_add_company_invalidates_cached_list(self, mock_db_session, superuser, sample_companies, valid_company_payload):
+        mock_db_session.refresh.side_effect = lambda company: setattr(company, "id", uuid4())
+        mock_db_session.execute.return_value = mock_mappings_result(sample_companies)
+
+        app = create_test_app_with_overrides(router, mock_db_session, superuser)
+        client = TestClient(app)
+        etag = client.get("/companies").headers["ETag"]
+        client.post("/companies", json=valid_company_payload)
+        mock_db_session.execute.return_value = mock_mappings_result(sample_companies[:1])
+        response = client.get("/companies", headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert len(response.json()["items"]) == 1
+        assert mock_db_session.execute.call_count == 2
+
+    def test_list_is_read_from_the_primary_right_after_add_company(self, mock_db_session, superuser, sample_companies, valid_company_payload, response_cache):
+        # A worker that has known the current version for longer than the replica lag.
+        response_cache.versions_seen["companies"] = (0, 0)
+        mock_db_session.refresh.side_effect = lambda company: setattr(company, "id", uuid4())
+        replica = Mock(spec=AsyncSession)
+        replica.execute.return_value = mock_mappings_result(sample_companies[:1])
+
+        app = create_test_app_with_overrides(router, mock_db_session, superuser)
+        app.dependency_overrides[get_read_session_factory] = lambda: mock_session_factory(replica)
+        client = TestClient(app)
+        assert len(client.get("/companies").json()["items"]) == 1
+
+        client.post("/companies", json=valid_company_payload)
+        # The replica has not replayed the new company yet; its page must not be cached under the new version.
+        mock_db_session.execute.return_value = mock_mappings_result(sample_companies)
+        response = client.get("/companies")
+
+        assert len(response.json()["items"]) == len(sample_companies)
+        assert replica.execute.call_count == 1
+        assert client.get("/companies").json() == response.json()
+
     def test_add_company_forbidden_regular_user(self, mock_db_session, regular_user, valid_company_payload):
         app = create_test_app_with_overrides(router, mock_db_session, regular_user)
         client = TestClient(app)
@@ -0,0 +1,84 @@
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+from fastapi.testclient import TestClient
+
+from routes.debug import router
+from services.sql_profiler import SqlProfiler
+from tests.conftest import create_test_app_with_overrides
+
+
+class TestSqlProfile:
+
+    def test_get_sql_profile_returns_top_statements(self, mock_db_session, superuser):
+        profiler = SqlProfiler(slow_query_ms=1000, max_statements=10)
+        profiler.record("SELECT * FROM task WHERE id = $1", ("a",), 0.002, "/tasks")
+        profiler.record("SELECT * FROM users", (), 0.001, "/users")
+
+        with patch("routes.debug.sql_profiler", profiler):
+            app = create_test_app_with_overrides(router, mock_db_session, superuser)
+            response = TestClient(app).get("/debug/sql?limit=1")
+
+        assert response.status_code == 200
+        assert response.json() == [{
+            "fingerprint": "SELECT * FROM task WHERE id = ?",
+            "route": "/tasks",
+            "calls": 1,
+            "total_ms": 2.0,
+            "mean_ms": 2.0,
+            "max_ms": 2.0,
+        }]
+
+    def test_reset_sql_profile(self, mock_db_session, superuser):
+        profiler = SqlProfiler(slow_query_ms=1000, max_statements=10)
+        profiler.record("SELECT * FROM users", (), 0.001, "/users")
+
+        with patch("routes.debug.sql_profiler", profiler):
+            app = create_test_app_with_overrides(router, mock_db_session, superuser)
+            response = TestClient(app).delete("/debug/sql")
+
+        assert response.status_code == 204
+        assert profiler.top(10) == []
+
+    def test_get_sql_profile_requires_superuser(self, mock_db_session, mock_user):
+        with patch("routes.debug.sql_profiler", SqlProfiler(slow_query_ms=1000, max_statements=10)):
+            app = create_test_app_with_overrides(router, mock_db_session, mock_user)
+            response = TestClient(app).get("/debug/sql")
+
+        assert response.status_code == 403
+
+    def test_get_sql_profile_when_disabled(self, mock_db_session, superuser):
+        with patch("routes.debug.sql_profiler", None):
+            app = create_test_app_with_overrides(router, mock_db_session, superuser)
+            response = TestClient(app).get("/debug/sql")
+
+        assert response.status_code == 404
+
+
+class TestTaskCounts:
+
+    def test_check_reports_drift(self, mock_db_session, superuser):
+        drift = [{"user_id": str(uuid4()), "status": 1, "counted": 3, "actual": 2}]
+
+        with patch("routes.debug.find_count_drift", AsyncMock(return_value=drift)):
+            app = create_test_app_with_overrides(router, mock_db_session, superuser)
+            response = TestClient(app).get("/debug/task-counts")
+
+        assert response.status_code == 200
+        assert response.json() == drift
+
+    def test_reconcile(self, mock_db_session, superuser):
+        reconcile = AsyncMock(return_value=[])
+
+        with patch("routes.debug.reconcile_task_counts", reconcile):
+            app = create_test_app_with_overrides(router, mock_db_session, superuser)
+            response = TestClient(app).post("/debug/task-counts/reconcile")
+
+        assert response.status_code == 200
+        reconcile.assert_awaited_once()
+
+    def test_requires_superuser(self, mock_db_session, mock_user):
+        app = create_test_app_with_overrides(router, mock_db_session, mock_user)
+        client = TestClient(app)
+
+        assert client.get("/debug/task-counts").status_code == 403
+        assert client.post("/debug/task-counts/reconcile").status_code == 403
@@ -1,19 +1,29 @@
+import csv
+import io
+import json
+from datetime import datetime, timezone
 from fastapi.testclient import TestClient
-from unittest.mock import Mock
+from types import SimpleNamespace
+from unittest.mock import patch
+from uuid import UUID, uuid4
 from fastapi import FastAPI
+from sqlalchemy.dialects import postgresql
 
 from routes.tasks import router
-from tests.conftest import create_tasks_test_app_with_overrides
+from schemas.task import Status
+from services.pagination import decode_cursor, encode_cursor
+from tests.conftest import (
+    create_tasks_test_app_with_overrides,
+    mock_mappings_result,
+    mock_stream_result,
+    mock_session_factory,
+)
 
 
 class TestGetTasks:
 
     def test_get_tasks_success(self, mock_db_session, mock_user, sample_tasks):
-        mock_query = Mock()
-        mock_filtered_query = Mock()
-        mock_filtered_query.all.return_value = sample_tasks
-        mock_query.filter_by.return_value = mock_filtered_query
-        mock_db_session.query.return_value = mock_query
+        mock_db_session.execute.return_value = mock_mappings_result(sample_tasks)
 
         app = create_tasks_test_app_with_overrides(router, mock_db_session, mock_user)
         client = TestClient(app)
@@ -21,16 +31,13 @@ class TestGetTasks:
 
         assert response.status_code == 200
         data = response.json()
-        assert len(data) == 2
-        assert data[0]["summary"] == "Test Task"
-        assert data[1]["summary"] == "Test Task 2"
+        assert len(data["items"]) == 2
+        assert data["items"][0]["summary"] == "Test Task"
+        assert data["items"][1]["summary"] == "Test Task 2"
+        assert data["next_cursor"] is None
 
     def test_get_tasks_empty_list(self, mock_db_session, mock_user):
-        mock_query = Mock()
-        mock_filtered_query = Mock()
-        mock_filtered_query.all.return_value = []
-        mock_query.filter_by.return_value = mock_filtered_query
-        mock_db_session.query.return_value = mock_query
+        mock_db_session.execute.return_value = mock_mappings_result([])
 
         app = create_tasks_test_app_with_overrides(router, mock_db_session, mock_user)
         client = TestClient(app)
@@ -38,7 +45,163 @@ class TestGetTasks:
 
         assert response.status_code == 200
         data = response.json()
-        assert data == []
+        assert data == {"items": [], "next_cursor": None}
+
+    def test_get_tasks_next_page(self, mock_db_session, mock_user, sample_tasks):
+        mock_db_session.execute.return_value = mock_mappings_result(sample_tasks)
+
+        app = create_tasks_test_app_with_overrides(router, mock_db_session, mock_user)
+        client = TestClient(app)
+        response = client.get("/tasks", params={"limit": 1})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["items"]) == 1
+        assert decode_cursor(data["next_cursor"], int, UUID) == (sample_tasks[0]["priority"], UUID(sample_tasks[0]["id"]))
+
+        response = client.get("/tasks", params={"limit": 1, "cursor": data["next_cursor"]})
+        assert response.status_code == 200
+        query = mock_db_session.execute.call_args.args[0]
+        assert "(task.priority, task.id) < " in str(query)
+
+    def test_get_tasks_invalid_cursor(self, mock_db_session, mock_user):
+        app = create_tasks_test_app_with_overrides(router, mock_db_session, mock_user)
+        client = TestClient(app)
+        response = client.get("/tasks", params={"cursor": "not-a-cursor"})
+
+        assert response.status_code == 400
+        mock_db_session.execute.assert_not_called()
+
+    def test_get_tasks_limit_is_capped(self, mock_db_session, mock_user):
+        app = create_tasks_test_app_with_overrides(router, mock_db_session, mock_user)
+        client = TestClient(app)
+        response = client.get("/tasks", params={"limit": 10000})
+
+        assert response.status_code == 422
+
+    def test_get_tasks_not_modified(self, mock_db_session, mock_user, sample_tasks):
+        mock_db_session.scalar.return_value = 7
+        mock_db_session.execute.return_value = mock_mappings_result(sample_tasks)
+
+        app = create_tasks_test_app_with_overrides(router, mock_db_session, mock_user)
+        client = TestClient(app)
+        response = client.get("/tasks")
+        etag = response.headers["etag"]
+        assert response.headers["cache-control"] == "private, no-cache"
+
+        mock_db_session.execute.reset_mock()
+        response = client.get("/tasks", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+        mock_db_session.execute.assert_not_called()
+
+    def test_get_tasks_etag_follows_revision_and_page(self, mock_db_session, mock_user, sample_tasks):
+        mock_db_session.scalar.return_value = 7
+        mock_db_session.execute.return_value = mock_mappings_result(sample_tasks)
+
+        app = create_tasks_test_app_with_overrides(router, mock_db_session, mock_user)
+        client = TestClient(app)
+        etag = client.get("/tasks").headers["etag"]
+
+        assert client.get("/tasks", params={"limit": 1}, headers={"If-None-Match": etag}).status_code == 200
+        mock_db_session.scalar.return_value = 8
+        response = client.get("/tasks", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+
+    def test_get_tasks_hides_removed_by_default(self, mock_db_session, mock_user, sample_tasks):
+        mock_db_session.execute.return_value = mock_mappings_result(sample_tasks)
+
+        app = create_tasks_test_app_with_overrides(router, mock_db_session, mock_user)
+        client = TestClient(app)
+        client.get("/tasks")
+
+        query = mock_db_session.execute.call_args.args[0]
+        sql = str(query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+        assert "task.status != 'REMOVED'" in sql
+        assert "ORDER BY task.priority DESC, task.id DESC" in sql
+
+    def test_get_tasks_filters(self, mock_db_session, mock_user, sample_tasks):
+        mock_db_session.execute.return_value = mock_mappings_result(sample_tasks)
+
+        app = create_tasks_test_app_with_overrides(router, mock_db_session, mock_user)
+        client = TestClient(app)
+        response = client.get("/tasks", params={
+            "status": ["1", "in_progress"],
+            "min_priority": 1,
+            "max_priority": 5,
+            "created_since": "2026-01-01T00:00:00Z",
+            "updated_before": "2026-02-01T00:00:00Z",
+        })
+
+        assert response.status_code == 200
+        query = mock_db_session.execute.call_args.args[0]
+        sql = str(query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+        assert "task.status IN ('TODO', 'IN_PROGRESS')" in sql
+        assert "task.status != 'REMOVED'" in sql
+        assert "task.priority >= 1 AND task.priority <= 5" in sql
+        assert "task.created_at >= '2026-01-01 00:00:00+00:00'" in sql
+        assert "task.updated_at < '2026-02-01 00:00:00+00:00'" in sql
+
+    def test_get_tasks_removed_on_request(self, mock_db_session, mock_user, sample_tasks):
+        mock_db_session.execute.return_value = mock_mappings_result(sample_tasks)
+
+        app = create_tasks_test_app_with_overrides(router, mock_db_session, mock_user)
+        client = TestClient(app)
+        client.get("/tasks", params={"status": "REMOVED"})
+
+        query = mock_db_session.execute.call_args.args[0]
+        sql = str(query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+        assert "!= 'REMOVED'" not in sql
+        assert "task.status IN ('REMOVED')" in sql
+
+    def test_get_tasks_sorted_by_creation(self, mock_db_session, mock_user, sample_tasks):
+        created_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        rows = [{**task, "created_at": created_at} for task in sample_tasks]
+        mock_db_session.execute.return_value = mock_mappings_result(rows)
+
+        app = create_tasks_test_app_with_overrides(router, mock_db_session, mock_user)
+        client = TestClient(app)
+        response = client.get("/tasks", params={"sort": "created_at", "limit": 1})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert "created_at" not in data["items"][0]
+        assert decode_cursor(data["next_cursor"], datetime.fromisoformat, UUID) == (created_at, UUID(rows[0]["id"]))
+        query = mock_db_session.execute.call_args.args[0]
+        assert "ORDER BY task.created_at, task.id" in str(query)
+
+        client.get("/tasks", params={"sort": "created_at", "cursor": data["next_cursor"]})
+        query = mock_db_session.execute.call_args.args[0]
+        assert "(task.created_at, task.id) > " in str(query)
+
+    def test_get_tasks_etag_follows_filters(self, mock_db_session, mock_user, sample_tasks):
+        mock_db_session.scalar.return_value = 7
+        mock_db_session.execute.return_value = mock_mappings_result(sample_tasks)
+
+        app = create_tasks_test_app_with_overrides(router, mock_db_session, mock_user)
+        client = TestClient(app)
+        etag = client.get("/tasks").headers["etag"]
+
+        response = client.get("/tasks", params={"sort": "priority"}, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+
+    def test_get_tasks_invalid_filters(self, mock_db_session, mock_user):
+        app = create_tasks_test_app_with_overrides(router, mock_db_session, mock_user)
+        client = TestClient(app)
+
+        for params in (
+            {"status": "DONE"},
+            {"sort": "summary"},
+            {"min_priority": -1},
+            {"min_priority": 5, "max_priority": 1},
+            {"created_since": "2026-01-01T00:00:00"},
+            {"updated_since": "2026-02-01T00:00:00Z", "updated_before": "2026-01-01T00:00:00Z"},
+        ):
+            assert client.get("/tasks", params=params).status_code == 422, params
+        mock_db_session.execute.assert_not_called()
 
     def test_get_tasks_unauthorized(self):
         app = FastAPI()
@@ -55,3 +218,317 @@ class TestGetTasks:
         response = client.get("/tasks")
 
         assert response.status_code == 401
+
+
+class TestGetTaskChanges:
+
+    def changes(self, sample_tasks, revision=3):
+        return [{**task, "revision": revision, "updated_at": "2026-10-18T12:00:00+00:00"} for task in sample_tasks]
+
+    def test_full_sync(self, mock_db_session, mock_user, sample_tasks):
+        mock_db_session.execute.return_value = mock_mappings_result(self.changes(sample_tasks))
+
+        app = create_tasks_test_app_with_overrides(router, mock_db_session, mock_user)
+        client = TestClient(app)
+        response = client.get("/tasks/changes")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [item["summary"] for item in data["items"]] == ["Test Task", "Test Task 2"]
+        assert "revision" not in data["items"][0]
+        assert data["has_more"] is False
+        assert decode_cursor(data["cursor"], int, UUID) == (3, UUID(sample_tasks[1]["id"]))
+
+        query = str(mock_db_session.execute.call_args.args[0])
+        assert "ORDER BY task.revision, task.id" in query
+        assert "(task.revision, task.id) >" not in query
+
+    def test_changes_since_cursor(self, mock_db_session, mock_user, sample_tasks):
+        mock_db_session.execute.return_value = mock_mappings_result(self.changes(sample_tasks))
+
+        app = create_tasks_test_app_with_overrides(router, mock_db_session, mock_user)
+        client = TestClient(app)
+        cursor = client.get("/tasks/changes", params={"limit": 1}).json()["cursor"]
+        response = client.get("/tasks/changes", params={"since": cursor})
+
+        assert response.status_code == 200
+        query = mock_db_session.execute.call_args.args[0]
+        assert "(task.revision, task.id) > " in str(query)
+
+    def test_has_more(self, mock_db_session, mock_user, sample_tasks):
+        mock_db_session.execute.return_value = mock_mappings_result(self.changes(sample_tasks))
+
+        app = create_tasks_test_app_with_overrides(router, mock_db_session, mock_user)
+        client = TestClient(app)
+        data = client.get("/tasks/changes", params={"limit": 1}).json()
+
+        assert len(data["items"]) == 1
+        assert data["has_more"] is True
+        assert decode_cursor(data["cursor"], int, UUID) == (3, UUID(sample_tasks[0]["id"]))
+
+    def test_no_changes_keeps_cursor(self, mock_db_session, mock_user):
+        mock_db_session.execute.return_value = mock_mappings_result([])
+        cursor = encode_cursor(5, uuid4())
+
+        app = create_tasks_test_app_with_overrides(router, mock_db_session, mock_user)
+        client = TestClient(app)
+        response = client.get("/tasks/changes", params={"since": cursor})
+
+        assert response.status_code == 200
+        assert response.json() == {"items": [], "cursor": cursor, "has_more": False}
+
+    def test_invalid_cursor(self, mock_db_session, mock_user):
+        app = create_tasks_test_app_with_overrides(router, mock_db_session, mock_user)
+        client = TestClient(app)
+        response = client.get("/tasks/changes", params={"since": "not-a-cursor"})
+
+        assert response.status_code == 400
+        mock_db_session.execute.assert_not_called()
+
+
+def compile_pg(statement):
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+class TestTaskStats:
+
+    def test_user_stats(self, mock_db_session, mock_user):
+        mock_db_session.execute.return_value = SimpleNamespace(all=lambda: [(Status.TODO, 2), (Status.COMPLETED, 5)])
+
+        app = create_tasks_test_app_with_overrides(router, mock_db_session, mock_user)
+        client = TestClient(app)
+        response = client.get("/tasks/stats")
+
+        assert response.status_code == 200
+        assert response.json() == {"todo": 2, "in_progress": 0, "completed": 5, "removed": 0}
+        assert "etag" in response.headers
+        statement = compile_pg(mock_db_session.execute.call_args.args[0])
+        assert "GROUP BY task.status" in statement
+        assert "task.user_id = " in statement
+
+    def test_company_stats_are_for_admins(self, mock_db_session, mock_user, mock_admin_user):
+        mock_db_session.execute.return_value = SimpleNamespace(all=lambda: [])
+
+        response = TestClient(create_tasks_test_app_with_overrides(router, mock_db_session, mock_user)).get("/tasks/stats", params={"scope": "company"})
+        assert response.status_code == 403
+
+        response = TestClient(create_tasks_test_app_with_overrides(router, mock_db_session, mock_admin_user)).get("/tasks/stats", params={"scope": "company"})
+        assert response.status_code == 200
+        assert "users.company_id = " in compile_pg(mock_db_session.execute.call_args.args[0])
+
+
+class TestCreateTasksBulk:
+
+    def test_reports_created_and_conflicts(self, mock_db_session, mock_user, sample_tasks):
+        created = SimpleNamespace(**sample_tasks[0])
+        mock_db_session.scalar.return_value = 8
+        mock_db_session.execute.return_value = [created]
+
+        app = create_tasks_test_app_with_overrides(router, mock_db_session, mock_user)
+        client = TestClient(app)
+        response = client.post("/tasks/bulk", json=[
+            {"summary": "Test Task", "description": "Test Description", "priority": 1},
+            {"summary": "Taken", "description": "Already exists", "priority": 2},
+            {"summary": "Test Task", "description": "Repeated in batch", "priority": 3},
+        ])
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [item["result"] for item in data] == ["created", "conflict", "conflict"]
+        assert [item["index"] for item in data] == [0, 1, 2]
+        assert data[0]["task"]["summary"] == "Test Task"
+        assert data[1]["task"] is None
+
+        bump = compile_pg(mock_db_session.scalar.call_args.args[0])
+        assert bump.startswith("UPDATE users SET task_revision=(users.task_revision + ")
+        insert = mock_db_session.execute.call_args.args[0]
+        assert "ON CONFLICT (summary) DO NOTHING RETURNING" in compile_pg(insert)
+        params = insert.compile().params
+        assert [params[f"revision_m{row}"] for row in range(3)] == [8, 8, 8]
+        mock_db_session.execute.assert_called_once()
+        mock_db_session.commit.assert_called_once()
+
+    def test_rejects_empty_and_oversized_batches(self, mock_db_session, mock_user):
+        app = create_tasks_test_app_with_overrides(router, mock_db_session, mock_user)
+        client = TestClient(app)
+        item = {"summary": "x", "description": "x", "priority": 1}
+
+        assert client.post("/tasks/bulk", json=[]).status_code == 422
+        assert client.post("/tasks/bulk", json=[item] * 1001).status_code == 422
+        mock_db_session.execute.assert_not_called()
+
+
+class TestUpdateTasksStatus:
+
+    def test_reports_updated_and_not_found(self, mock_db_session, mock_user, sample_tasks):
+        updated = SimpleNamespace(**{**sample_tasks[0], "id": UUID(sample_tasks[0]["id"]), "status": Status.COMPLETED})
+        mock_db_session.execute.return_value = [updated]
+        missing = str(uuid4())
+
+        app = create_tasks_test_app_with_overrides(router, mock_db_session, mock_user)
+        client = TestClient(app)
+        response = client.patch("/tasks/status", json={
+            "ids": [sample_tasks[0]["id"], missing],
+            "status": Status.COMPLETED.value,
+        })
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [item["result"] for item in data] == ["updated", "not_found"]
+        assert data[0]["task"]["status"] == Status.COMPLETED.value
+
+        lock, statement = [compile_pg(call.args[0]) for call in mock_db_session.execute.call_args_list]
+        assert lock.startswith("SELECT task.id")
+        assert lock.endswith("ORDER BY task.id FOR UPDATE")
+        assert statement.startswith("UPDATE task SET status=")
+        assert "revision=" in statement
+        assert "task.user_id = " in statement
+        assert "RETURNING" in statement
+        assert compile_pg(mock_db_session.scalar.call_args.args[0]).startswith("UPDATE users SET task_revision=")
+        mock_db_session.commit.assert_called_once()
+
+    def test_invalid_status(self, mock_db_session, mock_user):
+        app = create_tasks_test_app_with_overrides(router, mock_db_session, mock_user)
+        client = TestClient(app)
+        response = client.patch("/tasks/status", json={"ids": [str(uuid4())], "status": 99})
+
+        assert response.status_code == 422
+
+
+class TestClaimTasks:
+
+    def test_claims_and_publishes_per_owner(self, mock_db_session, mock_admin_user, sample_tasks, task_feed):
+        other_user = str(uuid4())
+        claimed = [
+            SimpleNamespace(**{**sample_tasks[1], "status": Status.IN_PROGRESS}),
+            SimpleNamespace(**{**sample_tasks[0], "status": Status.IN_PROGRESS, "user_id": other_user}),
+        ]
+        mock_db_session.execute.return_value = claimed
+
+        app = create_tasks_test_app_with_overrides(router, mock_db_session, mock_admin_user)
+        client = TestClient(app)
+        with task_feed.subscribe(f"user:{other_user}") as subscription:
+            response = client.post("/tasks/claim", json={"limit": 2, "scope": "company"})
+
+        assert response.status_code == 200
+        assert [task["id"] for task in response.json()] == [sample_tasks[1]["id"], sample_tasks[0]["id"]]
+        [event] = subscription.buffer
+        assert [task["id"] for task in json.loads(event.split(b"data: ", 1)[1])] == [sample_tasks[0]["id"]]
+
+        statement = compile_pg(mock_db_session.execute.call_args.args[0])
+        assert "FOR UPDATE OF task SKIP LOCKED" in statement
+        assert "ORDER BY users.id FOR UPDATE" in statement
+        assert "users.company_id = " in statement
+        assert "UPDATE users SET task_revision=" in statement
+        mock_db_session.commit.assert_called_once()
+
+    def test_user_scope_by_default(self, mock_db_session, mock_user):
+        mock_db_session.execute.return_value = []
+
+        app = create_tasks_test_app_with_overrides(router, mock_db_session, mock_user)
+        client = TestClient(app)
+        response = client.post("/tasks/claim", json={})
+
+        assert response.status_code == 200
+        assert response.json() == []
+        statement = compile_pg(mock_db_session.execute.call_args.args[0])
+        assert "WHERE users.id = " in statement
+
+    def test_company_scope_is_for_admins(self, mock_db_session, mock_user):
+        app = create_tasks_test_app_with_overrides(router, mock_db_session, mock_user)
+        client = TestClient(app)
+        response = client.post("/tasks/claim", json={"scope": "company"})
+
+        assert response.status_code == 403
+        mock_db_session.execute.assert_not_called()
+
+    def test_limit_is_capped(self, mock_db_session, mock_user):
+        app = create_tasks_test_app_with_overrides(router, mock_db_session, mock_user)
+        client = TestClient(app)
+
+        assert client.post("/tasks/claim", json={"limit": 0}).status_code == 422
+        assert client.post("/tasks/claim", json={"limit": 101}).status_code == 422
+
+
+class TestExportTasks:
+
+    def export(self, mock_db_session, user, sample_tasks, **params):
+        rows = [SimpleNamespace(**task) for task in sample_tasks]
+        mock_db_session.stream.return_value = mock_stream_result([rows[:1], rows[1:]])
+
+        app = create_tasks_test_app_with_overrides(router, mock_db_session, user)
+        client = TestClient(app)
+        with patch("services.export.SessionLocal", mock_session_factory(mock_db_session)):
+            return client.get("/tasks/export", params=params)
+
+    def test_export_ndjson(self, mock_db_session, mock_user, sample_tasks):
+        response = self.export(mock_db_session, mock_user, sample_tasks)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["summary"] for line in lines] == ["Test Task", "Test Task 2"]
+        assert lines[1]["status"] == "IN_PROGRESS"
+
+    def test_export_csv(self, mock_db_session, mock_user, sample_tasks):
+        response = self.export(mock_db_session, mock_user, sample_tasks, format="csv")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        rows = list(csv.reader(io.StringIO(response.text)))
+        assert rows[0] == ["id", "summary", "description", "status", "priority", "user_id"]
+        assert rows[1][1:5] == ["Test Task", "Test Description", "TODO", "1"]
+        assert len(rows) == 3
+
+    def test_export_uses_server_side_cursor(self, mock_db_session, mock_user, sample_tasks):
+        self.export(mock_db_session, mock_user, sample_tasks)
+
+        query = mock_db_session.stream.call_args.args[0]
+        assert query.get_execution_options()["yield_per"] == 1000
+        assert "task.user_id = " in str(query)
+
+    def test_export_admin_is_scoped_to_company(self, mock_db_session, mock_user, sample_tasks):
+        admin = {**mock_user, "is_admin": True, "company_id": str(uuid4())}
+        self.export(mock_db_session, admin, sample_tasks)
+
+        query = str(mock_db_session.stream.call_args.args[0])
+        assert "JOIN users ON task.user_id = users.id" in query
+        assert "users.company_id = " in query
+
+    def test_export_unknown_format(self, mock_db_session, mock_user, sample_tasks):
+        response = self.export(mock_db_session, mock_user, sample_tasks, format="xml")
+
+        assert response.status_code == 422
+
+
+class TestTaskFeed:
+
+    def test_writes_are_published(self, mock_db_session, mock_user, sample_tasks, task_feed):
+        updated = SimpleNamespace(**{**sample_tasks[0], "status": Status.REMOVED})
+        mock_db_session.execute.return_value = [updated]
+
+        app = create_tasks_test_app_with_overrides(router, mock_db_session, mock_user)
+        client = TestClient(app)
+        with task_feed.subscribe(f"company:{mock_user['company_id']}") as subscription:
+            client.patch("/tasks/status", json={"ids": [sample_tasks[0]["id"]], "status": Status.REMOVED.value})
+
+        [event] = subscription.buffer
+        assert event.startswith(b"event: updated\n")
+        assert json.loads(event.split(b"data: ", 1)[1]) == [{**sample_tasks[0], "status": Status.REMOVED.value}]
+
+    def test_nothing_published_without_changes(self, mock_db_session, mock_user, task_feed):
+        mock_db_session.execute.return_value = []
+
+        app = create_tasks_test_app_with_overrides(router, mock_db_session, mock_user)
+        client = TestClient(app)
+        with task_feed.subscribe(f"user:{mock_user['id']}") as subscription:
+            client.patch("/tasks/status", json={"ids": [str(uuid4())], "status": Status.COMPLETED.value})
+
+        assert not subscription.buffer
+
+    def test_company_feed_is_for_admins(self, mock_db_session, mock_user):
+        app = create_tasks_test_app_with_overrides(router, mock_db_session, mock_user)
+        client = TestClient(app)
+        response = client.get("/tasks/feed", params={"scope": "company"})
+
+        assert response.status_code == 403
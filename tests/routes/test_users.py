@@ -0,0 +1,111 @@
+from fastapi.testclient import TestClient
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
+from uuid import UUID, uuid4
+from sqlalchemy.dialects import postgresql
+
+from routes.users import router
+from tests.conftest import create_test_app_with_overrides, mock_mappings_result
+
+
+def fake_hashes(passwords):
+    return [f"hashed:{password}" for password in passwords]
+
+
+def inserted_rows(statement) -> list[dict]:
+    """The VALUES rows of a multi-row INSERT, from its bound parameters"""
+    params = statement.compile().params
+    count = sum(1 for key in params if key.startswith("username_m"))
+    return [{column: params[f"{column}_m{row}"] for column in ("username", "password", "is_admin")} for row in range(count)]
+
+
+class TestCreateUsersBulk:
+
+    def post(self, mock_db_session, user, taken=(), **kwargs):
+        company_id = UUID(user["company_id"])
+        mock_db_session.scalar.return_value = company_id
+        mock_db_session.scalars.return_value = list(taken)
+        mock_db_session.execute.side_effect = lambda statement: [
+            SimpleNamespace(id=uuid4(), username=params["username"], is_active=True, is_admin=params["is_admin"],
+                            is_superuser=False, company_id=company_id)
+            for params in inserted_rows(statement)
+        ]
+
+        app = create_test_app_with_overrides(router, mock_db_session, user)
+        with patch("routes.users.hash_passwords_async", AsyncMock(side_effect=fake_hashes)) as hash_passwords:
+            response = TestClient(app).post("/users/bulk", **kwargs)
+        return response, hash_passwords
+
+    def test_json_import_reports_conflicts_per_row(self, mock_db_session, mock_admin_user):
+        response, hash_passwords = self.post(mock_db_session, mock_admin_user, taken=["taken"], json=[
+            {"username": "ann", "first_name": "Ann", "last_name": "A", "password": "p1"},
+            {"username": "taken", "first_name": "T", "last_name": "T", "password": "p2"},
+            {"username": "ann", "first_name": "Again", "last_name": "A", "password": "p3"},
+            {"username": "bob", "first_name": "Bob", "last_name": "B", "password": "p4", "is_admin": True},
+        ])
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [item["result"] for item in data] == ["created", "conflict", "conflict", "created"]
+        assert data[3]["user"]["is_admin"] is True
+        assert data[1]["user"] is None
+        # Taken and repeated usernames are never hashed.
+        hash_passwords.assert_awaited_once_with(["p1", "p4"])
+
+        statement = mock_db_session.execute.call_args.args[0]
+        assert "ON CONFLICT (username) DO NOTHING RETURNING" in str(statement.compile(dialect=postgresql.dialect()))
+        assert [row["password"] for row in inserted_rows(statement)] == ["hashed:p1", "hashed:p4"]
+        mock_db_session.commit.assert_called_once()
+
+    def test_csv_import(self, mock_db_session, mock_admin_user):
+        body = "username,first_name,last_name,password,is_admin\nann,Ann,A,p1,\nbob,Bob,B,p2,true\n"
+        response, _ = self.post(mock_db_session, mock_admin_user, content=body, headers={"Content-Type": "text/csv"})
+
+        assert response.status_code == 200
+        assert [(item["user"]["username"], item["user"]["is_admin"]) for item in response.json()] == [("ann", False), ("bob", True)]
+
+    def test_inserts_in_batches(self, mock_db_session, mock_admin_user):
+        users = [{"username": f"user{u}", "first_name": "", "last_name": "", "password": "p"} for u in range(1000)]
+        response, _ = self.post(mock_db_session, mock_admin_user, json=users)
+
+        assert response.status_code == 200
+        assert [len(inserted_rows(call.args[0])) for call in mock_db_session.execute.call_args_list] == [500, 500]
+
+    def test_invalid_rows_are_rejected(self, mock_db_session, mock_admin_user):
+        body = "username,first_name\nann,Ann\n"
+        response, _ = self.post(mock_db_session, mock_admin_user, content=body, headers={"Content-Type": "text/csv"})
+
+        assert response.status_code == 422
+        assert ["body", 0, "last_name"] in [error["loc"] for error in response.json()["detail"]]
+        mock_db_session.execute.assert_not_called()
+
+    def test_rejects_empty_and_oversized_imports(self, mock_db_session, mock_admin_user):
+        user = {"username": "u", "first_name": "", "last_name": "", "password": "p"}
+        assert self.post(mock_db_session, mock_admin_user, json=[])[0].status_code == 422
+        assert self.post(mock_db_session, mock_admin_user, json=[user] * 1001)[0].status_code == 422
+
+    def test_unsupported_media_type(self, mock_db_session, mock_admin_user):
+        response, _ = self.post(mock_db_session, mock_admin_user, content=b"<users/>", headers={"Content-Type": "application/xml"})
+
+        assert response.status_code == 415
+
+    def test_admins_only(self, mock_db_session, mock_user):
+        response, _ = self.post(mock_db_session, mock_user, json=[{"username": "u", "first_name": "", "last_name": "", "password": "p"}])
+
+        assert response.status_code == 403
+
+
+class TestGetUserTasks:
+
+    def test_hides_removed_tasks(self, mock_db_session, mock_admin_user, sample_tasks):
+        user = SimpleNamespace(id=uuid4(), company_id=UUID(mock_admin_user["company_id"]), task_revision=3)
+        mock_db_session.execute.side_effect = [Mock(one_or_none=Mock(return_value=user)), mock_mappings_result(sample_tasks)]
+
+        app = create_test_app_with_overrides(router, mock_db_session, mock_admin_user)
+        response = TestClient(app).get("/users/someone/tasks")
+
+        assert response.status_code == 200
+        query = mock_db_session.execute.call_args.args[0]
+        sql = str(query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+        assert "task.status != 'REMOVED'" in sql
+        assert "ORDER BY task.priority DESC, task.id DESC" in sql
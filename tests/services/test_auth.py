@@ -1,15 +1,25 @@
-# import pytest
-# from unittest.mock import Mock, patch, MagicMock
-# from sqlalchemy.orm import Session
+import asyncio
+import time
+import pytest
+from unittest.mock import Mock, patch
+from fastapi import HTTPException
+from jose import jwt
+from sqlalchemy.ext.asyncio import AsyncSession
 # from jose import jwt
 # from passlib.context import CryptContext
 
 from services.auth import (
     hash_password,
     verfiy_password,
-    # sign_in,
+    sign_in,
+    hash_password_async,
+    hash_passwords_async,
+    verify_password_async,
+    PasswordPool,
+    PasswordPoolBusy,
     # create_access_token,
-    # get_current_user,
+    get_current_user,
+    TokenCache,
     # pw_context
 )
 # from schemas.user import User
@@ -79,3 +89,163 @@ class TestVerifyPassword:
 
         result = verfiy_password("wrong_密码", hashed)
         assert result is False
+
+
+class TestSignIn:
+
+    def test_sign_in_correct_password(self):
+        user = Mock(password=hash_password("test_password"))
+        db = Mock(spec=AsyncSession)
+        db.scalar.return_value = user
+
+        result = asyncio.run(sign_in("testuser", "test_password", db))
+        assert result is user
+        db.scalar.assert_awaited_once()
+
+    def test_sign_in_wrong_password(self):
+        db = Mock(spec=AsyncSession)
+        db.scalar.return_value = Mock(password=hash_password("test_password"))
+
+        result = asyncio.run(sign_in("testuser", "wrong_password", db))
+        assert result is None
+
+    def test_sign_in_unknown_user(self):
+        db = Mock(spec=AsyncSession)
+        db.scalar.return_value = None
+
+        result = asyncio.run(sign_in("nobody", "test_password", db))
+        assert result is None
+
+
+class TestPasswordPool:
+
+    def test_hash_and_verify_in_pool(self):
+        async def run():
+            hashed = await hash_password_async("test_password")
+            return (
+                await verify_password_async("test_password", hashed),
+                await verify_password_async("wrong_password", hashed),
+            )
+
+        assert asyncio.run(run()) == (True, False)
+
+    def test_hash_many_in_pool(self):
+        passwords = [f"password {p}" for p in range(10)]
+        hashed = asyncio.run(hash_passwords_async(passwords))
+
+        assert len(hashed) == 10
+        assert all(verfiy_password(password, h) for password, h in zip(passwords, hashed))
+
+    def test_rejects_when_queue_is_full(self):
+        pool = PasswordPool(max_workers=1, max_queued=1)
+
+        async def run():
+            jobs = [asyncio.ensure_future(pool.run(time.sleep, 0.5)) for _ in range(2)]
+            await asyncio.sleep(0)
+            assert pool.in_flight == 2
+            assert pool.queue_depth == 1
+            with pytest.raises(PasswordPoolBusy):
+                await pool.run(time.sleep, 0)
+            await asyncio.gather(*jobs)
+
+        asyncio.run(run())
+        assert pool.in_flight == 0
+        pool.executor.shutdown()
+
+
+class TestTokenCache:
+
+    def test_miss_then_hit(self):
+        cache = TokenCache(max_size=10, ttl=60)
+
+        assert cache.get("token") is None
+        cache.put("token", {"id": "1"})
+        assert cache.get("token") == {"id": "1"}
+
+    def test_evicts_least_recently_used(self):
+        cache = TokenCache(max_size=2, ttl=60)
+        cache.put("a", {"id": "a"})
+        cache.put("b", {"id": "b"})
+        cache.get("a")
+        cache.put("c", {"id": "c"})
+
+        assert cache.get("b") is None
+        assert cache.get("a") == {"id": "a"}
+        assert cache.get("c") == {"id": "c"}
+
+    def test_entry_expires_after_ttl(self):
+        cache = TokenCache(max_size=10, ttl=60)
+        with patch("services.auth.time.time", return_value=1000):
+            cache.put("token", {"id": "1"})
+        with patch("services.auth.time.time", return_value=1059):
+            assert cache.get("token") is not None
+        with patch("services.auth.time.time", return_value=1060):
+            assert cache.get("token") is None
+
+    def test_entry_expires_at_token_exp(self):
+        cache = TokenCache(max_size=10, ttl=60)
+        with patch("services.auth.time.time", return_value=1000):
+            cache.put("token", {"id": "1", "exp": 1010})
+        with patch("services.auth.time.time", return_value=1010):
+            assert cache.get("token") is None
+
+    def test_invalidate(self):
+        cache = TokenCache(max_size=10, ttl=60)
+        cache.put("a", {"id": "1"})
+        cache.put("b", {"id": "1"})
+        cache.put("c", {"id": "2"})
+
+        cache.invalidate("c")
+        assert cache.get("c") is None
+
+        cache.invalidate_user("1")
+        assert cache.entries == {}
+
+    def test_keys_are_digests(self):
+        cache = TokenCache(max_size=10, ttl=60)
+        cache.put("secret-token", {"id": "1"})
+
+        assert "secret-token" not in cache.entries
+        assert all(len(key) == 32 for key in cache.entries)
+
+
+@patch("services.auth.jwt_algorithm", "HS256")
+@patch("services.auth.jwt_secret", "test-secret")
+class TestGetCurrentUser:
+
+    def test_decodes_once_then_serves_from_cache(self):
+        token = jwt.encode({"id": "1", "sub": "testuser"}, "test-secret", algorithm="HS256")
+
+        with patch("services.auth.token_cache", TokenCache(max_size=10, ttl=60)), \
+                patch("services.auth.jwt.decode", wraps=jwt.decode) as decode:
+            first = asyncio.run(get_current_user(token))
+            second = asyncio.run(get_current_user(token))
+
+        assert first == second == {"id": "1", "sub": "testuser"}
+        decode.assert_called_once()
+
+    def test_cached_claims_are_not_shared(self):
+        token = jwt.encode({"id": "1"}, "test-secret", algorithm="HS256")
+
+        with patch("services.auth.token_cache", TokenCache(max_size=10, ttl=60)):
+            asyncio.run(get_current_user(token))["id"] = "tampered"
+            assert asyncio.run(get_current_user(token))["id"] == "1"
+
+    def test_invalid_token(self):
+        token = jwt.encode({"id": "1"}, "wrong-secret", algorithm="HS256")
+
+        with patch("services.auth.token_cache", TokenCache(max_size=10, ttl=60)) as cache:
+            with pytest.raises(HTTPException) as exc:
+                asyncio.run(get_current_user(token))
+
+        assert exc.value.status_code == 401
+        assert cache.entries == {}
+
+    def test_expired_token(self):
+        token = jwt.encode({"id": "1", "exp": int(time.time()) - 10}, "test-secret", algorithm="HS256")
+
+        with patch("services.auth.token_cache", TokenCache(max_size=10, ttl=60)):
+            with pytest.raises(HTTPException) as exc:
+                asyncio.run(get_current_user(token))
+
+        assert exc.value.status_code == 401
@@ -0,0 +1,153 @@
+import io
+import json
+import logging
+import queue
+import sys
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from services.logger import (
+    CorrelationFilter, DroppingQueueHandler, JSONFormatter, LogWriter, RequestContextMiddleware, SamplingFilter,
+    parse_sample_rates, request_id_var, user_id_var,
+)
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def make_record(name="todos", level=logging.INFO, msg="hello", args=(), **extra):
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+class CountingStream(io.StringIO):
+
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+class TestJSONFormatter:
+
+    def test_formats_one_json_object_with_correlation_and_extra_fields(self):
+        record = make_record(msg="created %s", args=("task",), request_id="req-1", user_id="user-1", task_id=7)
+
+        entry = json.loads(JSONFormatter().format(record))
+
+        assert entry["message"] == "created task"
+        assert entry["level"] == "INFO"
+        assert entry["request_id"] == "req-1"
+        assert entry["user_id"] == "user-1"
+        assert entry["task_id"] == 7
+
+
+class TestCorrelationFilter:
+
+    def test_stamps_ids_from_context(self):
+        request_token = request_id_var.set("req-1")
+        user_token = user_id_var.set("user-1")
+        try:
+            record = make_record()
+            CorrelationFilter().filter(record)
+        finally:
+            request_id_var.reset(request_token)
+            user_id_var.reset(user_token)
+
+        assert (record.request_id, record.user_id) == ("req-1", "user-1")
+
+
+class TestSamplingFilter:
+
+    def test_rate_applies_to_child_loggers_and_is_counted(self):
+        sampling = SamplingFilter({"sqlalchemy.engine": 0.0})
+        before = sample("log_records_sampled_out_total", logger="sqlalchemy.engine.Engine")
+
+        assert not sampling.filter(make_record(name="sqlalchemy.engine.Engine"))
+        assert sampling.filter(make_record(name="todos"))
+        assert sample("log_records_sampled_out_total", logger="sqlalchemy.engine.Engine") == before + 1
+
+    def test_warnings_are_never_sampled_out(self):
+        sampling = SamplingFilter({"": 0.0, "todos": 0.0})
+
+        assert sampling.filter(make_record(level=logging.WARNING))
+
+    def test_parse_sample_rates(self):
+        assert parse_sample_rates("sqlalchemy.engine=0.01, todos.access=0.5,") == {
+            "sqlalchemy.engine": 0.01,
+            "todos.access": 0.5,
+        }
+
+
+class TestDroppingQueueHandler:
+
+    def test_drops_and_counts_instead_of_blocking_when_full(self):
+        handler = DroppingQueueHandler(queue.Queue(maxsize=2))
+        before = sample("log_records_dropped_total")
+
+        for i in range(5):
+            handler.handle(make_record(msg="record %d", args=(i,)))
+
+        assert handler.records.qsize() == 2
+        assert sample("log_records_dropped_total") == before + 3
+
+    def test_formats_message_and_exception_on_the_calling_thread(self):
+        handler = DroppingQueueHandler(queue.Queue())
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = logging.LogRecord("todos", logging.ERROR, __file__, 1, "failed %s", ("x",), sys.exc_info())
+        handler.handle(record)
+
+        queued = handler.records.get_nowait()
+        assert (queued.msg, queued.args, queued.exc_info) == ("failed x", None, None)
+        assert "ValueError: boom" in json.loads(JSONFormatter().format(queued))["exc_info"]
+
+
+class TestLogWriter:
+
+    def test_writes_queued_records_in_batches_and_flushes_on_stop(self):
+        records = queue.Queue()
+        stream = CountingStream()
+        writer = LogWriter(records, stream, JSONFormatter(), batch_size=100)
+        for i in range(250):
+            records.put(make_record(msg="record %d", args=(i,)))
+
+        writer.start()
+        writer.stop()
+
+        lines = stream.getvalue().splitlines()
+        assert [json.loads(line)["message"] for line in lines] == [f"record {i}" for i in range(250)]
+        assert stream.writes == 3
+
+
+class TestRequestContextMiddleware:
+
+    def create_app(self):
+        app = FastAPI()
+        app.add_middleware(RequestContextMiddleware)
+
+        @app.get("/")
+        async def root():
+            return {"request_id": request_id_var.get()}
+
+        return app
+
+    def test_echoes_caller_request_id(self):
+        response = TestClient(self.create_app()).get("/", headers={"X-Request-ID": "abc-123"})
+
+        assert response.headers["X-Request-ID"] == "abc-123"
+        assert response.json() == {"request_id": "abc-123"}
+
+    def test_generates_request_id_when_missing(self):
+        response = TestClient(self.create_app()).get("/")
+
+        assert len(response.headers["X-Request-ID"]) == 32
+        assert response.json() == {"request_id": response.headers["X-Request-ID"]}
+        assert request_id_var.get() is None
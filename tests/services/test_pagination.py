@@ -0,0 +1,40 @@
+import pytest
+from fastapi import HTTPException
+from uuid import uuid4, UUID
+
+from services.pagination import encode_cursor, decode_cursor, paginate
+
+
+class TestCursor:
+
+    def test_round_trip(self):
+        task_id = uuid4()
+        cursor = encode_cursor(3, task_id)
+
+        assert decode_cursor(cursor, int, UUID) == (3, task_id)
+
+    def test_cursor_is_url_safe(self):
+        cursor = encode_cursor("name with spaces & symbols?", uuid4())
+
+        assert "=" not in cursor
+        assert cursor.replace("-", "").replace("_", "").isalnum()
+
+    @pytest.mark.parametrize("cursor", ["garbage", encode_cursor(1), encode_cursor("x", uuid4()), "W251bGwsbnVsbF0"])
+    def test_invalid_cursor(self, cursor):
+        with pytest.raises(HTTPException) as exc:
+            decode_cursor(cursor, int, UUID)
+        assert exc.value.status_code == 400
+
+
+class TestPaginate:
+
+    def test_last_page_has_no_cursor(self):
+        page = paginate([1, 2], 2, lambda row: (row,))
+
+        assert page == {"items": [1, 2], "next_cursor": None}
+
+    def test_extra_row_produces_cursor_from_last_item(self):
+        page = paginate([1, 2, 3], 2, lambda row: (row,))
+
+        assert page["items"] == [1, 2]
+        assert decode_cursor(page["next_cursor"], int) == (2,)
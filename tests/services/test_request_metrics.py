@@ -0,0 +1,117 @@
+import asyncio
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from services.request_metrics import MetricsMiddleware, current_route, instrument_engine, request_db_time
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def create_app():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+    in_flight = {}
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        in_flight["value"] = sample("http_requests_in_flight")
+        return {"id": item_id}
+
+    @app.get("/items/{item_id}/route")
+    async def get_item_route(item_id: int):
+        return {"route": current_route()}
+
+    @app.post("/items")
+    async def create_item(payload: dict):
+        return payload
+
+    return app, in_flight
+
+
+class TestMetricsMiddleware:
+
+    def test_labels_by_route_template_and_status(self):
+        app, _ = create_app()
+        labels = {"method": "GET", "route": "/items/{item_id}", "status": "200"}
+        before = sample("http_request_duration_seconds_count", **labels)
+
+        client = TestClient(app)
+        client.get("/items/1")
+        client.get("/items/2")
+
+        assert sample("http_request_duration_seconds_count", **labels) == before + 2
+
+    def test_unmatched_paths_share_one_label(self):
+        app, _ = create_app()
+        labels = {"method": "GET", "route": "unmatched", "status": "404"}
+        before = sample("http_request_duration_seconds_count", **labels)
+
+        TestClient(app).get("/missing/123")
+
+        assert sample("http_request_duration_seconds_count", **labels) == before + 1
+
+    def test_records_request_and_response_sizes(self):
+        app, _ = create_app()
+        labels = {"method": "POST", "route": "/items"}
+        request_before = sample("http_request_size_bytes_sum", **labels)
+        response_before = sample("http_response_size_bytes_sum", **labels)
+
+        response = TestClient(app).post("/items", content=b'{"name": "abc"}', headers={"Content-Type": "application/json"})
+
+        assert sample("http_request_size_bytes_sum", **labels) == request_before + 15
+        assert sample("http_response_size_bytes_sum", **labels) == response_before + len(response.content)
+
+    def test_in_flight_gauge_counts_active_requests(self):
+        app, in_flight = create_app()
+        before = sample("http_requests_in_flight")
+
+        TestClient(app).get("/items/1")
+
+        assert in_flight["value"] == before + 1
+        assert sample("http_requests_in_flight") == before
+
+    def test_current_route_is_the_matched_template(self):
+        app, _ = create_app()
+
+        response = TestClient(app).get("/items/1/route")
+
+        assert response.json() == {"route": "/items/{item_id}/route"}
+        assert current_route() is None
+
+
+class TestInstrumentEngine:
+
+    def test_statement_time_is_added_to_current_request(self):
+        engine = create_async_engine("sqlite+aiosqlite://")
+        instrument_engine(engine.sync_engine)
+
+        async def run():
+            db_time = [0.0]
+            token = request_db_time.set(db_time)
+            try:
+                async with engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+            finally:
+                request_db_time.reset(token)
+                await engine.dispose()
+            return db_time[0]
+
+        assert asyncio.run(run()) > 0
+
+    def test_statements_outside_a_request_are_ignored(self):
+        engine = create_async_engine("sqlite+aiosqlite://")
+        instrument_engine(engine.sync_engine)
+
+        async def run():
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+            await engine.dispose()
+
+        asyncio.run(run())
+
+        assert request_db_time.get() is None
@@ -0,0 +1,118 @@
+import asyncio
+import time
+from unittest.mock import Mock
+
+from services.response_cache import LRUCacheBackend, ResponseCache, conditional_response, etag_for, etag_matches
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+class TestLRUCacheBackend:
+
+    def test_evicts_least_recently_used(self):
+        backend = LRUCacheBackend(max_size=2)
+        run(backend.set("a", b"1", ttl=60))
+        run(backend.set("b", b"2", ttl=60))
+        run(backend.get("a"))
+        run(backend.set("c", b"3", ttl=60))
+
+        assert run(backend.get("a")) == b"1"
+        assert run(backend.get("b")) is None
+        assert run(backend.get("c")) == b"3"
+
+    def test_expired_entries_are_misses(self):
+        backend = LRUCacheBackend(max_size=2)
+        run(backend.set("a", b"1", ttl=0))
+
+        assert run(backend.get("a")) is None
+
+    def test_counters_are_never_evicted(self):
+        backend = LRUCacheBackend(max_size=1)
+        run(backend.incr("companies:version"))
+        run(backend.set("a", b"1", ttl=60))
+        run(backend.set("b", b"2", ttl=60))
+
+        assert run(backend.counter("companies:version")) == 1
+
+
+class TestResponseCache:
+
+    def test_invalidate_hides_every_entry_of_the_namespace(self):
+        cache = ResponseCache(LRUCacheBackend(max_size=10), ttl=60)
+        key, _ = run(cache.lookup("companies", "page-1"))
+        run(cache.store(key, b"old"))
+        other_key, _ = run(cache.lookup("tasks", "page-1"))
+        run(cache.store(other_key, b"tasks"))
+
+        assert run(cache.lookup("companies", "page-1"))[1] == b"old"
+        run(cache.invalidate("companies"))
+
+        assert run(cache.lookup("companies", "page-1"))[1] is None
+        assert run(cache.lookup("tasks", "page-1"))[1] == b"tasks"
+
+    def test_result_computed_during_invalidation_is_not_served_afterwards(self):
+        cache = ResponseCache(LRUCacheBackend(max_size=10), ttl=60)
+        key, _ = run(cache.lookup("companies", "page-1"))
+        run(cache.invalidate("companies"))
+        run(cache.store(key, b"computed before the write"))
+
+        assert run(cache.lookup("companies", "page-1"))[1] is None
+
+    def test_recently_invalidated_for_the_replica_lag(self):
+        cache = ResponseCache(LRUCacheBackend(max_size=10), ttl=60, replica_lag=60)
+        assert not cache.recently_invalidated("companies")
+
+        run(cache.invalidate("companies"))
+
+        assert cache.recently_invalidated("companies")
+        assert not cache.recently_invalidated("tasks")
+
+    def test_a_version_is_recent_from_when_it_is_first_seen(self):
+        cache = ResponseCache(LRUCacheBackend(max_size=10), ttl=60, replica_lag=60)
+        run(cache.lookup("companies", "page-1"))
+        cache.versions_seen["companies"] = (0, time.monotonic() - 61)
+
+        run(cache.lookup("companies", "page-1"))
+        assert not cache.recently_invalidated("companies")
+
+        run(cache.backend.incr("companies:version"))
+        run(cache.lookup("companies", "page-1"))
+        assert cache.recently_invalidated("companies")
+
+    def test_never_recently_invalidated_without_replica_lag(self):
+        cache = ResponseCache(LRUCacheBackend(max_size=10), ttl=60)
+        run(cache.invalidate("companies"))
+
+        assert not cache.recently_invalidated("companies")
+
+
+class TestConditionalResponse:
+
+    def request(self, if_none_match=None):
+        headers = {"if-none-match": if_none_match} if if_none_match else {}
+        return Mock(headers=headers, scope={"route": Mock(path="/companies")})
+
+    def test_etag_matches(self):
+        etag = etag_for(b"body")
+
+        assert etag_matches(etag, etag)
+        assert etag_matches(f'"other", W/{etag}', etag)
+        assert etag_matches("*", etag)
+        assert not etag_matches('"other"', etag)
+        assert not etag_matches(None, etag)
+
+    def test_returns_body_with_etag(self):
+        response = conditional_response(self.request(), b'{"items": []}')
+
+        assert response.status_code == 200
+        assert response.body == b'{"items": []}'
+        assert response.headers["ETag"] == etag_for(b'{"items": []}')
+        assert response.headers["Cache-Control"] == "private, no-cache"
+
+    def test_returns_304_when_client_has_the_body(self):
+        response = conditional_response(self.request(etag_for(b"body")), b"body")
+
+        assert response.status_code == 304
+        assert response.body == b""
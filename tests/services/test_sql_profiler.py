@@ -0,0 +1,81 @@
+import asyncio
+import logging
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from services.sql_profiler import SqlProfiler, fingerprint, redact
+
+
+class TestFingerprint:
+
+    def test_groups_statements_that_differ_only_in_values(self):
+        assert fingerprint("SELECT * FROM task WHERE id = $1::UUID LIMIT $2::INTEGER") == \
+            "SELECT * FROM task WHERE id = ? LIMIT ?"
+        assert fingerprint("SELECT * FROM users WHERE name = 'bob''s' AND age > 30") == \
+            fingerprint("SELECT * FROM users WHERE name = 'al' AND age > 4")
+
+    def test_collapses_in_lists_and_values_rows(self):
+        assert fingerprint("SELECT * FROM task WHERE id IN ($1, $2, $3)") == "SELECT * FROM task WHERE id IN (?+)"
+        assert fingerprint("INSERT INTO task (a, b) VALUES (%s, %s), (%s, %s), (%s, %s)") == \
+            "INSERT INTO task (a, b) VALUES (?+), ..."
+
+    def test_keeps_casts_and_identifiers(self):
+        assert fingerprint("SELECT task_1.id, :name, x::text\n  FROM task AS task_1") == \
+            "SELECT task_1.id, ?, x::text FROM task AS task_1"
+
+
+class TestRedact:
+
+    def test_keeps_types_not_values(self):
+        assert redact(("secret", 5)) == ["str", "int"]
+        assert redact({"password": "secret"}) == {"password": "str"}
+        assert redact([("a",), ("b",)], executemany=True) == "<2 parameter sets>"
+
+
+class TestSqlProfiler:
+
+    def test_aggregates_by_fingerprint_and_route(self):
+        profiler = SqlProfiler(slow_query_ms=1000, max_statements=10)
+        profiler.record("SELECT * FROM task WHERE id = $1", ("a",), 0.002, "/tasks")
+        profiler.record("SELECT * FROM task WHERE id = $1", ("b",), 0.004, "/tasks")
+        profiler.record("SELECT * FROM task WHERE id = $1", ("c",), 0.001, "/users/{username}/tasks")
+        profiler.record("SELECT * FROM users", (), 0.010, "/users")
+
+        top = profiler.top(2)
+
+        assert [(stats["route"], stats["calls"]) for stats in top] == [("/users", 1), ("/tasks", 2)]
+        assert top[1]["total_ms"] == 6.0
+        assert top[1]["max_ms"] == 4.0
+
+    def test_tracks_a_bounded_number_of_statements(self):
+        profiler = SqlProfiler(slow_query_ms=1000, max_statements=1)
+        profiler.record("SELECT 1 FROM task", (), 0.001, None)
+        profiler.record("SELECT 1 FROM users", (), 0.001, None)
+
+        assert len(profiler.top(10)) == 1
+        assert profiler.untracked == 1
+
+    def test_logs_slow_statements_with_redacted_parameters(self, caplog):
+        profiler = SqlProfiler(slow_query_ms=5, max_statements=10)
+        with caplog.at_level(logging.WARNING, logger="todos.sql"):
+            profiler.record("SELECT * FROM users WHERE password = $1", ("hunter2",), 0.001, "/auth/login")
+            profiler.record("SELECT * FROM users WHERE password = $1", ("hunter2",), 0.010, "/auth/login")
+
+        assert len(caplog.records) == 1
+        record = caplog.records[0]
+        assert (record.route, record.duration_ms, record.parameters) == ("/auth/login", 10.0, ["str"])
+        assert "hunter2" not in caplog.text
+
+    def test_installs_on_engine_events(self):
+        engine = create_async_engine("sqlite+aiosqlite://")
+        profiler = SqlProfiler(slow_query_ms=1000, max_statements=10)
+        profiler.install(engine.sync_engine)
+
+        async def run():
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1 WHERE 2 > :value"), {"value": 1})
+            await engine.dispose()
+
+        asyncio.run(run())
+
+        assert [stats["fingerprint"] for stats in profiler.top(10)] == ["SELECT ? WHERE ? > ?"]
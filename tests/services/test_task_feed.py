@@ -0,0 +1,122 @@
+import asyncio
+import json
+from unittest.mock import AsyncMock
+
+from prometheus_client import REGISTRY
+
+from services.task_feed import MAX_TASKS_PER_MESSAGE, LocalBroker, Subscription, TaskFeed, stream_feed
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def data(event: bytes) -> list:
+    return json.loads(event.split(b"data: ", 1)[1])
+
+
+class TestSubscription:
+
+    def test_returns_buffered_events(self):
+        async def scenario():
+            subscription = Subscription(buffer_size=3)
+            subscription.push(b"a")
+            subscription.push(b"b")
+            return await subscription.get(timeout=1), await subscription.get(timeout=0.01)
+
+        assert run(scenario()) == ([b"a", b"b"], [])
+
+    def test_wakes_up_on_push(self):
+        async def scenario():
+            subscription = Subscription(buffer_size=3)
+            asyncio.get_running_loop().call_later(0.01, subscription.push, b"a")
+            return await subscription.get(timeout=5)
+
+        assert run(scenario()) == [b"a"]
+
+    def test_overflow_asks_for_resync(self):
+        before = REGISTRY.get_sample_value("task_feed_overflows_total") or 0
+
+        async def scenario():
+            subscription = Subscription(buffer_size=2)
+            for event in (b"a", b"b", b"c", b"d"):
+                subscription.push(event)
+            return subscription, await subscription.get(timeout=1)
+
+        subscription, events = run(scenario())
+        assert events is None
+        assert not subscription.buffer
+        assert REGISTRY.get_sample_value("task_feed_overflows_total") == before + 1
+
+
+class TestTaskFeed:
+
+    def test_fans_out_by_topic(self):
+        async def scenario():
+            feed = TaskFeed(LocalBroker(), buffer_size=10)
+            with feed.subscribe("user:u1") as own, feed.subscribe("company:c1") as company, feed.subscribe("user:u2") as other:
+                await feed.publish("created", [{"id": "t1"}], "u1", "c1")
+                return [await subscription.get(timeout=0.01) for subscription in (own, company, other)]
+
+        own, company, other = run(scenario())
+        assert own == company == [b'event: created\ndata: [{"id":"t1"}]\n\n']
+        assert other == []
+
+    def test_unsubscribes_on_exit(self):
+        feed = TaskFeed(LocalBroker(), buffer_size=10)
+        before = REGISTRY.get_sample_value("task_feed_subscribers")
+        with feed.subscribe("user:u1"):
+            assert REGISTRY.get_sample_value("task_feed_subscribers") == before + 1
+
+        assert feed.subscribers == {}
+        assert REGISTRY.get_sample_value("task_feed_subscribers") == before
+
+    def test_large_batches_are_split(self):
+        broker = LocalBroker()
+        broker.publish = AsyncMock()
+        feed = TaskFeed(broker, buffer_size=10)
+        tasks = [{"id": str(t)} for t in range(MAX_TASKS_PER_MESSAGE * 2 + 1)]
+        run(feed.publish("created", tasks, "u1", None))
+
+        messages = [json.loads(call.args[0]) for call in broker.publish.call_args_list]
+        assert [len(message["tasks"]) for message in messages] == [MAX_TASKS_PER_MESSAGE, MAX_TASKS_PER_MESSAGE, 1]
+        assert messages[0]["topics"] == ["user:u1"]
+
+    def test_broker_failure_does_not_raise(self):
+        broker = LocalBroker()
+        broker.publish = AsyncMock(side_effect=OSError("connection refused"))
+        feed = TaskFeed(broker, buffer_size=10)
+
+        run(feed.publish("created", [{"id": "t1"}], "u1", "c1"))
+
+    def test_lost_messages_resync_everyone(self):
+        async def scenario():
+            feed = TaskFeed(LocalBroker(), buffer_size=10)
+            with feed.subscribe("user:u1") as subscription:
+                feed.resync_all()
+                return await subscription.get(timeout=1)
+
+        assert run(scenario()) is None
+
+
+class TestStreamFeed:
+
+    def test_streams_events_heartbeats_and_resync(self):
+        async def scenario():
+            feed = TaskFeed(LocalBroker(), buffer_size=1)
+            stream = stream_feed(feed, "user:u1", heartbeat=0.01)
+            chunks = [await anext(stream)]
+            await feed.publish("updated", [{"id": "t1"}], "u1", None)
+            chunks.append(await anext(stream))
+            chunks.append(await anext(stream))
+            for _ in range(2):
+                await feed.publish("updated", [{"id": "t2"}], "u1", None)
+            chunks.extend([chunk async for chunk in stream])
+            return feed, chunks
+
+        feed, (connected, event, keep_alive, resync) = run(scenario())
+        assert connected == b": connected\n\n"
+        assert data(event) == [{"id": "t1"}]
+        assert keep_alive == b": keep-alive\n\n"
+        assert resync.startswith(b"event: resync\n")
+        assert feed.subscribers == {}
@@ -0,0 +1,94 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from uuid import uuid4
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from schemas.base_entity import Base
+from schemas.company import Company
+from schemas.task import Task, Status
+from schemas.user import User
+from services.task_search import local_rank, search_terms, search_user_tasks
+import schemas.company, schemas.user  # noqa
+
+
+def test_search_terms():
+    assert search_terms("Fix the LOGIN bug, fix THE") == ["fix", "the", "login", "bug"]
+    assert search_terms("'; DROP TABLE task:* &") == ["drop", "table", "task"]
+    assert search_terms("!!!") == []
+
+
+def test_short_search_terms_are_rejected():
+    with pytest.raises(HTTPException) as error:
+        search_terms("fix it a")
+
+    assert error.value.status_code == 422
+    assert error.value.detail == "Search terms need at least 3 characters: it, a"
+
+
+def test_local_rank():
+    assert local_rank("Deploy release", "notes for ops", ["dep"]) == 1.0
+    assert local_rank("Release notes", "deploy on friday", ["dep"]) == 0.4
+    assert local_rank("Deploy release", "notes", ["dep", "not"]) == 1.4
+    # Prefixes of words only, and every term must match.
+    assert local_rank("Redeploy", "", ["dep"]) == 0.0
+    assert local_rank("Deploy release", "", ["dep", "missing"]) == 0.0
+
+
+def search_sqlite(tasks, q, **filters):
+    """Run the search against an in-memory SQLite database, like a checkout without Postgres"""
+    async def scenario():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        try:
+            async with engine.begin() as connection:
+                await connection.run_sync(Base.metadata.create_all)
+                await connection.execute(insert(Company), [{"id": company_id, "name": "c", "description": "", "rating": 3}])
+                await connection.execute(insert(User), [{"id": user_id, "username": "u", "first_name": "", "last_name": "",
+                                                         "password": "", "company_id": company_id}])
+                await connection.execute(insert(Task), [{"user_id": user_id, "description": "", **task} for task in tasks])
+            async with AsyncSession(engine) as db:
+                return await search_user_tasks(db, user_id, q, **filters)
+        finally:
+            await engine.dispose()
+
+    company_id, user_id = uuid4(), uuid4()
+    return asyncio.run(scenario())
+
+
+class TestLocalSearch:
+
+    tasks = [
+        {"summary": "Deploy release", "status": Status.TODO, "priority": 1},
+        {"summary": "Release notes", "description": "before we deploy", "status": Status.TODO, "priority": 5},
+        {"summary": "Redeploy staging", "status": Status.TODO, "priority": 9},
+        {"summary": "Deploy hotfix", "status": Status.COMPLETED, "priority": 3},
+        {"summary": "100% done_ish", "status": Status.TODO, "priority": 2},
+        {"summary": "Deploy twice", "status": Status.REMOVED, "priority": 4},
+    ]
+
+    def test_ranks_summary_matches_first(self):
+        results = search_sqlite(self.tasks, "depl")
+
+        assert [task["summary"] for task in results] == ["Deploy hotfix", "Deploy release", "Release notes"]
+        assert results[0]["rank"] > results[2]["rank"]
+
+    def test_all_terms_must_match(self):
+        assert [task["summary"] for task in search_sqlite(self.tasks, "deploy rel")] == ["Deploy release", "Release notes"]
+
+    def test_filters(self):
+        results = search_sqlite(self.tasks, "deploy", statuses=[Status.TODO], min_priority=2)
+
+        assert [task["summary"] for task in results] == ["Release notes"]
+
+    def test_removed_only_on_request(self):
+        assert "Deploy twice" not in [task["summary"] for task in search_sqlite(self.tasks, "deploy")]
+        assert [task["summary"] for task in search_sqlite(self.tasks, "deploy", statuses=[Status.REMOVED])] == ["Deploy twice"]
+
+    def test_underscore_is_part_of_a_word(self):
+        assert [task["summary"] for task in search_sqlite(self.tasks, "done_")] == ["100% done_ish"]
+        assert search_sqlite(self.tasks, "do_e") == []
+
+    def test_limit(self):
+        assert len(search_sqlite(self.tasks, "deploy", limit=1)) == 1
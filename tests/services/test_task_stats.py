@@ -0,0 +1,45 @@
+import asyncio
+from uuid import uuid4
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from schemas.base_entity import Base
+from schemas.company import Company
+from schemas.task import Task, Status
+from schemas.user import User
+from services.task_stats import get_task_stats, stats_from_rows
+import schemas.task_count  # noqa
+
+
+def test_stats_from_rows():
+    assert stats_from_rows([(Status.TODO, 3), (Status.REMOVED, 1)]) == {"todo": 3, "in_progress": 0, "completed": 0, "removed": 1}
+    assert stats_from_rows([]) == {"todo": 0, "in_progress": 0, "completed": 0, "removed": 0}
+
+
+def test_counts_the_task_table_without_counters():
+    """SQLite has no counter triggers, so the stats come from the task table"""
+    company_id, user_ids = uuid4(), [uuid4(), uuid4()]
+    statuses = [Status.TODO, Status.TODO, Status.COMPLETED]
+
+    async def scenario():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        try:
+            async with engine.begin() as connection:
+                await connection.run_sync(Base.metadata.create_all)
+                await connection.execute(insert(Company), [{"id": company_id, "name": "c", "description": "", "rating": 3}])
+                await connection.execute(insert(User), [{"id": user_id, "username": str(user_id), "first_name": "", "last_name": "",
+                                                         "password": "", "company_id": company_id} for user_id in user_ids])
+                await connection.execute(insert(Task), [
+                    {"user_id": user_id, "summary": f"{user_id} {i}", "description": "", "status": status, "priority": 1}
+                    for user_id in user_ids
+                    for i, status in enumerate(statuses)
+                ])
+            async with AsyncSession(engine) as db:
+                return await get_task_stats(db, user_id=user_ids[0]), await get_task_stats(db, company_id=company_id)
+        finally:
+            await engine.dispose()
+
+    user, company = asyncio.run(scenario())
+    assert user == {"todo": 2, "in_progress": 0, "completed": 1, "removed": 0}
+    assert company == {"todo": 4, "in_progress": 0, "completed": 2, "removed": 0}
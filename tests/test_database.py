@@ -0,0 +1,182 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+from prometheus_client import REGISTRY
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from database import InstrumentedPool, PrimarySession, RecentWriters, ReplicaSet, get_read_session
+from services.logger import user_id_var
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class TestInstrumentedPool:
+
+    def test_checkout_records_wait_and_overflow(self):
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=InstrumentedPool, pool_size=1, max_overflow=1)
+        checkouts = sample("db_pool_checkout_seconds_count")
+        overflow = sample("db_pool_overflow_total")
+
+        async def run():
+            async with engine.connect():
+                async with engine.connect():
+                    pass
+            await engine.dispose()
+
+        asyncio.run(run())
+
+        assert sample("db_pool_checkout_seconds_count") == checkouts + 2
+        assert sample("db_pool_overflow_total") == overflow + 1
+
+    def test_checkout_timeout_is_counted(self):
+        engine = create_async_engine(
+            "sqlite+aiosqlite://", poolclass=InstrumentedPool, pool_size=1, max_overflow=0, pool_timeout=0.05
+        )
+        timeouts = sample("db_pool_timeouts_total")
+
+        async def run():
+            async with engine.connect():
+                with pytest.raises(TimeoutError):
+                    async with engine.connect():
+                        pass
+            await engine.dispose()
+
+        asyncio.run(run())
+
+        assert sample("db_pool_timeouts_total") == timeouts + 1
+
+
+class TestRecentWriters:
+
+    def test_reads_stay_on_primary_within_the_window(self):
+        writers = RecentWriters(window=60)
+        writers.record("user-1")
+
+        assert writers.wrote_recently("user-1")
+        assert not writers.wrote_recently("user-2")
+
+    def test_expired_writes_are_dropped(self):
+        writers = RecentWriters(window=0)
+        writers.record("user-1")
+
+        assert not writers.wrote_recently("user-1")
+        assert len(writers.written_at) == 0
+
+    def test_primary_commit_records_current_user(self):
+        engine = create_async_engine("sqlite+aiosqlite://")
+        sessions = async_sessionmaker(bind=engine, sync_session_class=PrimarySession)
+
+        async def run():
+            token = user_id_var.set("writer")
+            try:
+                async with sessions() as db:
+                    await db.execute(text("SELECT 1"))
+                    await db.commit()
+            finally:
+                user_id_var.reset(token)
+                await engine.dispose()
+
+        with patch("database.recent_writers", RecentWriters(window=60)) as writers:
+            asyncio.run(run())
+
+        assert writers.wrote_recently("writer")
+
+
+def replica_set(*urls, retry_after=60):
+    return ReplicaSet([create_async_engine(url) for url in urls], retry_after)
+
+
+async def dispose(replicas):
+    for replica in replicas.replicas:
+        await replica.engine.dispose()
+
+
+# aiosqlite also reports a failed connect from its worker thread, sometimes only
+# once a later test is running, so the whole class ignores it.
+unreachable_replica = pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+
+
+@unreachable_replica
+class TestReplicaSet:
+
+    def test_candidates_rotate_and_skip_replicas_that_are_down(self):
+        replicas = replica_set("sqlite+aiosqlite://", "sqlite+aiosqlite://", "sqlite+aiosqlite://")
+        first, second, third = replicas.replicas
+
+        assert replicas.candidates() == [first, second, third]
+        assert replicas.candidates() == [second, third, first]
+
+        replicas.mark_down(third, OSError())
+        assert replicas.candidates() == [first, second]
+        assert sample("db_replica_up", replica=third.name) == 0
+
+    def test_replica_is_retried_after_the_down_period(self):
+        replicas = replica_set("sqlite+aiosqlite://", retry_after=0)
+        replicas.mark_down(replicas.replicas[0], OSError())
+
+        assert replicas.candidates() == replicas.replicas
+
+    def test_check_marks_unreachable_replicas_down_and_others_up(self, tmp_path):
+        replicas = replica_set("sqlite+aiosqlite://", f"sqlite+aiosqlite:///{tmp_path}/missing/replica.db")
+        healthy, unreachable = replicas.replicas
+        replicas.mark_down(healthy, OSError())
+
+        async def run():
+            await replicas.check()
+            await dispose(replicas)
+
+        asyncio.run(run())
+
+        assert healthy.is_up()
+        assert not unreachable.is_up()
+
+
+@unreachable_replica
+class TestGetReadSession:
+
+    def read_target(self, replicas, user_id="reader"):
+        primary = create_async_engine("sqlite+aiosqlite://")
+        primary_sessions = async_sessionmaker(bind=primary, sync_session_class=PrimarySession)
+
+        async def run():
+            try:
+                with patch("database.replicas", replicas), patch("database.SessionLocal", primary_sessions):
+                    session = get_read_session({"id": user_id})
+                    db = await anext(session)
+                    target = db.bind
+                    await session.aclose()
+                return target
+            finally:
+                await primary.dispose()
+                if replicas is not None:
+                    await dispose(replicas)
+
+        target = asyncio.run(run())
+        engines = [replica.engine for replica in replicas.replicas] if replicas is not None else []
+        return "primary" if target is primary else engines.index(target)
+
+    def test_reads_go_to_a_replica(self):
+        assert self.read_target(replica_set("sqlite+aiosqlite://")) == 0
+
+    def test_unreachable_replica_falls_through_to_the_next(self, tmp_path):
+        replicas = replica_set(f"sqlite+aiosqlite:///{tmp_path}/missing/replica.db", "sqlite+aiosqlite://")
+
+        assert self.read_target(replicas) == 1
+        assert not replicas.replicas[0].is_up()
+
+    def test_primary_when_no_replica_answers(self, tmp_path):
+        assert self.read_target(replica_set(f"sqlite+aiosqlite:///{tmp_path}/missing/replica.db")) == "primary"
+
+    def test_primary_when_no_replicas_are_configured(self):
+        assert self.read_target(None) == "primary"
+
+    def test_recent_writer_reads_from_primary(self):
+        writers = RecentWriters(window=60)
+        writers.record("writer")
+
+        with patch("database.recent_writers", writers):
+            assert self.read_target(replica_set("sqlite+aiosqlite://"), user_id="writer") == "primary"